@@ -1,11 +1,214 @@
+"""
+Module: Json Encoder
+
+Encodes engine objects to JSON.
+
+Objects are turned into built-in types by a serializer registered for their exact type, found
+with a single dictionary lookup. Subclasses of registered types (and any other class providing
+`for_json()`) get their serializer resolved once, and then cached under their own type.
+
+`orjson` is used as the encoding backend when it is installed, the standard library otherwise.
+"""
+import fractions
 import json
+import typing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+Serializer = typing.Callable[[typing.Any], typing.Any]
+
+_serializers: dict[type, Serializer] = {}
+_resolved: set[type] = set()  # Types whose serializer was looked up rather than registered
+_defaults_registered = False
+_backend = 'orjson' if orjson else 'json'
+_SCALARS = (str, int, float, type(None))
+
+#: Encoding backends that can be selected with `set_backend`
+BACKENDS = ('orjson', 'json') if orjson else ('json',)
+
+
+def register_serializer(cls: type, serializer: Serializer):
+    """
+    Register the serializer for a type
+
+    The serializer is also used for subclasses that do not register their own.
+
+    :param cls: Type to be serialized
+    :type cls: type
+    :param serializer: Function returning a JSON encodable representation of an instance
+    :type serializer: Callable
+    """
+    for resolved in [resolved for resolved in _resolved if issubclass(resolved, cls)]:
+        _resolved.discard(resolved)
+        del _serializers[resolved]
+    _serializers[cls] = serializer
+
+
+def serialize(o):
+    """
+    JSON encodable representation of an object
+
+    :param o: Object to serialize
+    :return: representation made of types the JSON backend can encode
+    :raise TypeError: if no serializer is known for the object
+    """
+    try:
+        serializer = _serializers[type(o)]
+    except KeyError:
+        serializer = _resolve(type(o))
+    return serializer(o)
+
+
+def primitive(obj):
+    """
+    Built-in representation of an object, equal to what decoding its JSON document gives
+
+    Registered serializers are applied all the way down, without encoding anything.
+
+    :param obj: object to convert
+    :return: dicts, lists and scalars
+    :raise TypeError: if no serializer is known for an object met on the way
+    """
+    if isinstance(obj, _SCALARS):
+        return obj
+    if isinstance(obj, dict):
+        return {key if isinstance(key, str) else _key(key): primitive(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [primitive(item) for item in obj]
+    return primitive(serialize(obj))
+
+
+def set_backend(backend: str):
+    """
+    Select the encoding backend
+
+    :param backend: One of BACKENDS
+    :type backend: str
+    :raise ValueError: on unknown or unavailable backend
+    """
+    # pylint: disable=global-statement
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f'JSON backend {backend} is not available')
+    _backend = backend
+
+
+def get_backend() -> str:
+    """
+    Name of the selected encoding backend
+
+    :rtype: str
+    """
+    return _backend
 
 
 class ComplexEncoder(json.JSONEncoder):
+    """JSONEncoder for engine objects"""
 
     def default(self, o):
-        if isinstance(o, set):
-            return list(o)
-        if 'for_json' in dir(o) and callable(getattr(o, 'for_json')):
-            return o.for_json()
-        return o.__dir__
+        return serialize(o)
+
+
+def dumps(obj) -> str:
+    """
+    Encode an object straight to a compact JSON string
+
+    :param obj: object to encode
+    :return: JSON string
+    :rtype: str
+    """
+    if _backend == 'orjson':
+        return dumpb(obj).decode('utf-8')
+    return json.dumps(obj, cls=ComplexEncoder, separators=(',', ':'))
+
+
+def dumpb(obj) -> bytes:
+    """
+    Encode an object straight to compact UTF-8 JSON bytes
+
+    :param obj: object to encode
+    :return: JSON document as bytes
+    :rtype: bytes
+    """
+    if _backend == 'orjson':
+        try:
+            return orjson.dumps(obj, default=serialize,
+                                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS)
+        except orjson.JSONEncodeError:
+            # orjson only handles 64-bit integers; let the standard library have a go
+            pass
+    return json.dumps(obj, cls=ComplexEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def loads(document: typing.Union[str, bytes]):
+    """
+    Decode a JSON document with the selected backend
+
+    :param document: JSON document
+    :type document: str|bytes
+    :return: decoded object
+    """
+    if _backend == 'orjson':
+        return orjson.loads(document)
+    return json.loads(document)
+
+
+def _key(key) -> str:
+    # JSON object keys are strings: scalars are written as their JSON literal
+    if isinstance(key, _SCALARS):
+        return dumps(key)
+    key = primitive(key)
+    return key if isinstance(key, str) else dumps(key)
+
+
+def _for_json(o):
+    return o.for_json()
+
+
+def _resolve(cls: type) -> Serializer:
+    _register_defaults()
+    if cls in _serializers:
+        return _serializers[cls]
+    for base in cls.__mro__[1:]:
+        if base in _serializers:
+            serializer = _serializers[base]
+            break
+    else:
+        if not callable(getattr(cls, 'for_json', None)):
+            raise TypeError(f'Object of type {cls.__name__} is not JSON serializable')
+        serializer = _for_json
+    _serializers[cls] = serializer
+    _resolved.add(cls)
+    return serializer
+
+
+def _register_defaults():
+    # pylint: disable=global-statement,import-outside-toplevel
+    # Engine classes import this module themselves, so they are imported on first use
+    global _defaults_registered
+    if _defaults_registered:
+        return
+    _defaults_registered = True
+    from craps.bet import BetSignature, BetStatus
+    from craps.dice import Outcome
+    from craps.table.bet_abstracts import BetAbstract
+    from craps.table.bet_book import BetBook
+    from craps.table.config import Config
+    from craps.table.config.odds import Odds
+    from craps.table.table import Table
+
+    for cls, serializer in [(set, list),
+                            (frozenset, list),
+                            (BetBook, list),
+                            (fractions.Fraction, lambda o: [o.numerator, o.denominator]),
+                            (BetStatus, lambda o: o.value),
+                            (Outcome, _for_json),
+                            (BetSignature, _for_json),
+                            (BetAbstract, lambda o: o.get_signature().for_json()),
+                            (Config, _for_json),
+                            (Odds, _for_json),
+                            (Table, _for_json)]:
+        _serializers.setdefault(cls, serializer)
@@ -0,0 +1,194 @@
+"""
+Module: Schema Validator
+
+Compiles a JSON Schema once and reuses it for every instance it validates.
+
+Alongside the full `jsonschema` validator a fast check is generated from the schema itself. It
+understands the handful of keywords used by `RequestSchema.json` and only ever answers "valid"
+when `jsonschema` would too. Anything it does not accept is handed to `jsonschema`, which then
+decides and produces the error report.
+"""
+import re
+import typing
+
+import jsonschema
+
+Check = typing.Callable[[typing.Any], bool]
+
+#: Keywords that do not affect validation
+ANNOTATIONS = frozenset(['$schema', '$id', '$comment', '$defs', 'definitions', 'title',
+                         'description', 'default', 'examples', 'deprecated', 'readOnly',
+                         'writeOnly'])
+
+TYPES: dict[str, Check] = {
+    'array':   lambda instance: isinstance(instance, list),
+    'boolean': lambda instance: isinstance(instance, bool),
+    'integer': lambda instance: isinstance(instance, int) and not isinstance(instance, bool),
+    'null':    lambda instance: instance is None,
+    'number':  lambda instance: isinstance(instance, (int, float)) and not isinstance(instance, bool),
+    'object':  lambda instance: isinstance(instance, dict),
+    'string':  lambda instance: isinstance(instance, str),
+}
+
+
+class UnsupportedSchema(Exception):
+    """Schema uses keywords the fast check does not understand"""
+
+
+class SchemaValidator:
+    """
+    Precompiled JSON Schema validator
+
+    Attributes
+    ----------
+    schema : dict
+        The JSON Schema
+    """
+    schema: dict  #: The JSON Schema
+    _validator: jsonschema.protocols.Validator
+    _fast_check: typing.Optional[Check] = None
+
+    def __init__(self, schema: dict, fast: bool = True):
+        """
+        Check and compile the schema
+
+        :param schema: JSON Schema
+        :type schema: dict
+        :param fast: Generate the fast check from the schema (if the schema allows it)
+        :type fast: bool
+        :raise jsonschema.exceptions.SchemaError: if the schema itself is invalid
+        """
+        validator_cls = jsonschema.validators.validator_for(schema)
+        validator_cls.check_schema(schema)
+        self.schema = schema
+        self._validator = validator_cls(schema)
+        if fast:
+            try:
+                self._fast_check = compile_schema(schema)
+            except UnsupportedSchema:
+                self._fast_check = None
+
+    def has_fast_check(self) -> bool:
+        """
+        A fast check was generated for the schema
+
+        :rtype: bool
+        """
+        return self._fast_check is not None
+
+    def is_valid(self, instance) -> bool:
+        """
+        Instance is valid under the schema
+
+        :param instance: decoded JSON instance
+        :rtype: bool
+        """
+        if self._fast_check is not None and self._fast_check(instance):
+            return True
+        return self._validator.is_valid(instance)
+
+    def validate(self, instance):
+        """
+        Validate an instance, reporting the same error `jsonschema.validate` would
+
+        :param instance: decoded JSON instance
+        :raise jsonschema.exceptions.ValidationError: if the instance is invalid
+        """
+        if self._fast_check is not None and self._fast_check(instance):
+            return
+        error = jsonschema.exceptions.best_match(self._validator.iter_errors(instance))
+        if error is not None:
+            raise error
+
+
+def compile_schema(schema: dict) -> Check:
+    """
+    Generate a fast check from a JSON Schema
+
+    :param schema: JSON Schema
+    :type schema: dict
+    :return: Function returning True for instances that are valid under the schema
+    :raise UnsupportedSchema: if the schema uses keywords the check can not enforce
+    """
+    compiled: dict[str, Check] = {}
+
+    def resolve(ref: str) -> Check:
+        if ref not in compiled:
+            if not ref.startswith('#/'):
+                raise UnsupportedSchema(f'Only local references are supported: {ref}')
+            target = schema
+            for part in ref[2:].split('/'):
+                target = target[part.replace('~1', '/').replace('~0', '~')]
+            compiled[ref] = lambda instance: False  # Placeholder for recursive references
+            compiled[ref] = _compile(target, resolve)
+        return lambda instance: compiled[ref](instance)
+
+    return _compile(schema, resolve)
+
+
+def _compile(schema, resolve: typing.Callable[[str], Check]) -> Check:
+    # pylint: disable=too-many-branches,too-many-locals
+    # One branch per supported keyword
+    if schema is True:
+        return lambda instance: True
+    if schema is False:
+        return lambda instance: False
+    checks: list[Check] = []
+    unknown = set(schema) - ANNOTATIONS - {
+        '$ref', 'type', 'enum', 'const', 'anyOf', 'properties', 'required',
+        'additionalProperties', 'items', 'minItems', 'maxItems', 'minimum', 'maximum', 'pattern'}
+    if unknown:
+        raise UnsupportedSchema(f'Unsupported keywords: {", ".join(sorted(unknown))}')
+    if '$ref' in schema:
+        checks.append(resolve(schema['$ref']))
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        type_checks = [TYPES[name] for name in types]
+        checks.append(lambda instance: any(check(instance) for check in type_checks))
+    if 'enum' in schema or 'const' in schema:
+        values = schema['enum'] if 'enum' in schema else [schema['const']]
+        if any(isinstance(value, (list, dict, float)) for value in values):
+            raise UnsupportedSchema('Only scalar enum values are supported')
+        allowed = frozenset((type(value), value) for value in values)
+        checks.append(lambda instance: (type(instance), instance) in allowed
+                      if isinstance(instance, (str, int, bool, type(None))) else False)
+    if 'anyOf' in schema:
+        options = [_compile(option, resolve) for option in schema['anyOf']]
+        checks.append(lambda instance: any(option(instance) for option in options))
+    if 'properties' in schema:
+        properties = {name: _compile(sub, resolve) for name, sub in schema['properties'].items()}
+        checks.append(lambda instance: not isinstance(instance, dict) or all(
+            check(instance[name]) for name, check in properties.items() if name in instance))
+    if 'required' in schema:
+        required = tuple(schema['required'])
+        checks.append(lambda instance: not isinstance(instance, dict) or all(
+            name in instance for name in required))
+    if 'additionalProperties' in schema:
+        known = frozenset(schema.get('properties', {}))
+        additional = _compile(schema['additionalProperties'], resolve)
+        checks.append(lambda instance: not isinstance(instance, dict) or all(
+            additional(instance[name]) for name in instance if name not in known))
+    if 'items' in schema:
+        if isinstance(schema['items'], list):
+            raise UnsupportedSchema('Tuple validation is not supported')
+        item = _compile(schema['items'], resolve)
+        checks.append(lambda instance: not isinstance(instance, list) or all(
+            item(value) for value in instance))
+    if 'minItems' in schema:
+        min_items = schema['minItems']
+        checks.append(lambda instance: not isinstance(instance, list) or len(instance) >= min_items)
+    if 'maxItems' in schema:
+        max_items = schema['maxItems']
+        checks.append(lambda instance: not isinstance(instance, list) or len(instance) <= max_items)
+    if 'minimum' in schema:
+        minimum = schema['minimum']
+        checks.append(lambda instance: not TYPES['number'](instance) or instance >= minimum)
+    if 'maximum' in schema:
+        maximum = schema['maximum']
+        checks.append(lambda instance: not TYPES['number'](instance) or instance <= maximum)
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+        checks.append(lambda instance: not isinstance(instance, str) or bool(pattern.search(instance)))
+    if len(checks) == 1:
+        return checks[0]
+    return lambda instance: all(check(instance) for check in checks)
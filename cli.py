@@ -0,0 +1,109 @@
+"""
+Module: Craps Engine Command Line
+
+Processes a stream of JSONL requests, writing one JSON response per line as it goes.
+
+Usage: python3 cli.py [input.jsonl] [-o output.jsonl] [-w workers] [--unordered]
+"""
+import argparse
+import functools
+import sys
+import typing
+
+import JsonEncoder
+import engine
+import worker_pool
+
+#: How a request that could not be processed is written out
+ERROR_FORMATS = {
+    'response': 'The error response object, as process_request returns it',
+    'line':     'The error response object with the input line number added as "line"',
+    'null':     'A JSON null',
+}
+
+
+def process_line(numbered_line: tuple[int, bytes], error_format: str = 'response') -> bytes:
+    """
+    Process a single JSONL request line
+
+    :param numbered_line: Input line number and the line itself
+    :type numbered_line: tuple[int, bytes]
+    :param error_format: One of ERROR_FORMATS
+    :type error_format: str
+    :return: Response line (including the newline)
+    :rtype: bytes
+    """
+    # pylint: disable=broad-except
+    # One bad request must not take down the rest of the stream
+    line_number, line = numbered_line
+    # Only error responses written differently need looking at before they are encoded
+    output = 'bytes' if error_format == 'response' else 'dict'
+    try:
+        response = engine.process_request(line, output=output)
+    except Exception as error:
+        response = engine.encode_response(engine.error_response(error), output)
+    if output == 'bytes':
+        return response + b'\n'
+    if response.get('success') is False:
+        response = None if error_format == 'null' else {**response, 'line': line_number}
+    return JsonEncoder.dumpb(response) + b'\n'
+
+
+def numbered_lines(stream: typing.BinaryIO) -> typing.Iterator[tuple[int, bytes]]:
+    """
+    Non-blank lines from a stream, with their line numbers (starting at 1)
+
+    :param stream: Binary input stream
+    :type stream: BinaryIO
+    :rtype: Iterator[tuple[int, bytes]]
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def main(argv: typing.Optional[list[str]] = None) -> int:
+    """
+    Command line entry point
+
+    :param argv: Command line arguments (defaults to sys.argv)
+    :type argv: list[str]|None
+    :return: exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description='Process craps engine requests, one JSON object per line.')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='JSONL file of requests (default: standard input)')
+    parser.add_argument('-o', '--output', default='-',
+                        help='File to write responses to (default: standard output)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Number of worker processes (default: CPU count, 1 runs in-process)')
+    parser.add_argument('-c', '--chunksize', type=int, default=worker_pool.DEFAULT_CHUNKSIZE,
+                        help=f'Requests sent to a worker at a time (default: {worker_pool.DEFAULT_CHUNKSIZE})')
+    parser.add_argument('--unordered', action='store_true',
+                        help='Write responses as they finish rather than in input order')
+    parser.add_argument('--error-format', choices=sorted(ERROR_FORMATS), default='response',
+                        help='How failed requests are written: ' +
+                             '; '.join(f'{name}: {help_text}' for name, help_text in ERROR_FORMATS.items()))
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    target = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        for response in worker_pool.imap(functools.partial(process_line, error_format=args.error_format),
+                                         numbered_lines(source),
+                                         workers=args.workers,
+                                         chunksize=args.chunksize,
+                                         ordered=not args.unordered):
+            target.write(response)
+        target.flush()
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if target is not sys.stdout.buffer:
+            target.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+Package: Craps.Analytics
+
+Table and bet statistics built on the engine's rules. The vector based modules require numpy.
+"""
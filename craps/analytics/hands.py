@@ -0,0 +1,167 @@
+"""
+Module: Craps.Analytics.Hands
+
+Exact statistics of a shooter's hand, from the first come out roll to the seven out.
+
+The puck is moved by the engine's own rules (`settle_table` on an empty table) for every
+outcome of the dice, so a hand under any configuration (crapless included) is a small chain
+over the puck's locations. Moments come from solving that chain exactly (see `markov`) and
+distributions from dynamic programming over it. Results are cached per configuration.
+"""
+import dataclasses
+import fractions
+import functools
+import typing
+
+from craps.dice import Outcome as DiceOutcome
+from craps.table.config import Config
+from craps.table.puck import PuckLocation
+from craps.table.settlement import settle_table
+from craps.table.table import Table
+from .markov import Absorbed, solve
+
+#: Number of configurations kept
+HANDS_CACHE_SIZE = 128
+
+MADE, SEVEN_OUT = 'MADE', 'SEVEN_OUT'
+
+#: Each roll from a puck location: probability and location after (SEVEN_OUT when the hand ends)
+_Transitions = typing.Mapping[PuckLocation, tuple[tuple[fractions.Fraction, typing.Union[PuckLocation, str]], ...]]
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class HandStats:
+    """
+    Statistics of a shooter's hand under a table configuration
+    """
+    config: Config  #: Table configuration
+    expected_rolls: fractions.Fraction  #: Expected number of rolls in a hand
+    rolls_variance: fractions.Fraction  #: Variance of the number of rolls in a hand
+    point_made: fractions.Fraction  #: Probability of making a point from a come out roll before sevening out
+    expected_come_out_rolls: fractions.Fraction  #: Expected rolls from a come out roll to a point made or seven out
+    _transitions: _Transitions = dataclasses.field(repr=False, default=None)
+    _rolls: list = dataclasses.field(repr=False, default_factory=list)
+
+    def expected_points(self) -> fractions.Fraction:
+        """
+        Expected number of points made in a hand
+
+        :rtype: fractions.Fraction
+        """
+        return self.point_made / (1 - self.point_made)
+
+    def points_variance(self) -> fractions.Fraction:
+        """
+        Variance of the number of points made in a hand
+
+        :rtype: fractions.Fraction
+        """
+        return self.point_made / (1 - self.point_made) ** 2
+
+    def probability_of_points(self, points: int) -> fractions.Fraction:
+        """
+        Probability a hand makes at least a number of points
+
+        Every point made returns the hand to a come out roll, so each further point is made with
+        the same probability.
+
+        :param points: Number of points
+        :type points: int
+        :rtype: fractions.Fraction
+        """
+        return self.point_made ** max(points, 0)
+
+    def points_distribution(self, max_points: int) -> tuple[fractions.Fraction, ...]:
+        """
+        Probability a hand makes exactly 0, 1, ... max_points points
+
+        :param max_points: Most points included
+        :type max_points: int
+        :rtype: tuple[fractions.Fraction, ...]
+        """
+        return tuple(self.point_made ** points * (1 - self.point_made) for points in range(max_points + 1))
+
+    def rolls_distribution(self, max_rolls: int) -> tuple[fractions.Fraction, ...]:
+        """
+        Probability a hand lasts exactly 1, 2, ... max_rolls rolls
+
+        Probabilities already worked out are kept, so asking for longer hands only does the
+        extra rolls.
+
+        :param max_rolls: Most rolls included
+        :type max_rolls: int
+        :rtype: tuple[fractions.Fraction, ...]
+        """
+        rolls = self._rolls
+        if not rolls:
+            rolls.append(({None: fractions.Fraction(1)}, None))
+        while len(rolls) <= max_rolls:
+            alive, _ = rolls[-1]
+            after, ended = {}, fractions.Fraction(0)
+            for location, probability in alive.items():
+                for chance, next_location in self._transitions[location]:
+                    if next_location == SEVEN_OUT:
+                        ended += probability * chance
+                    else:
+                        after[next_location] = after.get(next_location, 0) + probability * chance
+            rolls.append((after, ended))
+        return tuple(ended for _, ended in rolls[1:max_rolls + 1])
+
+    def probability_longer_than(self, rolls: int) -> fractions.Fraction:
+        """
+        Probability a hand lasts more than a number of rolls
+
+        :param rolls: Number of rolls
+        :type rolls: int
+        :rtype: fractions.Fraction
+        """
+        return 1 - sum(self.rolls_distribution(rolls))
+
+
+@functools.lru_cache(maxsize=HANDS_CACHE_SIZE)
+def hand_stats(config: typing.Optional[Config] = None) -> HandStats:
+    """
+    Statistics of a shooter's hand under a table configuration
+
+    :param config: Table configuration (default if omitted)
+    :type config: Config|None
+    :rtype: HandStats
+    """
+    if config is None:
+        return hand_stats(Config())
+    transitions = _puck_transitions(config)
+
+    def hand(location):
+        for probability, next_location in transitions[location]:
+            yield probability, Absorbed(SEVEN_OUT) if next_location == SEVEN_OUT else next_location, 0
+
+    def come_out(location):
+        for probability, next_location in transitions[location]:
+            if next_location == SEVEN_OUT:
+                yield probability, Absorbed(SEVEN_OUT), 0
+            elif location is not None and next_location is None:
+                yield probability, Absorbed(MADE), 0
+            else:
+                yield probability, next_location, 0
+
+    rolls = solve(None, hand)
+    points = solve(None, come_out)
+    return HandStats(config=config,
+                     expected_rolls=rolls.expected_steps,
+                     rolls_variance=rolls.steps_variance(),
+                     point_made=points.absorption.get(MADE, fractions.Fraction(0)),
+                     expected_come_out_rolls=points.expected_steps,
+                     _transitions=transitions)
+
+
+def _puck_transitions(config: Config) -> _Transitions:
+    transitions = {}
+    for location in [None, *sorted(config.rules().valid_points)]:
+        table = Table(config=config, puck_location=location)
+        row = []
+        for outcome in DiceOutcome.get_all_unique():
+            after = settle_table(table, outcome).puck_location
+            seven_out = location is not None and after is None and outcome.total() != location
+            row.append((fractions.Fraction(outcome.ways(), 36), SEVEN_OUT if seven_out else after))
+        transitions[location] = tuple(row)
+    return transitions
@@ -0,0 +1,195 @@
+"""
+Module: Craps.Analytics.House_Edge
+
+Exact expected value, house edge and variance of every bet, under any table configuration.
+
+A bet is followed from the moment it is made until its first decision: the roll it wins, loses,
+or is returned to the player. Bets that take many rolls to decide (line bets, Place, Buy, Lay,
+Hardways) are resolved as absorbing Markov chains over the puck and the bet's placement, with
+every roll settled by the engine's own rules (`settle_table`), so the numbers hold for the table
+exactly as the engine runs it. Results are cached per configuration.
+"""
+import dataclasses
+import fractions
+import functools
+import types
+import typing
+
+from craps.bet import BetSignature
+from craps.dice import Outcome as DiceOutcome
+from craps.table import bets as TableBets
+from craps.table.config import Config
+from craps.table.puck import PuckLocation
+from craps.table.settlement import settle_table
+from craps.table.table import Table
+from .markov import Absorbed, solve
+
+#: Wager every bet is evaluated at, a multiple of every payout and vig divisor of a standard table
+DEFAULT_WAGER = 120
+#: Puck location for bets without a point of their own that are made while the point is on
+DEFAULT_POINT = 6
+#: Number of configurations (and bets) kept
+EDGE_CACHE_SIZE = 128
+
+WIN, LOSE, PUSH = 'WIN', 'LOSE', 'PUSH'
+
+_BetKey = tuple  # (type, wager, odds, placement, override_puck)
+
+
+@dataclasses.dataclass(frozen=True)
+class BetEdge:
+    """
+    A bet followed until its first decision
+    """
+    signature: BetSignature  #: The bet as it was made
+    puck_location: PuckLocation  #: Location of the puck when the bet was made
+    expected_value: fractions.Fraction  #: Expected net result: the payout, or the stake lost
+    variance: fractions.Fraction  #: Variance of the net result
+    expected_rolls: fractions.Fraction  #: Expected number of rolls until the bet is decided
+    win: fractions.Fraction  #: Probability the bet wins
+    lose: fractions.Fraction  #: Probability the bet loses
+    push: fractions.Fraction  #: Probability the bet is returned to the player
+
+    def stake(self) -> int:
+        """
+        Wager and odds on the bet
+
+        :rtype: int
+        """
+        return self.signature.wager + (self.signature.odds or 0)
+
+    def house_edge(self) -> fractions.Fraction:
+        """
+        Expected loss per unit staked
+
+        :rtype: fractions.Fraction
+        """
+        return -self.expected_value / self.stake()
+
+    def edge_per_roll(self) -> fractions.Fraction:
+        """
+        Expected loss per unit staked per roll the bet is on the table
+
+        :rtype: fractions.Fraction
+        """
+        return self.house_edge() / self.expected_rolls
+
+
+def bet_edge(config: Config,
+             signature: typing.Union[BetSignature, dict],
+             puck_location: PuckLocation = None) -> BetEdge:
+    """
+    Exact expected value and variance of a bet, made with the puck where given
+
+    :param config: Table configuration
+    :type config: Config
+    :param signature: Bet signature (or its request representation)
+    :type signature: BetSignature|dict
+    :param puck_location: Location of the puck when the bet is made
+    :type puck_location: None|int
+    :rtype: BetEdge
+    :raise ValueError: if the bet is never decided (e.g. turned off)
+    """
+    table = Table(config=config, puck_location=puck_location, existing_bets=[signature])
+    bet = next(iter(table.bets))
+    return _bet_edge(config, puck_location, _bet_key(bet.get_signature()))
+
+
+def house_edges(config: typing.Optional[Config] = None,
+                wager: int = DEFAULT_WAGER,
+                with_odds: bool = False) -> typing.Mapping[tuple, BetEdge]:
+    """
+    Every bet type at every placement it can be made at, keyed by type name and placement
+
+    Pass Line and Don't Pass bets are made before a come out roll, and every other bet with the
+    point on its own placement (or on DEFAULT_POINT). With `with_odds`, line bets on a point
+    carry the most odds the configuration allows.
+
+    :param config: Table configuration (default if omitted)
+    :type config: Config|None
+    :param wager: Wager of every bet
+    :type wager: int
+    :param with_odds: Include the most odds allowed on line bets with a point
+    :type with_odds: bool
+    :rtype: typing.Mapping[tuple, BetEdge]
+    """
+    return _house_edges(config if config is not None else Config(), wager, with_odds)
+
+
+@functools.lru_cache(maxsize=EDGE_CACHE_SIZE)
+def _house_edges(config: Config, wager: int, with_odds: bool) -> typing.Mapping[tuple, BetEdge]:
+    rules = config.rules()
+    points = sorted(rules.valid_points)
+    line_types = [TableBets.PassLine, TableBets.Come] + \
+        ([] if rules.is_crapless else [TableBets.DontPass, TableBets.DontCome])
+    edges = {}
+
+    def add(bet_type, placement=None, puck_location=DEFAULT_POINT, odds=None):
+        signature = BetSignature(type=bet_type, wager=wager, odds=odds, placement=placement)
+        edges[(bet_type.__name__, placement)] = bet_edge(config, signature, puck_location)
+
+    for bet_type in line_types:
+        come_out = bet_type in (TableBets.PassLine, TableBets.DontPass)
+        add(bet_type, puck_location=None if come_out else DEFAULT_POINT)
+        if not with_odds:
+            continue
+        for point in points:
+            odds = bet_type(wager, table=Table(config=config, puck_location=point), placement=point).max_odds()
+            add(bet_type, point, point, odds)
+    for bet_type, placements in [(TableBets.Put, points),
+                                 (TableBets.Place, points),
+                                 (TableBets.Buy, points),
+                                 (TableBets.Lay, points),
+                                 (TableBets.Hardway, [4, 6, 8, 10]),
+                                 (TableBets.HornHigh, [2, 3, 11, 12])]:
+        for placement in placements:
+            add(bet_type, placement, placement if rules.is_point(placement) else DEFAULT_POINT)
+    for bet_type in [TableBets.Field, TableBets.AnySeven, TableBets.AnyCraps, TableBets.Horn,
+                     TableBets.World, TableBets.Craps3Way, TableBets.CE]:
+        add(bet_type)
+    for outcome in DiceOutcome.get_all_unique():
+        add(TableBets.Hop, outcome)
+    return types.MappingProxyType(edges)
+
+
+@functools.lru_cache(maxsize=EDGE_CACHE_SIZE * 64)
+def _bet_edge(config: Config, puck_location: PuckLocation, key: _BetKey) -> BetEdge:
+    outcomes = [(outcome, fractions.Fraction(outcome.ways(), 36)) for outcome in DiceOutcome.get_all_unique()]
+    stake = key[1] + (key[2] or 0)
+
+    def steps(state):
+        table = _table(config, *state)
+        for outcome, probability in outcomes:
+            settlement = settle_table(table, outcome)
+            record = settlement.settlements[0]
+            if record.is_winner():
+                yield probability, Absorbed(WIN), record.payout
+            elif record.is_loser():
+                yield probability, Absorbed(LOSE), -stake
+            elif record.returned:
+                yield probability, Absorbed(PUSH), 0
+            else:
+                moved = record.get_bet_after_roll().get_signature()
+                yield probability, (settlement.puck_location, _bet_key(moved)), 0
+
+    result = solve((puck_location, key), steps)
+    signature = _table(config, puck_location, key).get_bet_signatures()[0]
+    return BetEdge(signature=signature,
+                   puck_location=puck_location,
+                   expected_value=result.expected_reward,
+                   variance=result.reward_variance(),
+                   expected_rolls=result.expected_steps,
+                   win=result.absorption.get(WIN, fractions.Fraction(0)),
+                   lose=result.absorption.get(LOSE, fractions.Fraction(0)),
+                   push=result.absorption.get(PUSH, fractions.Fraction(0)))
+
+
+def _bet_key(signature: BetSignature) -> _BetKey:
+    return signature.type, signature.wager, signature.odds, signature.placement, signature.override_puck
+
+
+def _table(config: Config, puck_location: PuckLocation, key: _BetKey) -> Table:
+    bet_type, wager, odds, placement, override_puck = key
+    signature = BetSignature(type=bet_type, wager=wager, odds=odds, placement=placement,
+                             override_puck=override_puck)
+    return Table(config=config, puck_location=puck_location, existing_bets=[signature])
@@ -0,0 +1,152 @@
+"""
+Module: Craps.Analytics.Markov
+
+Exact solutions of absorbing Markov chains, in Fractions.
+
+A chain is given by its starting state and a function listing the steps out of any state: the
+probability of the step, the state it leads to (or `Absorbed` when the chain ends there), and a
+reward collected on the way. The states reachable from the start are found, and the expected
+reward and number of steps (and their second moments) and the probability of ending in each
+absorbing label are found by solving the chain's linear equations exactly.
+"""
+import collections
+import dataclasses
+import fractions
+import typing
+
+#: Most transient states a chain may have
+MAX_STATES = 5000
+
+
+class Absorbed(typing.NamedTuple):
+    """
+    End of the chain, with a label for how it ended
+    """
+    label: typing.Hashable  #: How the chain ended (e.g. won or lost)
+
+
+#: A step out of a state: probability, next state (or Absorbed), and reward collected
+Step = tuple[fractions.Fraction, typing.Hashable, int]
+
+
+@dataclasses.dataclass(frozen=True)
+class ChainResult:
+    """
+    Exact moments of an absorbing chain from its starting state
+    """
+    expected_reward: fractions.Fraction  #: Expected total reward
+    reward_second_moment: fractions.Fraction  #: Expected square of the total reward
+    expected_steps: fractions.Fraction  #: Expected number of steps until absorbed
+    steps_second_moment: fractions.Fraction  #: Expected square of the number of steps
+    absorption: typing.Mapping[typing.Hashable, fractions.Fraction]  #: Probability of ending in each label
+    states: int  #: Number of transient states
+
+    def reward_variance(self) -> fractions.Fraction:
+        """
+        Variance of the total reward
+
+        :rtype: fractions.Fraction
+        """
+        return self.reward_second_moment - self.expected_reward ** 2
+
+    def steps_variance(self) -> fractions.Fraction:
+        """
+        Variance of the number of steps
+
+        :rtype: fractions.Fraction
+        """
+        return self.steps_second_moment - self.expected_steps ** 2
+
+
+def solve(start: typing.Hashable, steps: typing.Callable[[typing.Hashable], typing.Iterable[Step]]) -> ChainResult:
+    """
+    Solve an absorbing chain from its starting state
+
+    :param start: Starting state (must not be Absorbed)
+    :type start: typing.Hashable
+    :param steps: Steps out of a state, with probabilities adding up to one
+    :type steps: typing.Callable
+    :rtype: ChainResult
+    :raise ValueError: if the chain has more than MAX_STATES states, or can not be absorbed from every state
+    """
+    states, rows = _explore(start, steps)
+    size = len(states)
+    labels = sorted({target.label for row in rows for _, target, _ in row if isinstance(target, Absorbed)},
+                    key=repr)
+    matrix = [[fractions.Fraction(int(row == column)) for column in range(size)] for row in range(size)]
+    first = []
+    for index, row in enumerate(rows):
+        reward = steps_taken = fractions.Fraction(0)
+        absorbed = dict.fromkeys(labels, fractions.Fraction(0))
+        for probability, target, amount in row:
+            reward += probability * amount
+            steps_taken += probability
+            if isinstance(target, Absorbed):
+                absorbed[target.label] += probability
+            else:
+                matrix[index][target] -= probability
+        first.append([reward, steps_taken, *absorbed.values()])
+    expected_reward, expected_steps, *absorption = _solve(matrix, first)
+
+    second = []
+    for row in rows:
+        reward = steps_taken = fractions.Fraction(0)
+        for probability, target, amount in row:
+            after_reward = 0 if isinstance(target, Absorbed) else expected_reward[target]
+            after_steps = 0 if isinstance(target, Absorbed) else expected_steps[target]
+            reward += probability * (amount * amount + 2 * amount * after_reward)
+            steps_taken += probability * (1 + 2 * after_steps)
+        second.append([reward, steps_taken])
+    reward_second_moment, steps_second_moment = _solve(matrix, second)
+
+    return ChainResult(expected_reward=expected_reward[0],
+                       reward_second_moment=reward_second_moment[0],
+                       expected_steps=expected_steps[0],
+                       steps_second_moment=steps_second_moment[0],
+                       absorption={label: column[0] for label, column in zip(labels, absorption)},
+                       states=size)
+
+
+def _explore(start, steps) -> tuple[list, list[list[tuple[fractions.Fraction, typing.Any, int]]]]:
+    """States reachable from the start, and the steps out of each with targets as state indexes"""
+    states, index, rows = [start], {start: 0}, []
+    queue = collections.deque([start])
+    while queue:
+        row = []
+        for probability, target, reward in steps(queue.popleft()):
+            if not isinstance(target, Absorbed):
+                if target not in index:
+                    if len(states) >= MAX_STATES:
+                        raise ValueError(f'Chain has more than {MAX_STATES} states')
+                    index[target] = len(states)
+                    states.append(target)
+                    queue.append(target)
+                target = index[target]
+            row.append((fractions.Fraction(probability), target, reward))
+        rows.append(row)
+    return states, rows
+
+
+def _solve(matrix: list[list[fractions.Fraction]],
+           columns: list[list[fractions.Fraction]]) -> list[list[fractions.Fraction]]:
+    """Solve matrix * x = column for every column by Gauss-Jordan elimination, returning x per column"""
+    size = len(matrix)
+    augmented = [list(matrix[row]) + list(columns[row]) for row in range(size)]
+    for pivot in range(size):
+        found = next((row for row in range(pivot, size) if augmented[row][pivot]), None)
+        if found is None:
+            raise ValueError('Chain can not be absorbed from every state')
+        augmented[pivot], augmented[found] = augmented[found], augmented[pivot]
+        pivot_row = augmented[pivot]
+        scale = pivot_row[pivot]
+        if scale != 1:
+            pivot_row[pivot:] = [value / scale for value in pivot_row[pivot:]]
+        for row in range(size):
+            factor = augmented[row][pivot]
+            if row != pivot and factor:
+                target = augmented[row]
+                for column in range(pivot, len(target)):
+                    if pivot_row[column]:
+                        target[column] -= factor * pivot_row[column]
+    width = len(columns[0]) if columns else 0
+    return [[augmented[row][size + column] for row in range(size)] for column in range(width)]
@@ -0,0 +1,236 @@
+"""
+Module: Craps.Analytics.Simulation
+
+Monte Carlo simulation of many independent games at once.
+
+A strategy is run against a table until every table state it can lead to is known. Each state
+is settled against every outcome of the dice by the engine's own rules (`settle_table`), which
+gives a transition table: the next state and the player's net result for each state and
+outcome. Games are then played as arrays of state indices, with all their dice drawn in one
+NumPy call per roll.
+"""
+import collections
+import copy
+import dataclasses
+import typing
+
+import numpy
+
+from craps.dice import Outcome as DiceOutcome
+from craps.table.bet_abstracts import BetAbstract
+from craps.table.config import Config
+from craps.table.puck import PuckLocation
+from craps.table.settlement import settle_table
+from craps.table.table import Table
+from .vectors import OUTCOME_CODES
+
+#: Instructions (as in a request) for the table before each roll, given the table as it stands
+Strategy = typing.Callable[[Table], typing.Optional[dict]]
+#: Most table states a strategy may lead to
+MAX_STATES = 10000
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class SimulationResult:
+    """
+    Results of a simulation
+
+    Wealth is the player's cash plus the stakes (wagers and odds) they have on the table.
+    """
+    games: int  #: Number of games played
+    rolls: int  #: Number of rolls in each game
+    bankroll: int  #: Wealth each game started with
+    final_wealth: numpy.ndarray  #: Wealth of each game after the last roll
+    resolved: numpy.ndarray  #: Total stakes of the bets that won or lost, for each game
+    final_states: numpy.ndarray  #: Index (in the transition table) of the state each game ended in
+    #: Wealth of each game before the first and after every roll (games x rolls + 1), if recorded
+    trajectories: typing.Optional[numpy.ndarray] = None
+
+    def mean_result(self) -> float:
+        """
+        Average change in wealth per game
+
+        :rtype: float
+        """
+        return float(self.final_wealth.mean()) - self.bankroll
+
+    def edge_per_unit_resolved(self) -> float:
+        """
+        Average loss per unit of resolved action (the house edge on the bets made)
+
+        :rtype: float
+        """
+        resolved = int(self.resolved.sum())
+        if not resolved:
+            return 0.0
+        return -int((self.final_wealth - self.bankroll).sum()) / resolved
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class TransitionTable:
+    """
+    Every table state a strategy leads to, settled against every distinct outcome of the dice
+
+    Arrays have a row per state and a column per outcome code (see `Outcome.code()`).
+    """
+    states: tuple[Table, ...]  #: Each state: the table before the strategy acts (not to be changed)
+    next_state: numpy.ndarray  #: Index of the state after the roll
+    net: numpy.ndarray  #: Player's net result of the roll: winnings less stakes of losing bets
+    resolved: numpy.ndarray  #: Stakes of the bets that won or lost
+
+    def table(self, state: int) -> Table:
+        """
+        Copy of the table for a state
+
+        :param state: State index
+        :type state: int
+        :rtype: Table
+        """
+        table = self.states[state]
+        return _rebuild(table.config, table.puck.location(), table.bets)
+
+    def simulate(self,
+                 games: int,
+                 rolls: int,
+                 bankroll: int = 0,
+                 seed: typing.Union[int, numpy.random.Generator, None] = None,
+                 record: bool = False) -> SimulationResult:
+        """
+        Play games from the first state
+
+        :param games: Number of independent games
+        :type games: int
+        :param rolls: Number of rolls in each game
+        :type rolls: int
+        :param bankroll: Wealth each game starts with
+        :type bankroll: int
+        :param seed: Seed (or generator) for the dice
+        :type seed: int|numpy.random.Generator|None
+        :param record: Keep the wealth of every game after every roll
+        :type record: bool
+        :rtype: SimulationResult
+        """
+        rng = numpy.random.default_rng(seed)
+        state = numpy.zeros(games, dtype=numpy.int64)
+        wealth = numpy.full(games, bankroll, dtype=numpy.int64)
+        resolved = numpy.zeros(games, dtype=numpy.int64)
+        trajectories = numpy.empty((games, rolls + 1), dtype=numpy.int64) if record else None
+        if record:
+            trajectories[:, 0] = wealth
+        for roll in range(rolls):
+            outcome = OUTCOME_CODES[rng.integers(0, len(OUTCOME_CODES), size=games)]
+            wealth += self.net[state, outcome]
+            resolved += self.resolved[state, outcome]
+            state = self.next_state[state, outcome]
+            if record:
+                trajectories[:, roll + 1] = wealth
+        return SimulationResult(games=games, rolls=rolls, bankroll=bankroll, final_wealth=wealth,
+                                resolved=resolved, final_states=state, trajectories=trajectories)
+
+
+def build_transitions(table: Table, strategy: typing.Optional[Strategy] = None) -> TransitionTable:
+    """
+    Find every state a strategy leads to from a table, and settle each against every outcome
+
+    The strategy must depend only on the table it is given (puck and bets), as states are
+    settled once and reused.
+
+    :param table: Table the games start from
+    :type table: Table
+    :param strategy: Instructions for the table before each roll (none if omitted)
+    :type strategy: Strategy|None
+    :rtype: TransitionTable
+    :raise ValueError: if the strategy leads to more than MAX_STATES states
+    """
+    outcomes = DiceOutcome.get_all_unique()
+    states = [_rebuild(table.config, table.puck.location(), table.bets)]
+    index = {_state_key(states[0]): 0}
+    next_state, net, resolved = [], [], []
+    queue = collections.deque([0])
+    while queue:
+        state = states[queue.popleft()]
+        current = _rebuild(state.config, state.puck.location(), state.bets)
+        instructions = strategy(current) if strategy else None
+        if instructions:
+            current.process_instructions(instructions)
+        row_next, row_net, row_resolved = [], [], []
+        for outcome in outcomes:
+            settlement = settle_table(current, outcome)
+            after = _rebuild(current.config, settlement.puck_location, settlement.bets_after_roll())
+            key = _state_key(after)
+            if key not in index:
+                if len(states) >= MAX_STATES:
+                    raise ValueError(f'Strategy leads to more than {MAX_STATES} table states')
+                index[key] = len(states)
+                states.append(after)
+                queue.append(index[key])
+            lost = sum(_stake(bet) for bet in settlement.losers())
+            row_next.append(index[key])
+            row_net.append(settlement.total_winnings - lost)
+            row_resolved.append(lost + sum(_stake(record.bet) for record in settlement.winners()))
+        next_state.append(row_next)
+        net.append(row_net)
+        resolved.append(row_resolved)
+    return TransitionTable(states=tuple(states),
+                           next_state=numpy.array(next_state, dtype=numpy.int64),
+                           net=numpy.array(net, dtype=numpy.int64),
+                           resolved=numpy.array(resolved, dtype=numpy.int64))
+
+
+def simulate(table: Table,
+             strategy: typing.Optional[Strategy] = None,
+             games: int = 1000,
+             rolls: int = 100,
+             bankroll: int = 0,
+             seed: typing.Union[int, numpy.random.Generator, None] = None,
+             record: bool = False) -> SimulationResult:
+    """
+    Play many independent games of a strategy from a table
+
+    :param table: Table the games start from
+    :type table: Table
+    :param strategy: Instructions for the table before each roll (none if omitted)
+    :type strategy: Strategy|None
+    :param games: Number of independent games
+    :type games: int
+    :param rolls: Number of rolls in each game
+    :type rolls: int
+    :param bankroll: Wealth each game starts with
+    :type bankroll: int
+    :param seed: Seed (or generator) for the dice
+    :type seed: int|numpy.random.Generator|None
+    :param record: Keep the wealth of every game after every roll
+    :type record: bool
+    :rtype: SimulationResult
+    """
+    return build_transitions(table, strategy).simulate(games, rolls, bankroll, seed, record)
+
+
+def _stake(bet) -> int:
+    return bet.wager + (bet.odds or 0)
+
+
+def _state_key(table: Table) -> tuple:
+    signatures = (bet.get_signature() for bet in table.bets)
+    return table.puck.location(), tuple(sorted(((signature.type.__name__, signature.wager, signature.odds,
+                                                 repr(signature.placement), signature.override_puck)
+                                                for signature in signatures)))
+
+
+def _rebuild(config: Config, puck_location: PuckLocation, bets: typing.Iterable[BetAbstract]) -> Table:
+    """
+    A new table holding copies of bets, as `Engine.advance_table` leaves the live table
+
+    Bets are copied rather than rebuilt from their signatures, as a bet may have been left in
+    a state its signature cannot be placed in (a Pass Line keeps its odds after winning).
+    """
+    table = Table(config=config, puck_location=puck_location)
+    copies = []
+    for bet in bets:
+        bet = copy.copy(bet)
+        # pylint: disable=protected-access
+        # Copies belong to the new table, as bets left on the live table do
+        bet._table = table
+        copies.append(bet)
+    table.bets = copies
+    return table
@@ -0,0 +1,337 @@
+"""
+Module: Craps.Analytics.Vectors
+
+Bets compiled into NumPy arrays over the 36 combinations of two dice.
+
+Bets are settled by the engine's own rules (`settle_table`) once for each distinct outcome, and
+the results laid out as arrays, so whole tables can be settled or evaluated with array
+operations. Bets are compiled once per configuration, puck location, bet type, placement and
+toggle, at a wager every payout ratio of the rules divides exactly, and the payouts scaled to
+each wager and odds as `scale` would pay them.
+"""
+import dataclasses
+import fractions
+import functools
+import math
+import typing
+
+import numpy
+
+from craps.bet import BetSignature
+from craps.dice import Outcome as DiceOutcome
+from craps.table.bet_abstracts import BetAbstract
+from craps.table.bets import Come
+from craps.table.config import Config
+from craps.table.config.rules import VIG
+from craps.table.puck import PuckLocation
+from craps.table.settlement import BetSettlement, settle_table
+from craps.table.table import Table
+
+#: The 36 combinations of two dice, in the order of every vector's entries
+OUTCOMES: tuple[DiceOutcome, ...] = tuple(DiceOutcome.get_all())
+#: Code (see `Outcome.code()`) of each combination
+OUTCOME_CODES = numpy.array([outcome.code() for outcome in OUTCOMES])
+#: Dice total of each combination
+TOTALS = numpy.array([outcome.total() for outcome in OUTCOMES])
+#: Placement vector entry for a bet (or puck) without a placement
+NO_PLACEMENT = 0
+#: Placement vector entry for placements that are not a number (hop bets never move)
+OTHER_PLACEMENT = -1
+#: Number of compiled bets kept (each serves every wager and odds)
+COMPILE_CACHE_SIZE = 4096
+
+_UnitKey = tuple  # (type, has odds, placement, override_puck)
+_RatioVector = tuple[numpy.ndarray, numpy.ndarray]  # (numerators, denominators)
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class BetVectors:
+    """
+    A bet settled against each of the 36 combinations of two dice
+
+    Arrays are read-only, as compiled bets are shared.
+    """
+    signature: BetSignature  #: The bet as it was before the roll
+    is_on: bool  #: Bet is active for the roll
+    win: numpy.ndarray  #: Bet wins (bool)
+    lose: numpy.ndarray  #: Bet loses (bool)
+    payout: numpy.ndarray  #: Amount paid to the player, less any vig (int)
+    returned: numpy.ndarray  #: Bet is taken down and returned to the player (bool)
+    #: Placement after the roll (NO_PLACEMENT for None, OTHER_PLACEMENT for hop dice) (int)
+    next_placement: numpy.ndarray
+
+    def stake(self) -> int:
+        """
+        Wager and odds, lost when the bet loses
+
+        :rtype: int
+        """
+        return self.signature.wager + (self.signature.odds or 0)
+
+    def net(self) -> numpy.ndarray:
+        """
+        Player's net result: the payout, or the stake lost
+
+        :rtype: numpy.ndarray
+        """
+        return self.payout - self.lose * self.stake()
+
+    def remains(self) -> numpy.ndarray:
+        """
+        Bet stays on the table after the roll (bool)
+
+        :rtype: numpy.ndarray
+        """
+        return ~self.lose & ~self.returned
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class TableVectors:
+    """
+    Every bet on a table settled against each of the 36 combinations of two dice
+
+    Matrices have a row per bet (in `bets` order) and a column per combination.
+    """
+    bets: tuple[BetVectors, ...]  #: Each bet compiled
+    puck_after: numpy.ndarray  #: Puck location after the roll (NO_PLACEMENT when off)
+
+    @classmethod
+    def from_table(cls, table: Table) -> 'TableVectors':
+        """
+        Compile every bet on a table
+
+        Bets are compiled (and cached) one at a time, except on tables where Come bets can
+        change how other Come, Put, or Pass Line bets travel, which are settled as a whole.
+
+        :param table: Table to compile
+        :type table: Table
+        :rtype: TableVectors
+        """
+        if _has_come_interplay(table):
+            bets = _compile_table(table)
+        else:
+            bets = tuple(compile_bet(bet) for bet in table.bets)
+        return cls(bets=bets, puck_after=_puck_after(table.config, table.puck.location()))
+
+    def _matrix(self, name: str, dtype) -> numpy.ndarray:
+        if not self.bets:
+            return numpy.zeros((0, len(OUTCOMES)), dtype=dtype)
+        return numpy.stack([getattr(bet, name) for bet in self.bets])
+
+    def win(self) -> numpy.ndarray:
+        """
+        Winning bets (bool matrix)
+
+        :rtype: numpy.ndarray
+        """
+        return self._matrix('win', bool)
+
+    def lose(self) -> numpy.ndarray:
+        """
+        Losing bets (bool matrix)
+
+        :rtype: numpy.ndarray
+        """
+        return self._matrix('lose', bool)
+
+    def payout(self) -> numpy.ndarray:
+        """
+        Payout of each bet (int matrix)
+
+        :rtype: numpy.ndarray
+        """
+        return self._matrix('payout', numpy.int64)
+
+    def stakes(self) -> numpy.ndarray:
+        """
+        Wager and odds of each bet
+
+        :rtype: numpy.ndarray
+        """
+        return numpy.array([bet.stake() for bet in self.bets], dtype=numpy.int64)
+
+    def total_winnings(self) -> numpy.ndarray:
+        """
+        Total paid to the player for each combination
+
+        :rtype: numpy.ndarray
+        """
+        return self.payout().sum(axis=0)
+
+    def net(self) -> numpy.ndarray:
+        """
+        Player's net result for each combination: winnings less the stakes of losing bets
+
+        :rtype: numpy.ndarray
+        """
+        return self.total_winnings() - (self.lose() * self.stakes()[:, numpy.newaxis]).sum(axis=0)
+
+    def expected_value(self) -> fractions.Fraction:
+        """
+        Exact expected net result of the roll
+
+        :rtype: fractions.Fraction
+        """
+        return fractions.Fraction(int(self.net().sum()), len(OUTCOMES))
+
+    def variance(self) -> fractions.Fraction:
+        """
+        Exact variance of the net result of the roll
+
+        :rtype: fractions.Fraction
+        """
+        net = self.net()
+        return fractions.Fraction(int((net * net).sum()), len(OUTCOMES)) - self.expected_value() ** 2
+
+
+def compile_bet(bet: BetAbstract) -> BetVectors:
+    """
+    Compile a bet, as it stands alone on its table
+
+    :param bet: Bet to compile
+    :type bet: BetAbstract
+    :rtype: BetVectors
+    """
+    # pylint: disable=protected-access
+    # The bet's own table holds the configuration and puck it is settled under
+    table = bet._table
+    signature = bet.get_signature()
+    return _compile_bet(table.config, table.puck.location(), _unit_key(signature)).scaled(signature)
+
+
+def compile_signature(config: Config, puck_location: PuckLocation,
+                      signature: typing.Union[BetSignature, dict]) -> BetVectors:
+    """
+    Compile a bet from its signature
+
+    :param config: Table configuration
+    :type config: Config
+    :param puck_location: Location of the puck
+    :type puck_location: None|int
+    :param signature: Bet signature (or its request representation)
+    :type signature: BetSignature|dict
+    :rtype: BetVectors
+    """
+    table = Table(config=config, puck_location=puck_location)
+    return compile_bet(BetAbstract.from_signature(signature, table=table))
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class _UnitBet:
+    """A bet compiled for every wager and odds: its payouts as ratios of the wager and odds"""
+    vectors: BetVectors  #: The bet compiled at the probe wager (and odds)
+    wager_pays: _RatioVector  #: Paid per unit of wager, before any vig
+    odds_pays: _RatioVector  #: Paid per unit of odds
+    vig: _RatioVector  #: Vig taken per unit of wager
+
+    def scaled(self, signature: BetSignature) -> BetVectors:
+        """The bet compiled at the wager and odds of a signature"""
+        payout = _scale(signature.wager, self.wager_pays) - _scale(signature.wager, self.vig)
+        if signature.odds:
+            payout = payout + _scale(signature.odds, self.odds_pays)
+        return dataclasses.replace(
+            self.vectors,
+            signature=dataclasses.replace(self.vectors.signature, wager=signature.wager,
+                                          odds=signature.odds or self.vectors.signature.odds),
+            payout=_read_only(payout))
+
+
+def _unit_key(signature: BetSignature) -> _UnitKey:
+    # Odds a Pass Line keeps after winning have no point to be paid on: the bet is compiled
+    # flat, its odds only staked
+    has_odds = bool(signature.odds) and signature.placement is not None
+    return signature.type, has_odds, signature.placement, signature.override_puck
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile_bet(config: Config, puck_location: PuckLocation, key: _UnitKey) -> _UnitBet:
+    bet_type, has_odds, placement, override_puck = key
+    amount = _probe_amount(config, bet_type)
+
+    def settle(odds) -> list[BetSettlement]:
+        signature = BetSignature(type=bet_type, wager=amount, odds=odds, placement=placement,
+                                 override_puck=override_puck)
+        table = Table(config=config, puck_location=puck_location, existing_bets=[signature])
+        return [settle_table(table, outcome).settlements[0]
+                for outcome in DiceOutcome.get_all_unique()]
+
+    def amounts(values) -> numpy.ndarray:
+        return numpy.array(list(values), dtype=numpy.int64)[OUTCOME_CODES]
+
+    records = settle(None)
+    payout = amounts(record.payout for record in records)
+    vig = amounts(record.vig or 0 for record in records)
+    odds_payout = payout
+    if has_odds:
+        records = settle(amount)
+        odds_payout = amounts(record.payout for record in records)
+    return _UnitBet(vectors=_vectors(records),
+                    wager_pays=_ratio_vector(payout + vig, amount),
+                    odds_pays=_ratio_vector(odds_payout - payout, amount),
+                    vig=_ratio_vector(vig, amount))
+
+
+def _probe_amount(config: Config, bet_type: type) -> int:
+    """Smallest wager every ratio of the rules (and the bet's own split) divides exactly"""
+    rules = config.rules()
+    denominators = {denominator
+                    for ratios in (rules.true_odds, rules.lay_odds, rules.lay_vig, rules.place_odds)
+                    for _, denominator in ratios.values()}
+    return math.lcm(VIG[1], bet_type.multi_bet or 1, *denominators)
+
+
+def _ratio_vector(paid: numpy.ndarray, amount: int) -> _RatioVector:
+    divisor = numpy.gcd(paid, amount)
+    return _read_only(paid // divisor), _read_only(amount // divisor)
+
+
+def _scale(amount: int, ratio: _RatioVector) -> numpy.ndarray:
+    """`scale` of an amount by each ratio, truncated toward zero"""
+    numerators, denominators = ratio
+    product = amount * numerators
+    return numpy.where(product < 0, -(-product // denominators), product // denominators)
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _puck_after(config: Config, puck_location: PuckLocation) -> numpy.ndarray:
+    table = Table(config=config, puck_location=puck_location)
+    unique = numpy.array([_placement_entry(settle_table(table, outcome).puck_location)
+                          for outcome in DiceOutcome.get_all_unique()])
+    return _read_only(unique[OUTCOME_CODES])
+
+
+def _compile_table(table: Table) -> tuple[BetVectors, ...]:
+    settlements = [settle_table(table, outcome).settlements for outcome in DiceOutcome.get_all_unique()]
+    return tuple(_vectors([by_outcome[index] for by_outcome in settlements])
+                 for index in range(len(table.bets)))
+
+
+def _vectors(records: list[BetSettlement]) -> BetVectors:
+    def vector(values, dtype):
+        return _read_only(numpy.array(values, dtype=dtype)[OUTCOME_CODES])
+
+    return BetVectors(
+        signature=records[0].bet.get_signature(),
+        is_on=records[0].is_on,
+        win=vector([record.is_winner() for record in records], bool),
+        lose=vector([record.is_loser() for record in records], bool),
+        payout=vector([record.payout for record in records], numpy.int64),
+        returned=vector([record.returned for record in records], bool),
+        next_placement=vector([_placement_entry(record.next_placement) for record in records], numpy.int64),
+    )
+
+
+def _placement_entry(placement) -> int:
+    if placement is None:
+        return NO_PLACEMENT
+    return placement if isinstance(placement, int) else OTHER_PLACEMENT
+
+
+def _read_only(array: numpy.ndarray) -> numpy.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+def _has_come_interplay(table: Table) -> bool:
+    come_family = [bet for bet in table.bets.traveling() if isinstance(bet, Come)]
+    return len(come_family) > 1 and any(bet.__class__ is Come for bet in come_family)
@@ -9,10 +9,15 @@ class Outcome:
     """
     A roll of the craps dice.
 
-    Object is immutable and provides a consistent hash for dictionary keys
+    Object is immutable and provides a consistent hash for dictionary keys.
+
+    There is exactly one instance for each of the 21 distinct outcomes: constructing an Outcome
+    returns the shared instance, so equality and hashing are identity and integer operations.
 
     Methods
     -------
+    code(): int
+        Small integer (0-20) identifying the outcome.
     is_hard(): bool
         A boolean for if the roll is hard or easy.
 
@@ -22,20 +27,68 @@ class Outcome:
         Instance simplified to built-in classes.
     get_all(): list[Outcome]
         A list of all possible combinations of dice.
-    get_all(): list[Outcome]
+    get_all_unique(): list[Outcome]
         A list of all unique combinations of dice
 
         [x, y] is considered the same as [y, x].
+    from_code(code): Outcome
+        The outcome for a code.
+    ways_to_roll(total): int
+        Number of the 36 combinations of two dice that add up to a total.
     total(): int
         Dice total (2-12).
+    ways(): int
+        Number of the 36 combinations of two dice that make this outcome.
     """
+    __slots__ = ('_d1', '_d2', '_code', '_total', '_hard', '_repr')
     _d1: int
     _d2: int
-
-    def __init__(self, first_die: int, second_die: int):
+    _code: int
+    _total: int
+    _hard: bool
+    _repr: str
+
+    def __new__(cls, first_die: int, second_die: int):
+        try:
+            return _INTERNED[(first_die, second_die)]
+        except (KeyError, TypeError):
+            pass
         if first_die not in range(1, 7) or second_die not in range(1, 7):
             raise ValueError("Dice value must be between 1 and 6")
-        self._d1, self._d2 = sorted([first_die, second_die])
+        return _INTERNED[(int(first_die), int(second_die))]
+
+    @classmethod
+    def _intern(cls, code: int, first_die: int, second_die: int):
+        outcome = object.__new__(cls)
+        for name, value in [('_d1', first_die),
+                            ('_d2', second_die),
+                            ('_code', code),
+                            ('_total', first_die + second_die),
+                            ('_hard', first_die == second_die),
+                            ('_repr', f"{cls.__name__}({first_die}, {second_die})")]:
+            object.__setattr__(outcome, name, value)
+        return outcome
+
+    def code(self):
+        """
+        Small integer (0-20) identifying the outcome.
+
+        Codes follow the order of `get_all_unique()`.
+
+        :return: int
+        """
+        return self._code
+
+    @classmethod
+    def from_code(cls, code: int):
+        """
+        The outcome for a code.
+
+        :param code: Code from `code()`
+        :type code: int
+        :return: Outcome
+        """
+        return _UNIQUE[code]
 
     def for_json(self):
         """
@@ -54,7 +107,26 @@ class Outcome:
 
         :return: bool
         """
-        return self._d1 == self._d2
+        return self._hard
+
+    def ways(self):
+        """
+        Number of the 36 combinations of two dice that make this outcome.
+
+        :return: int (1 for a hard roll, 2 otherwise)
+        """
+        return 1 if self._hard else 2
+
+    @staticmethod
+    def ways_to_roll(total: int):
+        """
+        Number of the 36 combinations of two dice that add up to a total.
+
+        :param total: Dice total
+        :type total: int
+        :return: int (0 for totals the dice can not make)
+        """
+        return _WAYS_TO_ROLL.get(total, 0)
 
     @classmethod
     def get_all(cls):
@@ -63,7 +135,7 @@ class Outcome:
 
         :return: list[Outcome]
         """
-        return [cls(d1, d2) for d1, d2 in list(product(range(1, 7), repeat=2))]
+        return list(_ALL)
 
     @classmethod
     def get_all_unique(cls):
@@ -74,7 +146,7 @@ class Outcome:
 
         :return: list[Outcome]
         """
-        return [cls(d1, d2) for d1, d2 in list(combinations_with_replacement(range(1, 7), 2))]
+        return list(_UNIQUE)
 
     def total(self):
         """
@@ -82,19 +154,42 @@ class Outcome:
 
         :return: int
         """
-        return self._d1 + self._d2
+        return self._total
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __reduce__(self):
+        return self.__class__, (self._d1, self._d2)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __eq__(self, other):
-        return repr(self) == repr(other)
+        return self is other
 
     def __ne__(self, other):
-        return not self.__eq__(other)
+        return self is not other
 
     def __hash__(self):
-        return hash(tuple(sorted([self._d1, self._d2])))
+        return self._code
 
     def __str__(self):
-        return f"({', '.join(sorted([str(self._d1), str(self._d2)]))})"
+        return f"({self._d1}, {self._d2})"
 
     def __repr__(self):
-        return f"{self.__class__.__name__}{str(self)}"
+        return self._repr
+
+
+_UNIQUE = tuple(Outcome._intern(code, d1, d2) for code, (d1, d2) in
+                enumerate(combinations_with_replacement(range(1, 7), 2)))
+_INTERNED = {(d1, d2): outcome for outcome in _UNIQUE for d1, d2 in
+             [(outcome._d1, outcome._d2), (outcome._d2, outcome._d1)]}
+_ALL = tuple(_INTERNED[pair] for pair in product(range(1, 7), repeat=2))
+_WAYS_TO_ROLL = {total: sum(1 for outcome in _ALL if outcome.total() == total) for total in range(2, 13)}
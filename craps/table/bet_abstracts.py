@@ -8,6 +8,7 @@ from importlib import import_module
 from craps.bet import BetStatus, InvalidBetException, BadBetActionException, BetSignature, \
     BetInterface, FairOdds, BetPlacement
 from craps.dice import Outcome as DiceOutcome
+from craps.table.config.rules import VIG, scale
 from craps.table.interface import TableInterface
 
 
@@ -126,15 +127,12 @@ class BetAbstract(BetInterface):
         :type table: TableInterface
         :return: net Bet Instance
         :rtype: BetAbstract
+        :raise InvalidBetException: on an unknown bet type
         """
         if isinstance(signature, dict):
+            signature = dict(signature)
             if isinstance(signature['type'], str):
-                bets_module_name = str(__name__).replace('bet_abstracts', 'bets')
-                if bets_module_name not in sys.modules:
-                    import_module('.'+bets_module_name, __package__)
-                concrete_bets_module = sys.modules[bets_module_name]
-                lower_dict = {a.lower(): a for a in dir(concrete_bets_module) if a[0:2] != '__'}
-                signature['type'] = getattr(concrete_bets_module, lower_dict[signature['type'].lower()])
+                signature['type'] = get_bet_type(signature['type'])
             if signature['type'] == BetAbstract or not issubclass(signature['type'], BetAbstract):
                 raise InvalidBetException(f"{signature['type'].__name__} is not a valid Bet Class")
             signature = BetSignature(**signature)
@@ -165,7 +163,7 @@ class BetAbstract(BetInterface):
 
         :rtype: int
         """
-        return int(self.wager * .05) if self.has_vig else 0
+        return scale(self.wager, VIG) if self.has_vig else 0
 
     def set_odds(self, odds: int):
         """
@@ -173,6 +171,8 @@ class BetAbstract(BetInterface):
 
         :raise InvalidBet: if odds are too much or cannot be placed on bet
         """
+        if self.allow_odds and self.placement is None:
+            raise InvalidBetException(f'Cannot place odds on {self.__class__.__name__} bet without a point')
         max_odds = self.max_odds()
         if self.allow_odds and 0 < odds <= max_odds:
             self.odds = odds
@@ -265,6 +265,66 @@ class BetAbstract(BetInterface):
 
 ConcreteBetSet = set[BetAbstract]
 
+_bet_types: dict[str, type[BetAbstract]] = {}  # lowercase name or alias -> bet class
+_bet_types_loaded = False
+
+
+def register_bet_type(bet_class: type[BetAbstract], *aliases: str) -> type[BetAbstract]:
+    """
+    Register a bet class so signatures can refer to it by name
+
+    The class is registered under its own name and any aliases, ignoring case. A later
+    registration of the same name replaces the earlier one. Can be used as a class decorator.
+
+    :param bet_class: Concrete bet class
+    :type bet_class: type[BetAbstract]
+    :param aliases: Other names for the bet
+    :type aliases: str
+    :return: the bet class
+    :rtype: type[BetAbstract]
+    :raise InvalidBetException: if the class is not a concrete bet class
+    """
+    if not isinstance(bet_class, type) or bet_class == BetAbstract \
+            or not issubclass(bet_class, BetAbstract):
+        raise InvalidBetException(f'{bet_class!r} is not a valid Bet Class')
+    _load_bet_types()
+    for name in (bet_class.__name__, *aliases):
+        _bet_types[name.lower()] = bet_class
+    return bet_class
+
+
+def get_bet_type(name: str) -> type[BetAbstract]:
+    """
+    Bet class registered under a name
+
+    :param name: Bet type name or alias (case insensitive)
+    :type name: str
+    :rtype: type[BetAbstract]
+    :raise InvalidBetException: on an unknown bet type
+    """
+    _load_bet_types()
+    try:
+        return _bet_types[name.lower()]
+    except KeyError:
+        raise InvalidBetException(f'Unknown bet type {name}') from None
+
+
+def _load_bet_types():
+    # pylint: disable=global-statement
+    # The concrete bets module imports this one, so it is scanned on first use
+    global _bet_types_loaded
+    if _bet_types_loaded:
+        return
+    _bet_types_loaded = True
+    bets_module_name = str(__name__).replace('bet_abstracts', 'bets')
+    if bets_module_name not in sys.modules:
+        import_module(bets_module_name)
+    for bet_class in vars(sys.modules[bets_module_name]).values():
+        if isinstance(bet_class, type) and issubclass(bet_class, BetAbstract) \
+                and bet_class.__module__ == bets_module_name:
+            _bet_types.setdefault(bet_class.__name__.lower(), bet_class)
+
+
 def ignore_placement_for_compare(cls):
     def eq_comp(self, other):
         if not isinstance(other, BetAbstract):
@@ -354,7 +414,7 @@ class TravelingBetAbstract(BetAbstract):
         """
         if self.placement:
             raise BadBetActionException(f'Can not move {self.__class__.__name__} bet after point.')
-        if point not in self._table.config.get_valid_points():
+        if not self._table.config.rules().is_point(point):
             raise BadBetActionException(f'Illegal location for {self.__class__.__name__} bet')
         self.placement = point
 
@@ -0,0 +1,241 @@
+"""
+Module: Craps.Table.Bet_Book
+
+Holds the bets on a table, indexed for the lookups instruction processing makes.
+"""
+import collections.abc
+import contextlib
+import typing
+
+from .bet_abstracts import BetAbstract, ToggleableBetAbstract, TravelingBetAbstract
+from ..bet import BetPlacement, BetStatus
+
+
+class BetBook(collections.abc.MutableSet):
+    """
+    Set of the bets on a table
+
+    Behaves like a `set` of bets (membership uses the bets' own equality), with indexes by
+    exact bet type and placement, by bet type, and of the traveling and toggleable bets. The
+    value on the table and the value at risk are kept as running totals.
+
+    Bets in the book must only be changed inside `changing(bet)`, so the indexes and totals
+    follow the change.
+    """
+
+    def __init__(self, bets: typing.Iterable[BetAbstract] = ()):
+        """
+        Constructor
+
+        :param bets: Initial bets
+        :type bets: Iterable[BetAbstract]
+        """
+        self._members: dict[BetAbstract, BetAbstract] = {}
+        self._by_place: dict[tuple[type, BetPlacement], list[BetAbstract]] = {}
+        self._by_type: dict[type, dict[BetAbstract, None]] = {}
+        self._traveling: dict[BetAbstract, None] = {}
+        self._toggleable: dict[BetAbstract, None] = {}
+        self._follows_rules: dict[BetAbstract, None] = {}  # bets with their own is_on()
+        self._value_on_table = 0
+        self._always_at_risk = 0
+        self._at_risk_with_point = 0
+        for bet in bets:
+            self.add(bet)
+
+    def __contains__(self, bet) -> bool:
+        return bet in self._members
+
+    def __iter__(self) -> typing.Iterator[BetAbstract]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._members)!r})"
+
+    def add(self, bet: BetAbstract):
+        """
+        Add a bet, unless an equal bet is already in the book
+
+        :param bet: Bet to add
+        :type bet: BetAbstract
+        """
+        if bet in self._members:
+            return
+        self._members[bet] = bet
+        self._index(bet)
+
+    def discard(self, bet: BetAbstract):
+        """
+        Remove the bet equal to `bet` if there is one
+
+        :param bet: Bet to remove
+        :type bet: BetAbstract
+        """
+        stored = self._members.pop(bet, None)
+        if stored is not None:
+            self._unindex(stored)
+
+    def copy(self) -> 'BetBook':
+        """
+        Shallow copy (the bets themselves are shared)
+
+        :rtype: BetBook
+        """
+        return self.__class__(self._members)
+
+    def find(self,
+             bet_type: typing.Union[type, str],
+             placement: BetPlacement = None) -> list[BetAbstract]:
+        """
+        Bets of exactly a type at a placement
+
+        Matches the bets `same_type_and_place` would.
+
+        :param bet_type: Bet class (or its name)
+        :type bet_type: type|str
+        :param placement: Placement of the bet
+        :type placement: None|int|DiceOutcome
+        :rtype: list[BetAbstract]
+        """
+        if isinstance(bet_type, str):
+            return [bet for cls in self._by_type if cls.__name__ == bet_type
+                    for bet in self._by_place.get((cls, placement), [])]
+        return list(self._by_place.get((bet_type, placement), []))
+
+    def of_type(self, bet_type: type) -> list[BetAbstract]:
+        """
+        Bets of exactly a type (subclasses are not included)
+
+        :param bet_type: Bet class
+        :type bet_type: type
+        :rtype: list[BetAbstract]
+        """
+        return list(self._by_type.get(bet_type, []))
+
+    def traveling(self) -> list[BetAbstract]:
+        """
+        Bets that travel to a point
+
+        :rtype: list[BetAbstract]
+        """
+        return list(self._traveling)
+
+    def toggleable(self) -> list[BetAbstract]:
+        """
+        Bets that can be turned On and Off
+
+        :rtype: list[BetAbstract]
+        """
+        return list(self._toggleable)
+
+    def has_non_toggleable(self) -> bool:
+        """
+        Book holds a bet that can not be turned On and Off
+
+        :rtype: bool
+        """
+        return len(self._toggleable) < len(self._members)
+
+    def value_on_table(self) -> int:
+        """
+        Total wagers in the book
+
+        :rtype: int
+        """
+        return self._value_on_table
+
+    def value_at_risk(self, point_set: bool) -> int:
+        """
+        Total wagers of the active bets
+
+        :param point_set: The table's point is set
+        :type point_set: bool
+        :rtype: int
+        """
+        return self._always_at_risk \
+            + (self._at_risk_with_point if point_set else 0) \
+            + sum(bet.wager for bet in self._follows_rules if bet.is_on())
+
+    @contextlib.contextmanager
+    def changing(self, bet: BetAbstract) -> typing.Iterator[BetAbstract]:
+        """
+        Context in which the book's copy of a bet can be changed
+
+        The bet is taken out of the indexes on entry and put back on exit (even when the change
+        raises). A change that makes it equal to another bet in the book drops it, as adding it to
+        a set would.
+
+        :param bet: Bet to change (or one equal to it)
+        :type bet: BetAbstract
+        :return: The bet held by the book
+        :raise KeyError: if there is no such bet in the book
+        """
+        stored = self._members.pop(bet)
+        self._unindex(stored)
+        try:
+            yield stored
+        finally:
+            self.add(stored)
+
+    def _index(self, bet: BetAbstract):
+        self._by_place.setdefault((bet.__class__, bet.placement), []).append(bet)
+        self._by_type.setdefault(bet.__class__, {})[bet] = None
+        if isinstance(bet, TravelingBetAbstract):
+            self._traveling[bet] = None
+        if isinstance(bet, ToggleableBetAbstract):
+            self._toggleable[bet] = None
+        self._count(bet, 1)
+
+    def _unindex(self, bet: BetAbstract):
+        key = (bet.__class__, bet.placement)
+        placed = [placed for placed in self._by_place[key] if placed is not bet]
+        if placed:
+            self._by_place[key] = placed
+        else:
+            del self._by_place[key]
+        del self._by_type[bet.__class__][bet]
+        if not self._by_type[bet.__class__]:
+            del self._by_type[bet.__class__]
+        self._traveling.pop(bet, None)
+        self._toggleable.pop(bet, None)
+        self._count(bet, -1)
+
+    def _count(self, bet: BetAbstract, sign: int):
+        wager = sign * bet.wager
+        self._value_on_table += wager
+        activity = _activity(bet)
+        if activity is _OWN_RULES:
+            if sign > 0:
+                self._follows_rules[bet] = None
+            else:
+                self._follows_rules.pop(bet, None)
+        elif activity is True:
+            self._always_at_risk += wager
+        elif activity is None:
+            self._at_risk_with_point += wager
+
+
+_OWN_RULES = object()
+
+
+def _activity(bet: BetAbstract):
+    """
+    When a bet is on, without asking the table
+
+    :return: True (always on), False (always off), None (when the point is set), or
+        _OWN_RULES for bets with their own is_on()
+    """
+    is_on = type(bet).is_on
+    if is_on is BetAbstract.is_on:
+        return None
+    if is_on is not ToggleableBetAbstract.is_on:
+        return _OWN_RULES
+    # pylint: disable=protected-access
+    # Mirrors ToggleableBetAbstract.is_on
+    if bet._override_toggle == BetStatus.ON or not bet.can_toggle:
+        return True
+    if bet._override_toggle == BetStatus.OFF:
+        return False
+    return None
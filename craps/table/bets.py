@@ -4,6 +4,7 @@ Module: Craps.Table.Bet
 
 from .bet_abstracts import BetAbstract, ignore_placement_for_compare,  \
     ToggleableBetAbstract, TravelingBetAbstract, PropBetAbstract
+from .config.rules import scale
 from ..bet import BetStatus, InvalidBetException, BetSignature
 from ..dice import Outcome as DiceOutcome
 
@@ -23,7 +24,7 @@ class Come(TravelingBetAbstract):
         if self.placement and outcome.total() == 7:
             return True
         if self.placement is None and \
-                not self._table.config.is_crapless and \
+                not self._table.config.rules().is_crapless and \
                 outcome.total() in [2, 3, 12]:
             return True
         return False
@@ -40,7 +41,8 @@ class Come(TravelingBetAbstract):
             return True
         if self.placement is None and outcome.total() == 7:
             return True
-        if self.placement is None and not self._table.config.is_crapless and outcome.total() == 11:
+        if self.placement is None and not self._table.config.rules().is_crapless \
+                and outcome.total() == 11:
             return True
         return False
 
@@ -54,8 +56,8 @@ class Come(TravelingBetAbstract):
         """
         if not self.is_winner(outcome):
             return 0
-        true_odds = self._table.config.get_true_odds(self.placement) if self.placement else 0
-        odds_payout = int(self.odds * true_odds) if self.odds else 0
+        odds_payout = scale(self.odds, self._table.config.rules().true_odds[self.placement]) \
+            if self.odds and self.placement else 0
         return self.wager + odds_payout
 
     def max_odds(self) -> int:
@@ -64,7 +66,7 @@ class Come(TravelingBetAbstract):
 
         :rtype: int
         """
-        return int(self._table.config.odds[self.placement] * self.wager)
+        return self._table.config.rules().max_odds[self.placement] * self.wager
 
     def can_remove(self) -> bool:
         """
@@ -89,7 +91,7 @@ class Put(Come):
     def _check_valid(self):
         if not self.placement:
             raise InvalidBetException('Put bet requires a location')
-        if self.placement not in self._table.config.get_valid_points():
+        if not self._table.config.rules().is_point(self.placement):
             raise InvalidBetException(f'{self.placement} is not a valid location for a Put bet')
 
 
@@ -103,7 +105,7 @@ class DontCome(TravelingBetAbstract):
     allow_odds = True
 
     def _check_valid(self):
-        if self._table.config.is_crapless:
+        if self._table.config.rules().is_crapless:
             raise InvalidBetException(f'{self.__class__.__name__} is not a valid bet for Crapless')
 
     def is_winner(self, outcome: DiceOutcome) -> bool:
@@ -118,7 +120,7 @@ class DontCome(TravelingBetAbstract):
             return True
         if self.placement is None \
                 and outcome.total() in [2, 3, 12] \
-                and outcome.total() != self._table.config.dont_bar:
+                and outcome.total() != self._table.config.rules().dont_bar:
             return True
         return False
 
@@ -151,9 +153,9 @@ class DontCome(TravelingBetAbstract):
 
         :rtype: int
         """
-        pass_odds = self._table.config.get_true_odds(self.placement)  # 2/1
-        max_win = int(self._table.config.odds[self.placement] * self.wager)  # 3 * 5 = 15
-        return int(max_win * pass_odds)  # 60 / 2 = 30
+        rules = self._table.config.rules()
+        max_win = rules.max_odds[self.placement] * self.wager  # 3 * 5 = 15
+        return scale(max_win, rules.true_odds[self.placement])  # 15 * 2/1 = 30
 
     def get_payout(self, outcome: DiceOutcome) -> int:
         """
@@ -165,8 +167,8 @@ class DontCome(TravelingBetAbstract):
         """
         if not self.is_winner(outcome):
             return 0
-        true_odds = self._table.config.get_true_odds(self.placement) if self.placement else 0
-        odds_payout = int(self.odds / true_odds) if self.odds else 0
+        odds_payout = scale(self.odds, self._table.config.rules().lay_odds[self.placement]) \
+            if self.odds else 0
         return self.wager + odds_payout
 
     def can_remove(self) -> bool:
@@ -212,7 +214,7 @@ class Field(BetAbstract):
         :type outcome: Outcome
         :rtype: bool
         """
-        return outcome.total() in [2, 3, 4, 9, 10, 11, 12]
+        return outcome.total() in self._table.config.rules().field_pays
 
     def get_payout(self, outcome: DiceOutcome) -> int:
         """
@@ -224,11 +226,7 @@ class Field(BetAbstract):
         """
         if not self.is_winner(outcome):
             return 0
-        if outcome.total() == 2:
-            return self.wager * self._table.config.field_2_pay
-        if outcome.total() == 12:
-            return self.wager * self._table.config.field_12_pay
-        return self.wager
+        return self.wager * self._table.config.rules().field_pays[outcome.total()]
 
 
 class Place(ToggleableBetAbstract):
@@ -244,7 +242,7 @@ class Place(ToggleableBetAbstract):
         """
         if not self.is_winner(outcome):
             return 0
-        return int(self.wager * self._table.config.get_place_odds(outcome.total()))
+        return scale(self.wager, self._table.config.rules().place_odds[outcome.total()])
 
     def is_loser(self, outcome: DiceOutcome):
         """
@@ -269,7 +267,7 @@ class Place(ToggleableBetAbstract):
     def _check_valid(self):
         if not self.placement:
             raise InvalidBetException(f'{self.__class__.__name__} bet requires a location')
-        if self.placement not in self._table.config.get_valid_points():
+        if not self._table.config.rules().is_point(self.placement):
             raise InvalidBetException(
                 '{self.placement} is not a valid location for a {self.__class__.__name__} bet')
 
@@ -281,7 +279,7 @@ class Buy(Place):
     def get_payout(self, outcome: DiceOutcome) -> int:
         if not self.is_winner(outcome):
             return 0
-        return int(self.wager * self._table.config.get_true_odds(outcome.total())) - self.get_vig()
+        return scale(self.wager, self._table.config.rules().true_odds[outcome.total()]) - self.get_vig()
 
     def return_vig(self) -> int:
         return self.get_vig() if self._table.config.pay_vig_before_buy else 0
@@ -301,18 +299,19 @@ class Lay(ToggleableBetAbstract):
     def _check_valid(self):
         if not self.placement:
             raise InvalidBetException(f'{self.__class__.__name__} bet requires a location')
-        if self.placement not in self._table.config.get_valid_points():
+        if not self._table.config.rules().is_point(self.placement):
             raise InvalidBetException(
                 f'{self.placement} is not a valid location for a {self.__class__.__name__} bet')
 
     def get_payout(self, outcome: DiceOutcome) -> int:
         if not self.is_winner(outcome):
             return 0
-        return int(self.wager / self._table.config.get_true_odds(self.placement)) - self.get_vig()
+        return scale(self.wager, self._table.config.rules().lay_odds[self.placement]) - self.get_vig()
 
     def get_vig(self) -> int:
-        return int(self.wager / self._table.config.get_true_odds(
-            self.placement) * .05) if self.has_vig else 0
+        if not self.has_vig:
+            return 0
+        return scale(self.wager, self._table.config.rules().lay_vig[self.placement])
 
     def return_vig(self) -> int:
         return self.get_vig() if self._table.config.pay_vig_before_lay else 0
@@ -382,8 +381,7 @@ class Hop(PropBetAbstract):
     def get_payout(self, outcome: DiceOutcome) -> int:
         if not self.is_winner(outcome):
             return 0
-        return self.wager * (self._table.config.hop_hard_pay_to_one if outcome.is_hard()
-                             else self._table.config.hop_easy_pay_to_one)
+        return self.wager * self._table.config.rules().hop_pays[outcome.is_hard()]
 
     def get_signature(self):
         return BetSignature(type=self.__class__, wager=self.wager, odds=self.odds,
@@ -401,9 +399,8 @@ class Horn(PropBetAbstract):
     def get_payout(self, outcome: DiceOutcome) -> int:
         if not self.is_winner(outcome):
             return 0
-        return int(self.wager / self.multi_bet * (
-            self._table.config.hop_hard_pay_to_one if outcome.is_hard()
-            else self._table.config.hop_easy_pay_to_one))
+        pay_to_one = self._table.config.rules().hop_pays[outcome.is_hard()]
+        return scale(self.wager, (pay_to_one, self.multi_bet))
 
 
 class HornHigh(Horn):
@@ -420,13 +417,10 @@ class HornHigh(Horn):
     def get_payout(self, outcome: DiceOutcome) -> int:
         if not self.is_winner(outcome):
             return 0
+        pay_to_one = self._table.config.rules().hop_pays[outcome.is_hard()]
         if outcome.total() == self.placement:
-            return int(self.wager / self.multi_bet * 2 * (
-                self._table.config.hop_hard_pay_to_one if outcome.is_hard()
-                else self._table.config.hop_easy_pay_to_one))
-        return int(self.wager / self.multi_bet * (
-            self._table.config.hop_hard_pay_to_one if outcome.is_hard()
-            else self._table.config.hop_easy_pay_to_one))
+            return scale(self.wager, (2 * pay_to_one, self.multi_bet))
+        return scale(self.wager, (pay_to_one, self.multi_bet))
 
 
 @ignore_placement_for_compare
@@ -443,9 +437,8 @@ class World(PropBetAbstract):
     def get_payout(self, outcome: DiceOutcome) -> int:
         if not self.is_winner(outcome):
             return 0
-        return int(self.wager / self.multi_bet * (
-            self._table.config.hop_hard_pay_to_one if outcome.is_hard()
-            else self._table.config.hop_easy_pay_to_one))
+        pay_to_one = self._table.config.rules().hop_pays[outcome.is_hard()]
+        return scale(self.wager, (pay_to_one, self.multi_bet))
 
 
 @ignore_placement_for_compare
@@ -459,9 +452,8 @@ class Craps3Way(PropBetAbstract):
     def get_payout(self, outcome: DiceOutcome) -> int:
         if not self.is_winner(outcome):
             return 0
-        return int(self.wager / self.multi_bet * (
-            self._table.config.hop_hard_pay_to_one if outcome.is_hard()
-            else self._table.config.hop_easy_pay_to_one))
+        pay_to_one = self._table.config.rules().hop_pays[outcome.is_hard()]
+        return scale(self.wager, (pay_to_one, self.multi_bet))
 
 
 @ignore_placement_for_compare
@@ -476,5 +468,5 @@ class CE(PropBetAbstract):
         if not self.is_winner(outcome):
             return 0
         if outcome.total() in [2, 3, 12]:
-            return int(self.wager / self.multi_bet * 7)
-        return int(self.wager / self.multi_bet * self._table.config.hop_easy_pay_to_one)
+            return scale(self.wager, (7, self.multi_bet))
+        return scale(self.wager, (self._table.config.rules().hop_pays[False], self.multi_bet))
@@ -1,7 +1,9 @@
 """
 Module: Craps.Table.Config
 """
+import dataclasses
 import fractions
+import functools
 import json
 import re
 from dataclasses import dataclass
@@ -9,6 +11,11 @@ from dataclasses import dataclass
 import JsonEncoder
 from craps.dice import Outcome as DiceOutcome
 from .odds import Odds, StandardOdds, CraplessOdds
+from .rules import RuleSet, compile_rules
+
+
+#: Number of distinct configurations `Config.from_json` keeps
+CONFIG_CACHE_SIZE = 128
 
 
 class InconsistentConfig(Exception):
@@ -55,17 +62,59 @@ class Config:
         """
         return self.odds.valid_keys()
 
+    def rules(self) -> RuleSet:
+        """
+        The configuration compiled into its rule table
+
+        Compiled on first use and kept with the configuration.
+
+        :rtype: RuleSet
+        """
+        try:
+            return self.__dict__['_rules']
+        except KeyError:
+            rules = compile_rules(self)
+            object.__setattr__(self, '_rules', rules)
+            return rules
+
     @classmethod
     def from_json(cls, primitive):
         """
         Build Configuration from a JSON string (or the resulting Dictionary)
 
+        Configurations are cached by their canonical JSON, so equal primitives share one
+        (immutable) Config instance. The canonical JSON is only the lookup key: configurations
+        are built from the primitive as given, keeping the order of its odds.
+
         :param primitive: decoded or encoded JSON string
         :type primitive: str|dict
         :return: Config
         """
-        if isinstance(primitive, str):
-            primitive = json.loads(primitive)
+        primitive = json.loads(primitive) if isinstance(primitive, str) else primitive
+        try:
+            key = json.dumps(primitive, sort_keys=True, separators=(',', ':'))
+            source = json.dumps(primitive, separators=(',', ':'))
+        except (TypeError, ValueError):  # Not plain JSON, so not cached
+            return cls._from_primitive(primitive)
+        return _from_canonical_json(cls, _CacheKey(key, source))
+
+    @classmethod
+    def cache_info(cls):
+        """
+        Hit and miss counters of the `from_json` cache
+
+        :return: named tuple of hits, misses, maxsize, and currsize
+        """
+        return _from_canonical_json.cache_info()
+
+    @classmethod
+    def cache_clear(cls):
+        """Empty the `from_json` cache and reset its counters"""
+        _from_canonical_json.cache_clear()
+
+    @classmethod
+    def _from_primitive(cls, primitive):
+        primitive = dict(primitive)
         if 'place_2_12_odds' in primitive:
             primitive['place_2_12_odds'] = fractions.Fraction(*primitive['place_2_12_odds'])
         if 'place_3_11_odds' in primitive:
@@ -104,17 +153,10 @@ class Config:
         :return: Odds for place bet
         :rtype: fractions.Fraction
         """
-        if place in [6, 8]:
-            return fractions.Fraction(7, 6)
-        if place in [5, 9]:
-            return fractions.Fraction(7, 5)
-        if place in [4, 10]:
-            return fractions.Fraction(9, 5)
-        if place in [3, 11] and self.is_crapless:
-            return self.place_3_11_odds
-        if place in [2, 12] and self.is_crapless:
-            return self.place_2_12_odds
-        raise ValueError('Invalid place bet')
+        try:
+            return fractions.Fraction(*self.rules().place_odds[place])
+        except (KeyError, TypeError):
+            raise ValueError('Invalid place bet') from None
 
     @staticmethod
     def get_true_odds(place: int) -> fractions.Fraction:
@@ -127,9 +169,7 @@ class Config:
         :return: true odds
         :rtype: fractions.Fraction
         """
-        ways_to_win = len([out for out in DiceOutcome.get_all() if out.total() == place])
-        ways_to_lose = len([out for out in DiceOutcome.get_all() if out.total() == 7])
-        return fractions.Fraction(ways_to_lose, ways_to_win)
+        return fractions.Fraction(DiceOutcome.ways_to_roll(7), DiceOutcome.ways_to_roll(place))
 
     def __post_init__(self):
         if self.is_crapless and not isinstance(self.odds, CraplessOdds):
@@ -160,11 +200,47 @@ class Config:
             if getattr(self, key) and getattr(self, key) < 0:
                 raise InconsistentConfig(f'{key} Must Be Positive')
 
+    def __getstate__(self):
+        # The compiled rules are looked up again on demand, rather than copied or pickled
+        return {key: value for key, value in self.__dict__.items() if key != '_rules'}
+
     def __repr__(self):
         param_string = ', '.join([f'{key}={repr(val)}' for
                                   key, val in self._diff_from_default().items()])
         return f"{self.__class__.__name__}({param_string})"
 
     def _diff_from_default(self):
-        return {attr: getattr(self, attr) for attr in self.__dict__ if
-                getattr(self, attr) != getattr(self.__class__(), attr)}
+        defaults = _default_values(self.__class__)
+        return {name: getattr(self, name) for name, default in defaults.items() if
+                getattr(self, name) != default}
+
+
+class _CacheKey:
+    """
+    Canonical JSON of a primitive, carrying the primitive's own JSON (in its order) to build from
+    on a miss
+
+    The cache holds only strings, never the caller's primitive, which the caller may change.
+    """
+    __slots__ = ('key', 'source')
+
+    def __init__(self, key: str, source: str):
+        self.key = key
+        self.source = source
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, _CacheKey) and self.key == other.key
+
+
+@functools.lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _from_canonical_json(cls, key: _CacheKey) -> Config:
+    return cls._from_primitive(json.loads(key.source))  # pylint: disable=protected-access
+
+
+@functools.cache
+def _default_values(cls) -> dict:
+    default = cls()
+    return {field.name: getattr(default, field.name) for field in dataclasses.fields(cls)}
@@ -0,0 +1,122 @@
+"""
+Module: Craps.Table.Config.Rules
+
+A table configuration compiled into the lookup tables the bets read while settling.
+"""
+import dataclasses
+import fractions
+import functools
+import types
+import typing
+
+from craps.dice import Outcome as DiceOutcome
+
+#: Exact ratio as (numerator, denominator), the denominator always positive
+Ratio = tuple[int, int]
+
+#: Number of distinct configurations whose rules are kept
+RULES_CACHE_SIZE = 256
+
+#: Vigorish taken on Buy and Lay bets (5%)
+VIG: Ratio = (1, 20)
+
+#: Winning Field totals that pay even money (2 and 12 pay as configured)
+FIELD_EVEN_MONEY = (3, 4, 9, 10, 11)
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class RuleSet:
+    """
+    Immutable rule table compiled from a Config
+
+    Use `compile_rules` (or `Config.rules()`), which compiles each distinct configuration once.
+    """
+    # pylint: disable=too-many-instance-attributes
+    # One attribute per rule table
+    valid_points: frozenset[int]  #: Points the puck (and traveling bets) can be placed on
+    is_crapless: bool  #: Table is crapless craps
+    dont_bar: int  #: Don't Pass and Don't Come Bar Craps
+    #: True odds (ways to roll 7 over ways to roll the total) for every total the dice can make
+    true_odds: typing.Mapping[int, Ratio]
+    #: Odds paid for laying a total (the inverse of its true odds)
+    lay_odds: typing.Mapping[int, Ratio]
+    #: Vig on a Lay bet as a share of its wager (VIG of what the lay pays)
+    lay_vig: typing.Mapping[int, Ratio]
+    place_odds: typing.Mapping[int, Ratio]  #: Place bet odds by point
+    max_odds: typing.Mapping[int, int]  #: Maximum odds multiplier by point
+    field_pays: typing.Mapping[int, int]  #: Field payout multiplier by winning total
+    hop_pays: typing.Mapping[bool, int]  #: Hop payout multiplier by whether the roll is hard
+
+    def is_point(self, location) -> bool:
+        """
+        Location is a valid point for the table
+
+        :param location: Location to check
+        :rtype: bool
+        """
+        try:
+            return location in self.valid_points
+        except TypeError:  # Unhashable locations are never points
+            return False
+
+
+def scale(amount: int, ratio: Ratio) -> int:
+    """
+    Amount multiplied by a ratio, truncated toward zero
+
+    Exact integer arithmetic, rounding the way `int()` did for the Fraction and float payouts.
+
+    :param amount: Wager, odds, or other whole amount
+    :type amount: int
+    :param ratio: (numerator, denominator)
+    :type ratio: Ratio
+    :rtype: int
+    """
+    numerator, denominator = ratio
+    product = amount * numerator
+    if product < 0:
+        return -(-product // denominator)
+    return product // denominator
+
+
+def _ratio(value) -> Ratio:
+    value = fractions.Fraction(value)
+    return value.numerator, value.denominator
+
+
+@functools.lru_cache(maxsize=RULES_CACHE_SIZE)
+def compile_rules(config) -> RuleSet:
+    """
+    Compile a configuration into its rule table
+
+    Equal configurations share one RuleSet.
+
+    :param config: Table configuration
+    :type config: Config
+    :rtype: RuleSet
+    """
+    points = config.odds.valid_keys()
+    place_odds = {6: (7, 6), 8: (7, 6), 5: (7, 5), 9: (7, 5), 4: (9, 5), 10: (9, 5)}
+    if config.is_crapless:
+        place_odds.update({3: _ratio(config.place_3_11_odds), 11: _ratio(config.place_3_11_odds),
+                           2: _ratio(config.place_2_12_odds), 12: _ratio(config.place_2_12_odds)})
+    true_odds = {total: _ratio(fractions.Fraction(DiceOutcome.ways_to_roll(7),
+                                                  DiceOutcome.ways_to_roll(total)))
+                 for total in range(2, 13)}
+    field_pays = {total: 1 for total in FIELD_EVEN_MONEY}
+    field_pays.update({2: config.field_2_pay, 12: config.field_12_pay})
+    return RuleSet(
+        valid_points=frozenset(points),
+        is_crapless=config.is_crapless,
+        dont_bar=config.dont_bar,
+        true_odds=types.MappingProxyType(true_odds),
+        lay_odds=types.MappingProxyType({total: (denominator, numerator) for
+                                         total, (numerator, denominator) in true_odds.items()}),
+        lay_vig=types.MappingProxyType({total: (denominator * VIG[0], numerator * VIG[1]) for
+                                        total, (numerator, denominator) in true_odds.items()}),
+        place_odds=types.MappingProxyType(place_odds),
+        max_odds=types.MappingProxyType({point: config.odds[point] for point in points}),
+        field_pays=types.MappingProxyType(dict(sorted(field_pays.items()))),
+        hop_pays=types.MappingProxyType({False: config.hop_easy_pay_to_one,
+                                         True: config.hop_hard_pay_to_one}),
+    )
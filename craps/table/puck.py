@@ -74,7 +74,7 @@ class Puck:
         """
         if self.is_on():
             raise IllegalMove("Puck already placed")
-        if location not in self.table_config.get_valid_points():
+        if not self.table_config.rules().is_point(location):
             raise IllegalMove("Invalid puck location")
         self._location = location
 
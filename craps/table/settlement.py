@@ -0,0 +1,289 @@
+"""
+Module: Craps.Table.Settlement
+
+Settles every bet on a table against a single roll of the dice.
+"""
+import copy
+import dataclasses
+import typing
+from enum import Enum
+
+from .bet_abstracts import BetAbstract, TravelingBetAbstract
+from .bets import Come, PassLine
+from .config import Config
+from .table import Table
+from .puck import PuckLocation
+from ..bet import BetPlacement, BetSignature
+from ..dice import Outcome as DiceOutcome
+
+
+class SettlementStatus(Enum):
+    """
+    Enum for the result of a bet on a single roll
+    """
+    WIN = 'WIN'  #: Bet is paid
+    LOSE = 'LOSE'  #: Bet is taken down by the house
+    PUSH = 'PUSH'  #: Bet is neither paid nor taken down
+
+
+@dataclasses.dataclass(frozen=True)
+class BetSettlement:
+    """
+    Result of a single bet against a single roll of the dice
+    """
+    bet: BetAbstract  #: The bet as it was before the roll
+    status: SettlementStatus  #: Win, Lose, or Push
+    is_on: bool  #: Bet was active for the roll
+    payout: int = 0  #: Amount paid to the player (less any vig)
+    vig: typing.Optional[int] = None  #: Vig taken from the payout (bets with vig only)
+    next_placement: BetPlacement = None  #: Placement of the bet after the roll
+    returned: bool = False  #: Bet is taken down and returned to the player
+
+    def is_winner(self) -> bool:
+        """
+        Bet won on the roll
+
+        :rtype: bool
+        """
+        return self.status is SettlementStatus.WIN
+
+    def is_loser(self) -> bool:
+        """
+        Bet lost on the roll
+
+        :rtype: bool
+        """
+        return self.status is SettlementStatus.LOSE
+
+    def remains(self) -> bool:
+        """
+        Bet stays on the table after the roll
+
+        :rtype: bool
+        """
+        return not self.returned and self.status is not SettlementStatus.LOSE
+
+    def get_signature(self) -> BetSignature:
+        """
+        Signature of a winning bet, including payout and vig paid
+
+        :rtype: BetSignature
+        """
+        return dataclasses.replace(self.bet.get_signature(), payout=self.payout, vig_paid=self.vig)
+
+    def get_bet_after_roll(self) -> BetAbstract:
+        """
+        The bet as it stands after the roll (moved if it traveled)
+
+        :rtype: BetAbstract
+        """
+        if self.next_placement == self.bet.placement:
+            return self.bet
+        moved = copy.copy(self.bet)
+        moved.placement = self.next_placement
+        return moved
+
+
+@dataclasses.dataclass(frozen=True)
+class TableSettlement:
+    """
+    Result of every bet on a table against a single roll of the dice
+    """
+    outcome: DiceOutcome  #: Roll of the dice
+    settlements: tuple[BetSettlement, ...]  #: Settlement of each bet on the table
+    puck_location: PuckLocation  #: Location of the puck after the roll
+    value_on_table: int  #: Total wagers on the table before the roll
+    value_at_risk: int  #: Total wagers of active bets before the roll
+    total_winnings: int  #: Total paid to the player
+    value_of_losers: int  #: Total wagers of losing bets
+    value_on_table_after_roll: int  #: Total wagers remaining on the table after the roll
+    value_at_risk_after_roll: int  #: Total wagers of active bets remaining after the roll
+
+    def winners(self) -> list[BetSettlement]:
+        """
+        Settlements of all winning bets
+
+        :rtype: list[BetSettlement]
+        """
+        return [settlement for settlement in self.settlements if settlement.is_winner()]
+
+    def losers(self) -> list[BetAbstract]:
+        """
+        All losing bets
+
+        :rtype: list[BetAbstract]
+        """
+        return [settlement.bet for settlement in self.settlements if settlement.is_loser()]
+
+    def returned(self) -> list[BetAbstract]:
+        """
+        All bets taken down and returned to the player because of the roll
+
+        :rtype: list[BetAbstract]
+        """
+        return [settlement.bet for settlement in self.settlements if settlement.returned]
+
+    def bets_after_roll(self) -> set[BetAbstract]:
+        """
+        All bets remaining on the table after the roll, moved where they traveled
+
+        :rtype: set[BetAbstract]
+        """
+        return {settlement.get_bet_after_roll() for settlement in self.settlements
+                if settlement.remains()}
+
+
+def settle_table(table: Table, outcome: DiceOutcome) -> TableSettlement:
+    """
+    Settle every bet on a table against a roll of the dice
+
+    Each bet is evaluated once. Neither the table nor its bets are changed.
+
+    :param table: Table holding the bets
+    :type table: Table
+    :param outcome: Roll of the dice
+    :type outcome: DiceOutcome
+    :rtype: TableSettlement
+    """
+    dice_total = outcome.total()
+    valid_points = table.config.rules().valid_points
+    evaluated = []
+    come_bets = {}
+    for bet in table.bets:
+        is_on = bet.is_on()
+        won = bet.is_winner(outcome)
+        if is_on and won:
+            status = SettlementStatus.WIN
+        elif is_on and bet.is_loser(outcome):
+            status = SettlementStatus.LOSE
+        else:
+            status = SettlementStatus.PUSH
+        if status is not SettlementStatus.LOSE and bet.get_type() == Come.__name__:
+            come_bets[bet.placement] = bet
+        evaluated.append((bet, status, is_on, won))
+
+    settlements = []
+    total_winnings = value_of_losers = value_on_table_after_roll = value_at_risk_after_roll = 0
+    for bet, status, is_on, won in evaluated:
+        settlement = _settle_bet(bet, outcome, status, is_on, won, valid_points, come_bets)
+        settlements.append(settlement)
+        total_winnings += settlement.payout
+        if status is SettlementStatus.LOSE:
+            value_of_losers += bet.wager
+        elif not settlement.returned:
+            value_on_table_after_roll += bet.wager
+            if is_on:
+                value_at_risk_after_roll += bet.wager
+
+    puck_location = table.puck.location()
+    if table.puck.is_off() and dice_total in valid_points:
+        puck_location = dice_total
+    elif table.puck.is_on() and dice_total in [7, table.puck.location()]:
+        puck_location = None
+
+    return TableSettlement(outcome=outcome,
+                           settlements=tuple(settlements),
+                           puck_location=puck_location,
+                           value_on_table=table.value_on_table(),
+                           value_at_risk=table.value_at_risk(),
+                           total_winnings=total_winnings,
+                           value_of_losers=value_of_losers,
+                           value_on_table_after_roll=value_on_table_after_roll,
+                           value_at_risk_after_roll=value_at_risk_after_roll)
+
+
+def settle_players(config: typing.Union[Config, dict],
+                   puck_location: PuckLocation,
+                   outcome: DiceOutcome,
+                   bet_sets: typing.Iterable[typing.Iterable[typing.Union[BetSignature, dict]]]
+                   ) -> list[TableSettlement]:
+    """
+    Settle many players' bets against one roll of the dice
+
+    Every player shares the configuration, the puck and the roll, and has a table of their own
+    holding their bets. The configuration is parsed once, and players with identical bets share
+    one settlement.
+
+    :param config: Table configuration (or its request representation)
+    :type config: Config|dict
+    :param puck_location: Location of the puck
+    :type puck_location: None|int
+    :param outcome: Roll of the dice
+    :type outcome: DiceOutcome
+    :param bet_sets: Each player's bets, as signatures (or their request representations)
+    :type bet_sets: typing.Iterable[typing.Iterable[BetSignature|dict]]
+    :return: Settlement of each player's table, in the same order as the bet sets
+    :rtype: list[TableSettlement]
+    """
+    config = config if isinstance(config, Config) else Config.from_json(config)
+    settled = {}
+    settlements = []
+    for bets in bet_sets:
+        bets = list(bets)
+        key = _bet_set_key(bets)
+        settlement = settled.get(key) if key is not None else None
+        if settlement is None:
+            settlement = settle_table(Table(config=config, puck_location=puck_location, existing_bets=bets), outcome)
+            if key is not None:
+                settled[key] = settlement
+        settlements.append(settlement)
+    return settlements
+
+
+def _bet_set_key(bets: list) -> typing.Optional[tuple]:
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((name, freeze(item)) for name, item in value.items()))
+        if isinstance(value, list):
+            return tuple(freeze(item) for item in value)
+        return value
+
+    key = tuple(freeze(bet) for bet in bets)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _settle_bet(bet: BetAbstract,
+                outcome: DiceOutcome,
+                status: SettlementStatus,
+                is_on: bool,
+                won: bool,
+                valid_points: frozenset[int],
+                come_bets: dict) -> BetSettlement:
+    # pylint: disable=too-many-arguments
+    # Everything here was computed once for the whole table
+    payout, vig = 0, None
+    if status is SettlementStatus.WIN:
+        payout = bet.get_payout(outcome)
+        if bet.has_vig:
+            vig = bet.get_vig()
+    next_placement, returned = bet.placement, False
+    if status is SettlementStatus.LOSE or not isinstance(bet, TravelingBetAbstract):
+        pass
+    elif bet.placement is None and outcome.total() in valid_points:
+        # Point set for bet
+        found = come_bets.get(outcome.total()) if isinstance(bet, Come) else None
+        if not isinstance(bet, Come) or not found or found.wager != bet.wager:
+            next_placement = outcome.total()
+    elif bet.placement == outcome.total():
+        # Point hit for bet
+        if isinstance(bet, Come) and not isinstance(bet, PassLine):
+            # Stays up only when a matching new Come bet is not moving to this point itself
+            found = come_bets.get(None)
+            replacing = come_bets.get(outcome.total())
+            returned = not found or found.wager != bet.wager \
+                or not replacing or replacing.wager != found.wager
+        else:
+            next_placement = None
+    elif outcome.total() == 7 and won:
+        returned = True
+    return BetSettlement(bet=bet,
+                         status=status,
+                         is_on=is_on,
+                         payout=payout,
+                         vig=vig,
+                         next_placement=next_placement,
+                         returned=returned)
@@ -1,5 +1,9 @@
+import copy
+import typing
+
 from . import DuplicateBetException, ContractBetException
-from .bet_abstracts import BetAbstract, ToggleableBetAbstract, ConcreteBetSet
+from .bet_abstracts import BetAbstract
+from .bet_book import BetBook
 from .bets import PassLine, DontPass, Come, DontCome
 from .config import Config
 from .interface import TableInterface
@@ -16,8 +20,8 @@ class Table(TableInterface):
     """
     config: Config  #: Table Configuration (rules)
     puck: Puck  #: The Point Puck on the table
-    bets: ConcreteBetSet  #: List of all bets on the table
     returned_bets: BetSet  #: List of all bets returned to the player
+    _bets: BetBook
 
     def __init__(self,
                  config: Config = None,
@@ -43,9 +47,40 @@ class Table(TableInterface):
             existing_bets = set(BetAbstract.from_signature(signature=signature, table=self) for
                                 signature in existing_bets
                                 if isinstance(signature, (dict, BetSignature)))
-        self.bets = existing_bets if existing_bets else set()
+        self.bets = existing_bets if existing_bets else ()
         self.returned_bets = set()
 
+    @property
+    def bets(self) -> BetBook:
+        """
+        All bets on the table (on or off)
+
+        Any collection of bets assigned is put in a BetBook.
+
+        :rtype: BetBook
+        """
+        return self._bets
+
+    @bets.setter
+    def bets(self, bets: typing.Iterable[BetAbstract]):
+        self._bets = bets if isinstance(bets, BetBook) else BetBook(bets)
+
+    def value_on_table(self) -> int:
+        """
+        Total wagers on the table
+
+        :rtype: int
+        """
+        return self._bets.value_on_table()
+
+    def value_at_risk(self) -> int:
+        """
+        Total wagers of the active bets on the table
+
+        :rtype: int
+        """
+        return self._bets.value_at_risk(self.point_set())
+
     def get_valid_points(self):
         """
         List of valid points for the current table
@@ -64,6 +99,27 @@ class Table(TableInterface):
         """
         return [bet.get_signature() if isinstance(bet, BetAbstract) else bet for bet in self.bets]
 
+    def copy(self) -> 'Table':
+        """
+        A new table with the same configuration and puck, holding copies of the bets
+
+        Bets are copied rather than rebuilt from their signatures, as a bet may have been left in
+        a state its signature cannot be placed in (a Pass Line keeps its odds after winning).
+
+        :rtype: Table
+        """
+        table = Table(config=self.config, puck_location=self.puck.location())
+        bets = []
+        for bet in self.bets:
+            bet = copy.copy(bet)
+            # pylint: disable=protected-access
+            # Copies belong to the new table
+            bet._table = table
+            bets.append(bet)
+        table.bets = bets
+        table.returned_bets = set(self.returned_bets)
+        return table
+
     def for_json(self):
         """
         Table object as primitive types for json encoding
@@ -83,8 +139,7 @@ class Table(TableInterface):
             if bet.odds is not None:
                 raise InvalidBetException("Cannot place bet with odds")
             if bet.get_signature().type in (PassLine, DontPass):
-                if any(existing.get_signature().type == PassLine
-                       for existing in self.bets if isinstance(existing, BetAbstract)):
+                if self.bets.of_type(PassLine):
                     raise DuplicateBetException(
                         f"Cannot place additional {bet.__class__.__name__} bet")
                 if bet.placement is not None:
@@ -100,7 +155,7 @@ class Table(TableInterface):
                 if self.puck.is_off():
                     raise InvalidBetException(
                         f"Cannon place {bet.__class__.__name__} bet unless point is established")
-            if any(bet.same_type_and_place(existing) for existing in self.bets):
+            if self.bets.find(bet.__class__, bet.placement):
                 raise DuplicateBetException(f"Cannot place additional {bet}")
             self.bets.add(bet)
 
@@ -109,61 +164,59 @@ class Table(TableInterface):
         for bet in bets:
             if not bet.can_remove():
                 raise ContractBetException(f"Cannot retrieve contract bet {bet}")
-            for existing_bet in self.bets:
-                if bet.same_type_and_place(existing_bet):
-                    self.returned_bets.add(existing_bet)
+            self.returned_bets.update(self.bets.find(bet.__class__, bet.placement))
             self.bets.remove(bet)
 
     def _process_update(self, bets: list[BetSignature] = None):
         bets = [BetAbstract.from_signature(signature=signature, table=self) for signature in bets]
         for bet in bets:
-            for existing_bet in self.bets:
-                if bet.same_type_and_place(existing_bet):
-                    if bet.wager > existing_bet.wager and not existing_bet.can_increase():
-                        raise ContractBetException(
-                            f"Cannot increase wager on contract bet {existing_bet}")
-                    if bet.wager < existing_bet.wager and not existing_bet.can_decrease():
-                        raise ContractBetException(
-                            f"Cannot decrease wager on contract bet {existing_bet}")
+            for existing_bet in self.bets.find(bet.__class__, bet.placement):
+                if bet.wager > existing_bet.wager and not existing_bet.can_increase():
+                    raise ContractBetException(
+                        f"Cannot increase wager on contract bet {existing_bet}")
+                if bet.wager < existing_bet.wager and not existing_bet.can_decrease():
+                    raise ContractBetException(
+                        f"Cannot decrease wager on contract bet {existing_bet}")
+                with self.bets.changing(existing_bet):
                     existing_bet.wager = bet.wager
 
     def _process_set_odds(self, bets: list[BetSignature] = None):
         bets = [BetAbstract.from_signature(signature=signature, table=self) for signature in bets]
         for bet in bets:
-            for existing_bet in self.bets:
-                if bet.same_type_and_place(existing_bet):
+            for existing_bet in self.bets.find(bet.__class__, bet.placement):
+                with self.bets.changing(existing_bet):
                     existing_bet.set_odds(bet.odds)
 
     def _process_remove_odds(self, bets: list[BetSignature] = None):
         bets = [BetAbstract.from_signature(signature=signature, table=self) for signature in bets]
         for bet in bets:
-            for existing_bet in self.bets:
-                if bet.same_type_and_place(existing_bet):
+            for existing_bet in self.bets.find(bet.__class__, bet.placement):
+                with self.bets.changing(existing_bet):
                     existing_bet.remove_odds()
 
     def _process_turn_on(self, bets: list[BetSignature] = None):
         bets = [BetAbstract.from_signature(signature=signature, table=self) for signature in bets]
+        if bets and self.bets.has_non_toggleable():
+            raise BadBetActionException
         for bet in bets:
-            for existing_bet in self.bets:
-                if not isinstance(existing_bet, ToggleableBetAbstract):
-                    raise BadBetActionException
-                if bet.same_type_and_place(existing_bet):
+            for existing_bet in self.bets.find(bet.__class__, bet.placement):
+                with self.bets.changing(existing_bet):
                     existing_bet.turn_on()
 
     def _process_turn_off(self, bets: list[BetSignature] = None):
         bets = [BetAbstract.from_signature(signature=signature, table=self) for signature in bets]
+        if bets and self.bets.has_non_toggleable():
+            raise BadBetActionException
         for bet in bets:
-            for existing_bet in self.bets:
-                if not isinstance(existing_bet, ToggleableBetAbstract):
-                    raise BadBetActionException
-                if bet.same_type_and_place(existing_bet):
+            for existing_bet in self.bets.find(bet.__class__, bet.placement):
+                with self.bets.changing(existing_bet):
                     existing_bet.turn_off()
 
     def _process_follow_puck(self, bets: list[BetSignature] = None):
         bets = [BetAbstract.from_signature(signature=signature, table=self) for signature in bets]
         for bet in bets:
-            for existing_bet in self.bets:
-                if bet.same_type_and_place(existing_bet):
+            for existing_bet in self.bets.find(bet.__class__, bet.placement):
+                with self.bets.changing(existing_bet):
                     existing_bet.follow_puck()
 
     def process_instructions(self, instructions):
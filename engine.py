@@ -3,7 +3,8 @@ Module: Craps Engine
 
 This module functions as the engine for the craps microservice
 """
-import copy
+import fractions
+import functools
 import json
 import os
 import secrets
@@ -12,12 +13,16 @@ import typing
 
 import jsonschema
 
-from JsonEncoder import ComplexEncoder
-from craps.bet import get_bet_from_set, BetSignature
+import JsonEncoder
+import phase_timer
+import worker_pool
+from SchemaValidator import SchemaValidator
 from craps.dice import Outcome as DiceOutcome
 from craps.table import table
-from craps.table.bet_abstracts import BetAbstract, TravelingBetAbstract
-from craps.table.bets import Come, PassLine
+from craps.table.bet_abstracts import BetAbstract
+from craps.table.bet_book import BetBook
+from craps.table.config import Config
+from craps.table.settlement import TableSettlement, settle_table
 from craps.table.table import Table
 
 
@@ -37,18 +42,23 @@ class Engine:
         The craps table
     instructions : dict
         Set of instructions for the engine to manipulate bets *before* the roll
+    timer : PhaseTimer
+        Times the table construction, instructions, roll and settlement
     """
     hash: str = None  #: The hash used to generate the dice roll
     dice_roll: DiceOutcome = None  #: The dice outcome once made or specified
     table: Table = None  #: The craps table
     #: Set of instructions for the engine to manipulate bets *before* the roll
     instructions: dict = None
+    #: Times the table construction, instructions, roll and settlement
+    timer: phase_timer.PhaseTimer = phase_timer.NULL_TIMER
 
     def __init__(self,
                  table: Table = None,
                  instructions=None,
                  hash: typing.Union[str, None] = None,
-                 dice: typing.Union[DiceOutcome, list, None] = None):
+                 dice: typing.Union[DiceOutcome, list, None] = None,
+                 timer: typing.Optional[phase_timer.PhaseTimer] = None):
         """
         Initialize a new engine
 
@@ -60,15 +70,20 @@ class Engine:
         :type hash: str
         :param dice: Optional specification for dice roll (used if provided)
         :type dice: Outcome|list|None
+        :param timer: Times the phases of processing (nothing is timed if omitted)
+        :type timer: PhaseTimer|None
         """
         # pylint: disable=redefined-builtin
         # `hash` is appropriate here
+        if timer is not None:
+            self.timer = timer
         self.hash = hash
         if table is None:
             table = {}
         if dice is not None:
             self.dice_roll = dice if isinstance(dice, DiceOutcome) else DiceOutcome(*dice)
-        self.table = table if isinstance(table, Table) else Table(**table)
+        with self.timer.phase('table'):
+            self.table = table if isinstance(table, Table) else Table(**table)
         if instructions is None:
             instructions = {}
         self.instructions = instructions
@@ -80,122 +95,146 @@ class Engine:
         :return: dict
         """
         self.roll_dice()
-        winners = [bet for bet in self.table.bets if
-                   isinstance(bet, BetAbstract) and
-                   bet.is_on() and
-                   bet.is_winner(self.dice_roll)]
-        losers = [bet for bet in self.table.bets if
-                  isinstance(bet, BetAbstract) and
-                  bet.is_on() and
-                  bet.is_loser(self.dice_roll)]
-        bets_after_roll = [copy.copy(bet) for bet in self.table.bets if bet not in losers]
-        new_puck_location = self.table.puck.location()
-        winner_signatures = set()
-        for bet in winners:
-            sig = bet.get_signature().for_json()
-            sig['payout'] = bet.get_payout(self.dice_roll)
-            if bet.has_vig:
-                sig['vig_paid'] = bet.get_vig()
-            winner_signatures.add(BetSignature(**sig))
-
-        dice_total = self.dice_roll.total()
-
-        bets_after_roll = self._get_new_bets(bets_after_roll)
-        if self.table.puck.is_off() and dice_total in self.table.get_valid_points():
-            new_puck_location = dice_total
-        elif self.table.puck.is_on() and dice_total in [7, self.table.puck.location()]:
-            new_puck_location = None
+        for observer in _observers:
+            observer.rolled(self)
+        return self.settle()
+
+    def settle(self) -> dict:
+        """
+        Return the result object for dice already rolled, without telling observers of the roll
+
+        Used when many tables share one roll of the dice, which is only counted once.
+
+        :return: dict
+        """
+        with self.timer.phase('settlement'):
+            settlement = settle_table(self.table, self.dice_roll)
+            result = self._result(settlement)
+        for observer in _observers:
+            observer.settled(self, settlement)
+        return result
 
+    def _result(self, settlement) -> dict:
+        self.table.returned_bets.update(settlement.returned())
         return {
             'table':     {
                 'config':         self.table.config,
                 'puck_location':  self.table.puck.location(),
                 'bets':           self.table.bets,
-                'value_on_table': sum(bet.wager for bet in self.table.bets),
-                'value_at_risk':  sum(bet.wager for bet in self.table.bets if
-                                      isinstance(bet, BetAbstract) and bet.is_on()),
+                'value_on_table': settlement.value_on_table,
+                'value_at_risk':  settlement.value_at_risk,
             },
             'hash':      self.hash,
-            'winners':   winner_signatures,
-            'losers':    losers,
+            'winners':   {winner.get_signature() for winner in settlement.winners()},
+            'losers':    settlement.losers(),
             'returned':  self.table.returned_bets,
             'new_table': {
                 'config':        self.table.config,
-                'puck_location': new_puck_location,
-                'existing_bets': bets_after_roll,
+                'puck_location': settlement.puck_location,
+                'existing_bets': settlement.bets_after_roll(),
             },
             'summary':   {
                 'dice_outcome':             self.dice_roll,
-                'total_returned_to_player': sum(
-                    bet.wager + bet.return_vig() + (bet.odds if bet.odds else 0) for
-                    bet in self.table.returned_bets if isinstance(bet, BetAbstract)),
-                'total_winnings_to_player': sum(bet.get_payout(self.dice_roll) for bet in winners),
-                'value_of_losers':          sum(bet.wager for bet in losers),
-                'value_on_table':           sum(bet.wager for bet in bets_after_roll),
-                'value_at_risk':            sum(bet.wager for bet in
-                                                bets_after_roll if bet.is_on()),
+                'total_returned_to_player': self._total_returned(self.table.returned_bets),
+                'total_winnings_to_player': settlement.total_winnings,
+                'value_of_losers':          settlement.value_of_losers,
+                'value_on_table':           settlement.value_on_table_after_roll,
+                'value_at_risk':            settlement.value_at_risk_after_roll,
             }
         }
 
-    def _get_new_bets(self, bets_after_roll):
-        """
-        Get the bet-list for the new table state
-
-        :param bets_after_roll: List of bets *after* the roll of the current state (losers removed)
-        :return: list[Bet] of bets for the next table state (traveling bets moved or removed)
-        """
-        # pylint: disable=too-many-branches
-        # Logic Tree is as simple as I can get it,
-        dice_total = self.dice_roll.total()
-        new_bets_after_roll = set()
-        for bet in bets_after_roll:
-            if not isinstance(bet, TravelingBetAbstract):
-                new_bets_after_roll.add(bet)
-            # All Traveling Bets
-            elif bet.placement is None and dice_total in self.table.get_valid_points():
-                self._point_set_for_bet(bet, bets_after_roll, new_bets_after_roll)
-            elif bet.placement == dice_total:
-                self._point_hit_for_bet(bet, bets_after_roll, new_bets_after_roll)
-            elif dice_total == 7 and bet.is_winner(self.dice_roll):
-                self.table.returned_bets.add(bet)
-            else:
-                new_bets_after_roll.add(bet)
-        return new_bets_after_roll
-
-    def _point_hit_for_bet(self, bet, bets_after_roll, new_bets_after_roll):
-        if isinstance(bet, Come) and not isinstance(bet, PassLine):
-            found = get_bet_from_set(bet_set=bets_after_roll,
-                                     bet_type=Come,
-                                     bet_placement=None)
-            if not found or found.wager != bet.wager:
-                self.table.returned_bets.add(bet)
-            else:
-                new_bets_after_roll.add(bet)
-        else:
-            bet.placement = None
-            new_bets_after_roll.add(bet)
-
-    def _point_set_for_bet(self, bet, bets_after_roll, new_bets_after_roll):
-        dice_total = self.dice_roll.total()
-        if isinstance(bet, Come):
-            found = get_bet_from_set(bet_set=bets_after_roll,
-                                     bet_type=Come,
-                                     bet_placement=dice_total)
-            if not found or found.wager != bet.wager:
-                bet.placement = dice_total
-            new_bets_after_roll.add(bet)
-        else:
-            bet.placement = dice_total
-            new_bets_after_roll.add(bet)
+    def preview(self) -> dict:
+        """
+        Return what would happen to the table on every possible roll of the dice
+
+        Each of the 21 distinct outcomes is settled against the current table (after any
+        processed instructions) without changing it. Every outcome carries its weight (the
+        number of the 36 dice combinations that make it) and the player's net result: winnings
+        less the wagers and odds of losing bets. The expected value and variance of the net
+        result are included.
+
+        :return: dict
+        """
+        outcomes = []
+        expected_value = fractions.Fraction(0)
+        expected_square = fractions.Fraction(0)
+        for outcome in DiceOutcome.get_all_unique():
+            settlement = settle_table(self.table, outcome)
+            losers = settlement.losers()
+            net = settlement.total_winnings - sum(bet.wager + (bet.odds or 0) for bet in losers)
+            returned = self.table.returned_bets.union(settlement.returned())
+            probability = fractions.Fraction(outcome.ways(), 36)
+            expected_value += probability * net
+            expected_square += probability * net * net
+            outcomes.append({
+                'dice_outcome': outcome,
+                'weight':       outcome.ways(),
+                'probability':  float(probability),
+                'net':          net,
+                'winners':      {winner.get_signature() for winner in settlement.winners()},
+                'losers':       losers,
+                'returned':     returned,
+                'new_table':    {
+                    'config':        self.table.config,
+                    'puck_location': settlement.puck_location,
+                    'existing_bets': settlement.bets_after_roll(),
+                },
+                'summary':      {
+                    'total_returned_to_player': self._total_returned(returned),
+                    'total_winnings_to_player': settlement.total_winnings,
+                    'value_of_losers':          settlement.value_of_losers,
+                    'value_on_table':           settlement.value_on_table_after_roll,
+                    'value_at_risk':            settlement.value_at_risk_after_roll,
+                },
+            })
+        return {
+            'table':          {
+                'config':         self.table.config,
+                'puck_location':  self.table.puck.location(),
+                'bets':           self.table.bets,
+            },
+            'outcomes':       outcomes,
+            'expected_value': float(expected_value),
+            'variance':       float(expected_square - expected_value ** 2),
+        }
+
+    @staticmethod
+    def _total_returned(returned_bets) -> int:
+        return sum(bet.wager + bet.return_vig() + (bet.odds if bet.odds else 0) for
+                   bet in returned_bets if isinstance(bet, BetAbstract))
+
+    def advance_table(self, result: dict):
+        """
+        Move the live table to the state described by a result from `get_result`
+
+        Losing and returned bets are taken down, traveling bets are left where they moved to,
+        and the puck is placed or removed as needed.
+
+        :param result: Result object returned by `get_result`
+        :type result: dict
+        """
+        new_table = result['new_table']
+        self.table.bets = BetBook(new_table['existing_bets'])
+        self.table.returned_bets = set()
+        if new_table['puck_location'] is None:
+            if self.table.puck.is_on():
+                self.table.puck.remove()
+        elif self.table.puck.location() != new_table['puck_location']:
+            self.table.puck.place(new_table['puck_location'])
 
     def process_instructions(self):
         """Process the instructions list."""
-        self.table.process_instructions(self.instructions)
+        with self.timer.phase('instructions'):
+            self.table.process_instructions(self.instructions)
 
     def roll_dice(self):
         """Sets dice_roll to a new value if not set."""
         if self.dice_roll:
             return
+        with self.timer.phase('roll'):
+            self._roll_from_hash()
+
+    def _roll_from_hash(self):
         self.hash = (self.hash if self.hash else secrets.token_hex(32)).lower()
         for hex_pair in textwrap.wrap(self.hash, 2):
             octal = f"{int(hex_pair, 16):02o}"
@@ -210,6 +249,83 @@ class Engine:
             self.dice_roll = DiceOutcome(red_die, blue_die)
 
 
+class Session:
+    """
+    Craps Session
+
+    Keeps a live table between rolls so consecutive rolls can be made without rebuilding the
+    table from its JSON representation each time. The table is only serialized when asked for.
+
+    Attributes
+    ----------
+    table : Table
+        The live craps table
+    rolls : int
+        Number of rolls made during the session
+    """
+    table: Table = None  #: The live craps table
+    rolls: int = 0  #: Number of rolls made during the session
+
+    def __init__(self, table: typing.Union[Table, dict, None] = None):
+        """
+        Start a new session
+
+        :param table: Craps Table (or its request representation)
+        :type table: Table|dict|None
+        """
+        if table is None:
+            table = {}
+        self.table = table if isinstance(table, Table) else Table(**table)
+        self.rolls = 0
+
+    def roll(self,
+             instructions: typing.Optional[dict] = None,
+             hash: typing.Union[str, None] = None,
+             dice: typing.Union[DiceOutcome, list, None] = None) -> dict:
+        """
+        Process any instructions, roll the dice, and advance the live table
+
+        The bets referenced by the returned result belong to the live table, serialize the result
+        before the next roll if it is needed as it was at the time of the roll.
+
+        :param instructions: Instruction Set For Dealers to process before the dice roll
+        :type instructions: dict|None
+        :param hash: SHA-256 hash string used initialize the dice roller
+        :type hash: str|None
+        :param dice: Optional specification for dice roll (used if provided)
+        :type dice: Outcome|list|None
+        :return: Result object for the roll
+        :rtype: dict
+        :raise Exception: if an instruction is rejected, leaving the session unchanged
+        """
+        # pylint: disable=redefined-builtin
+        # `hash` is appropriate here
+        table = self.table
+        if instructions:
+            # Instructions change bets in place: work on a copy so a rejected roll changes nothing
+            table = table.copy()
+        engine = Engine(table=table, instructions=instructions, hash=hash, dice=dice)
+        engine.process_instructions()
+        result = engine.get_result()
+        engine.advance_table(result)
+        self.table = table
+        self.rolls += 1
+        return result
+
+    def for_json(self) -> dict:
+        """
+        Current table state as a request `table` object for json encoding
+
+        :return: dict representing the table state
+        :rtype: dict
+        """
+        return {
+            'config':        self.table.config,
+            'puck_location': self.table.puck.location(),
+            'existing_bets': self.table.get_bet_signatures(),
+        }
+
+
 __location__ = os.path.realpath(
     os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
@@ -220,20 +336,455 @@ with open(os.path.join(__location__, 'sample-request.json'), encoding='utf-8') a
     req = json.load(f)
 
 
-def process_request(request):
+@functools.cache
+def get_request_validator() -> SchemaValidator:
+    """
+    Request validator, compiled from `RequestSchema.json` on first use
+
+    :rtype: SchemaValidator
+    """
+    return SchemaValidator(requestSchema)
+
+
+#: Output formats supported by `process_request`
+OUTPUT_FORMATS = ('dict', 'str', 'bytes')
+
+
+class Observer:
+    """
+    Told about every roll of the dice, every table an engine settles and every request processed
+
+    Subclass it, override what is of interest, and register an instance with `add_observer`.
+    Observers must not change what they are given.
+    """
+
+    def rolled(self, dealer: Engine):
+        """
+        An engine rolled the dice in `get_result`, or for every player of `process_shared_roll`
+
+        :param dealer: The engine, holding the dice outcome
+        :type dealer: Engine
+        """
+
+    def settled(self, dealer: Engine, settlement: TableSettlement):
+        """
+        An engine settled a table in `get_result` (once per player of a shared roll)
+
+        :param dealer: The engine, holding the table as it was before the roll
+        :type dealer: Engine
+        :param settlement: Settlement of the roll
+        :type settlement: TableSettlement
+        """
+
+    def processed(self, response: dict):
+        """
+        `process_request` built a response (error responses included), before encoding it
+
+        :param response: The response object
+        :type response: dict
+        """
+
+
+_observers: list[Observer] = []
+
+
+def add_observer(observer: Observer):
+    """
+    Tell an observer about every roll, table settled and request processed from now on
+
+    :param observer: The observer
+    :type observer: Observer
+    """
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def remove_observer(observer: Observer):
+    """
+    Stop telling an observer anything
+
+    :param observer: The observer
+    :type observer: Observer
+    """
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def warm():
+    """
+    Load everything the first request would, so no request pays for it
+
+    Compiles the request validator, the default table configuration and its rules, and
+    processes the table of the sample request once. Call it before forking worker processes,
+    or while a Lambda sandbox initializes.
+    """
+    get_request_validator()
+    Config.from_json({}).rules()
+    process_request({'table': req['table']}, output='bytes')
+
+
+def process_request(request, output: str = 'dict', debug: bool = False):
     """
     Validate and process a request object
 
-    :param request: request object
+    The request is never modified. With an `output` of `str` or `bytes` the response is
+    encoded exactly once, straight to the JSON document sent over the wire.
+
+    With `debug` the response gets a `debug` section holding the seconds spent in each phase
+    of processing (all but the encoding, which is still to come), see `phase_timer`. Timings
+    of every phase also go to the `phase_timer` sink, if one is set.
+
+    :param request: request object (or the JSON document for one)
+    :type request: dict|str|bytes
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :param debug: Add the time spent in each phase to the response
+    :type debug: bool
+    :return: response object
+    :rtype: dict|str|bytes
+    """
+    return respond(functools.partial(build_response, request), output, debug)
+
+
+def respond(build: typing.Callable[[phase_timer.PhaseTimer], dict], output: str = 'dict',
+            debug: bool = False):
+    """
+    Build the response to a request, tell observers about it, encode it, and report its timings
+
+    Every way of answering a request goes through here, so observers and the `phase_timer` sink
+    see each one. Observers are told about a request that raises as well, with an error
+    response for it.
+
+    :param build: Called with the timer of the request, returns the response object
+    :type build: Callable[[PhaseTimer], dict]
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :param debug: Add the time spent in each phase to the response
+    :type debug: bool
+    :return: response object
+    :rtype: dict|str|bytes
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f'Unknown output format {output}')
+    timer = phase_timer.for_request(debug)
+    try:
+        response = build(timer)
+    except Exception as error:
+        for observer in _observers:
+            observer.processed(error_response(error))
+        raise
+    return _finish(response, output, timer, debug)
+
+
+def preview_request(request, output: str = 'dict'):
+    """
+    Validate a request object and preview the outcome of every possible roll
+
+    The request is processed as by `process_request` (including its instructions), but instead
+    of rolling the dice the response is `Engine.preview()` for the resulting table.
+
+    :param request: request object (or the JSON document for one)
+    :type request: dict|str|bytes
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :return: response object
+    :rtype: dict|str|bytes
+    """
+    return respond(functools.partial(_build_preview, request), output)
+
+
+def _build_preview(request, timer: phase_timer.PhaseTimer) -> dict:
+    try:
+        request = _validated(request, timer)
+    except (ValueError, jsonschema.exceptions.ValidationError) as error:
+        return error_response(error)
+    engine = Engine(**request, timer=timer)
+    engine.process_instructions()
+    return engine.preview()
+
+
+def process_shared_roll(request, output: str = 'dict'):
+    """
+    Validate and process one roll of the dice shared by many players
+
+    The request holds the shared `table` (its `config` and `puck_location`), an optional `hash`
+    or `dice`, and `players`: a list of objects with each player's `existing_bets` and optional
+    `instructions`. The configuration is parsed and the dice are rolled once for everyone, and
+    players with identical bets and instructions are processed once. The response holds the
+    `hash`, the `dice_outcome`, and a `players` list with, for each player in order, the same
+    result `process_request` would give for their table (or an error response for that player).
+
+    :param request: request object (or the JSON document for one)
+    :type request: dict|str|bytes
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :return: response object
+    :rtype: dict|str|bytes
+    """
+    return respond(functools.partial(_build_shared_roll, request), output)
+
+
+def _build_shared_roll(request, timer: phase_timer.PhaseTimer) -> dict:
+    try:
+        if isinstance(request, (str, bytes)):
+            with timer.phase('decode'):
+                request = JsonEncoder.loads(request)
+        if not isinstance(request, dict) or not isinstance(request.get('players', []), list):
+            raise ValueError('Shared roll request requires a list of players')
+        shared = {key: value for key, value in request.items() if key in ('hash', 'dice')}
+        shared_table = request.get('table', {})
+        if not isinstance(shared_table, dict):
+            raise ValueError('Shared roll table must be an object')
+        shared['table'] = {key: value for key, value in shared_table.items() if key in ('config', 'puck_location')}
+        shared = _validated(shared, timer)
+    except (ValueError, jsonschema.exceptions.ValidationError) as error:
+        return error_response(error)
+    dealer = Engine(**shared, timer=timer)
+    dealer.roll_dice()
+    for observer in _observers:
+        observer.rolled(dealer)
+    config, puck_location = dealer.table.config, dealer.table.puck.location()
+    processed = {}
+    results = []
+    for player in request.get('players', []):
+        key = _canonical_key(player)
+        if key is None or key not in processed:
+            result = _process_player(player, config, puck_location, dealer)
+            if key is not None:
+                processed[key] = result
+        results.append(result if key is None else processed[key])
+    return {'hash':         dealer.hash,
+            'dice_outcome': dealer.dice_roll,
+            'players':      results}
+
+
+def process_request_group(requests: typing.Sequence, output: str = 'dict') -> list:
+    """
+    Validate and process request objects that arrived together
+
+    Each request is answered exactly as by `process_request`, but the requests are grouped by
+    table configuration first, so each distinct configuration is resolved once for its whole
+    group. A request that fails gets an error response without affecting the others. Phase
+    timings are kept per request, with the resolution of a configuration timed in the `table`
+    phase of the first request of its group.
+
+    :param requests: request objects (or JSON documents for them)
+    :type requests: Sequence
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :return: response objects, in the same order as the requests
+    :rtype: list
+    """
+    # pylint: disable=broad-except
+    # One bad request must not take down the rest of the group
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f'Unknown output format {output}')
+    responses = [None] * len(requests)
+    timers = [phase_timer.for_request() for _ in requests]
+    groups = {}
+    for index, request in enumerate(requests):
+        try:
+            request = _validated(request, timers[index])
+        except (ValueError, jsonschema.exceptions.ValidationError) as error:
+            responses[index] = _finish(error_response(error), output, timers[index])
+            continue
+        config = request.get('table', {}).get('config', {})
+        groups.setdefault(config_key(request), (config, []))[1].append((index, request))
+    for config, members in groups.values():
+        try:
+            # Resolved once for the group, in the table phase of its first request
+            with timers[members[0][0]].phase('table'):
+                config = Config.from_json(config)
+        except Exception as error:
+            for index, _ in members:
+                responses[index] = _finish(error_response(error), output, timers[index])
+            continue
+        for index, request in members:
+            try:
+                engine = Engine(**{**request, 'table': {**request.get('table', {}), 'config': config}},
+                                timer=timers[index])
+                engine.process_instructions()
+                engine.roll_dice()
+                responses[index] = _finish(engine.get_result(), output, timers[index])
+            except Exception as error:
+                responses[index] = _finish(error_response(error), output, timers[index])
+    return responses
+
+
+def config_key(request) -> typing.Optional[str]:
+    """
+    Key shared by every request with an equal table configuration
+
+    :param request: request object (or the JSON document for one)
+    :type request: dict|str|bytes
+    :return: Canonical JSON of the configuration (None if the request cannot be read)
+    :rtype: str|None
+    """
+    try:
+        if isinstance(request, (str, bytes)):
+            request = JsonEncoder.loads(request)
+        return _canonical_key(request.get('table', {}).get('config', {}))
+    except (ValueError, AttributeError):
+        return None
+
+
+def build_response(request, timer: phase_timer.PhaseTimer = phase_timer.NULL_TIMER):
+    """
+    Validate and process a request object, without encoding the response
+
+    Requests that can not be decoded or fail validation get an error response, any other
+    problem with the request is raised.
+
+    :param request: request object (or the JSON document for one)
+    :type request: dict|str|bytes
+    :param timer: Times the phases of processing
+    :type timer: PhaseTimer
     :return: response object
+    :rtype: dict
     """
     try:
-        jsonschema.validate(instance=request, schema=requestSchema)
-    except jsonschema.exceptions.ValidationError as error:
-        return {"success": False, "exception": {"type": str(type(error)), "message": str(error)}}
-    original = copy.deepcopy(request)
-    request = copy.deepcopy(original)
-    engine = Engine(**request)
+        request = _validated(request, timer)
+    except (ValueError, jsonschema.exceptions.ValidationError) as error:
+        return error_response(error)
+    engine = Engine(**request, timer=timer)
     engine.process_instructions()
     engine.roll_dice()
-    return json.loads(json.dumps(engine.get_result(), cls=ComplexEncoder))
+    return engine.get_result()
+
+
+def error_response(error: Exception) -> dict:
+    """
+    Response object for a request that could not be processed
+
+    :param error: The problem with the request
+    :type error: Exception
+    :rtype: dict
+    """
+    return {"success": False, "exception": {"type": str(type(error)), "message": str(error)}}
+
+
+def encode_response(response, output: str = 'dict'):
+    """
+    Encode a response object
+
+    :param response: Response object from `build_response`
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :rtype: dict|str|bytes
+    """
+    if output == 'str':
+        return JsonEncoder.dumps(response)
+    if output == 'bytes':
+        return JsonEncoder.dumpb(response)
+    return JsonEncoder.primitive(response)
+
+
+def process_requests(requests: typing.Iterable,
+                     workers: typing.Optional[int] = None,
+                     chunksize: int = worker_pool.DEFAULT_CHUNKSIZE,
+                     output: str = 'dict') -> list:
+    """
+    Validate and process many independent request objects
+
+    See `iter_process_requests`.
+
+    :param requests: request objects
+    :type requests: Iterable
+    :param workers: Number of worker processes (defaults to the CPU count, 1 processes in-process)
+    :type workers: int|None
+    :param chunksize: Number of requests sent to a worker at a time
+    :type chunksize: int
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :return: response objects, in the same order as the requests
+    :rtype: list
+    """
+    return list(iter_process_requests(requests, workers=workers, chunksize=chunksize, output=output))
+
+
+def iter_process_requests(requests: typing.Iterable,
+                          workers: typing.Optional[int] = None,
+                          chunksize: int = worker_pool.DEFAULT_CHUNKSIZE,
+                          output: str = 'dict',
+                          ordered: bool = True) -> typing.Iterator:
+    """
+    Validate and process many independent request objects, yielding responses as they are ready
+
+    Requests are sent to a pool of worker processes in chunks, with only a few chunks per worker
+    in flight at a time, so the requests can be a stream of any length. A request that fails
+    yields an error response, in the same form as a validation failure, instead of stopping the
+    batch.
+
+    :param requests: request objects (or JSON documents for them)
+    :type requests: Iterable
+    :param workers: Number of worker processes (defaults to the CPU count, 1 processes in-process)
+    :type workers: int|None
+    :param chunksize: Number of requests sent to a worker at a time
+    :type chunksize: int
+    :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+    :type output: str
+    :param ordered: Yield responses in the same order as the requests
+    :type ordered: bool
+    :return: response objects
+    :rtype: Iterator
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f'Unknown output format {output}')
+    return worker_pool.imap(functools.partial(_process_request_or_error, output=output),
+                            requests, workers=workers, chunksize=chunksize, ordered=ordered)
+
+
+def _validated(request, timer: phase_timer.PhaseTimer = phase_timer.NULL_TIMER) -> dict:
+    if isinstance(request, (str, bytes)):
+        with timer.phase('decode'):
+            request = JsonEncoder.loads(request)
+    with timer.phase('validation'):
+        get_request_validator().validate(request)
+    return request
+
+
+def _finish(response: dict, output: str, timer: phase_timer.PhaseTimer, debug: bool = False):
+    for observer in _observers:
+        observer.processed(response)
+    if debug:
+        response = {**response, 'debug': {'timings': dict(timer.timings)}}
+    with timer.phase('encoding'):
+        response = encode_response(response, output)
+    phase_timer.report(timer)
+    return response
+
+
+def _canonical_key(value) -> typing.Optional[str]:
+    try:
+        return json.dumps(value, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+
+def _process_player(player, config, puck_location, dealer: 'Engine') -> dict:
+    # pylint: disable=broad-except
+    # One bad player must not take down the rest of the table
+    try:
+        if not isinstance(player, dict):
+            raise ValueError('Player must be an object')
+        request = _validated({'table':        {'existing_bets': player.get('existing_bets', [])},
+                              'instructions': player.get('instructions', {})})
+        engine = Engine(table=Table(config=config, puck_location=puck_location,
+                                    existing_bets=request['table']['existing_bets']),
+                        instructions=request['instructions'],
+                        hash=dealer.hash,
+                        dice=dealer.dice_roll)
+        engine.process_instructions()
+        engine.roll_dice()
+        return engine.settle()
+    except Exception as error:
+        return error_response(error)
+
+
+def _process_request_or_error(request, output: str):
+    # pylint: disable=broad-except
+    # One bad request must not take down the rest of a batch
+    try:
+        return process_request(request, output=output)
+    except Exception as error:
+        return encode_response(error_response(error), output)
@@ -1,10 +1,7 @@
-import json
 import engine
-from JsonEncoder import ComplexEncoder
+
+engine.warm()
 
 
 def lambda_handler(event, context):
-    result = engine.process_request(event)
-    if not isinstance(result, str):
-        result = json.dumps(result, cls=ComplexEncoder)
-    return json.loads(result)
+    return engine.process_request(event)
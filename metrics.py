@@ -0,0 +1,287 @@
+"""
+Module: Metrics
+
+Counters of what the engine does, in the Prometheus text exposition format.
+
+`EngineMetrics` observes the engine (see `engine.add_observer`) and the phase timings of every
+request (see `phase_timer`), without changing any result. It counts requests processed,
+failures by error type, bets settled by bet class and result, dice outcomes and the amounts
+paid and lost, keeps a latency histogram per phase, and reads the hit and miss counts of the
+configuration caches when rendered.
+
+    collector = metrics.install()
+    ...
+    collector.render()  # or collector.write(path) for a node exporter textfile collector
+
+Only the process the collector is installed in is observed.
+"""
+import collections
+import math
+import os
+import re
+import tempfile
+import threading
+import typing
+
+import engine
+import phase_timer
+from craps.table.config import Config
+from craps.table.config.rules import compile_rules
+from craps.table.settlement import TableSettlement
+
+#: Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+#: Content type of the rendered metrics
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+#: Counters kept, with their help text
+COUNTERS = {
+    'craps_requests_total':         'Requests processed, by result',
+    'craps_request_failures_total': 'Requests answered with an error response, by error type',
+    'craps_dice_outcomes_total':    'Rolls of the dice, by dice outcome',
+    'craps_bets_settled_total':     'Bets settled, by bet class and result',
+    'craps_payouts_total':          'Total paid to players on winning bets',
+    'craps_losing_wagers_total':    'Total wagers of losing bets',
+}
+#: Histograms kept, with their help text
+HISTOGRAMS = {
+    'craps_phase_seconds':   'Seconds spent in each phase of processing a request',
+    'craps_request_seconds': 'Wall clock seconds spent processing a request',
+}
+
+#: Caches reported, with the function giving their `cache_info()`
+CACHES = {
+    'config': Config.cache_info,
+    'rules':  compile_rules.cache_info,
+}
+
+_ERROR_TYPE = re.compile(r"<class '(?:[\w.]*\.)?(\w+)'>")
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+class EngineMetrics(engine.Observer):
+    """
+    Counters and latency histograms of the engine
+
+    All operations are thread safe.
+
+    Attributes
+    ----------
+    buckets : tuple[float, ...]
+        Upper bounds, in seconds, of the latency histogram buckets
+    """
+    buckets: tuple[float, ...]  #: Upper bounds, in seconds, of the latency histogram buckets
+
+    def __init__(self, buckets: typing.Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Start with every count at zero
+
+        :param buckets: Upper bounds, in seconds, of the latency histogram buckets
+        :type buckets: Iterable[float]
+        """
+        self.buckets = tuple(sorted(bucket for bucket in buckets if bucket != math.inf))
+        self._counters = {name: collections.Counter() for name in COUNTERS}
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        self._lock = threading.Lock()
+
+    def rolled(self, dealer: engine.Engine):
+        """
+        Count the dice outcome
+
+        :param dealer: The engine that rolled the dice
+        :type dealer: Engine
+        """
+        dice = ','.join(str(die) for die in dealer.dice_roll.for_json())
+        with self._lock:
+            self._counters['craps_dice_outcomes_total'][(('dice', dice),)] += 1
+
+    def settled(self, dealer: engine.Engine, settlement: TableSettlement):
+        """
+        Count every bet settled, and the amounts paid and lost
+
+        :param dealer: The engine that settled the roll
+        :type dealer: Engine
+        :param settlement: Settlement of the roll
+        :type settlement: TableSettlement
+        """
+        with self._lock:
+            for record in settlement.settlements:
+                result = 'returned' if record.returned else record.status.value.lower()
+                self._counters['craps_bets_settled_total'][(('bet', type(record.bet).__name__),
+                                                            ('result', result))] += 1
+            self._counters['craps_payouts_total'][()] += settlement.total_winnings
+            self._counters['craps_losing_wagers_total'][()] += settlement.value_of_losers
+
+    def processed(self, response: dict):
+        """
+        Count a request, and its error type if it failed
+
+        :param response: The response object
+        :type response: dict
+        """
+        failed = response.get('success') is False
+        with self._lock:
+            self._counters['craps_requests_total'][(('result', 'failure' if failed else 'success'),)] += 1
+            if failed:
+                error_type = str(response.get('exception', {}).get('type'))
+                match = _ERROR_TYPE.fullmatch(error_type)
+                self._counters['craps_request_failures_total'][
+                    (('type', match.group(1) if match else error_type),)] += 1
+
+    def observe_timings(self, timings: dict[str, float], elapsed: float):
+        """
+        Add the timings of a request to the latency histograms
+
+        :param timings: Seconds spent in each phase
+        :type timings: dict[str, float]
+        :param elapsed: Wall clock seconds spent on the whole request
+        :type elapsed: float
+        """
+        with self._lock:
+            for phase, seconds in timings.items():
+                self._observe('craps_phase_seconds', (('phase', phase),), seconds)
+            self._observe('craps_request_seconds', (), elapsed)
+
+    def value(self, name: str, **labels) -> float:
+        """
+        Current value of a counter
+
+        :param name: Name of the counter
+        :type name: str
+        :param labels: Labels of the series
+        :return: The count (0 for a series never counted)
+        :rtype: float
+        :raise KeyError: on an unknown counter
+        """
+        with self._lock:
+            return self._counters[name][tuple(sorted(labels.items()))]
+
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format
+
+        :rtype: str
+        """
+        lines = []
+        with self._lock:
+            for name, help_text in COUNTERS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                lines += [f'{name}{_labels(labels)} {_number(value)}'
+                          for labels, value in sorted(self._counters[name].items())]
+            for name, help_text in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for labels, (counts, total) in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (math.inf,), counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+                    lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        lines += _cache_lines()
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """
+        Write every metric to a file, replacing it in one step so readers never see half of it
+
+        :param path: Path of the file
+        :type path: str
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, encoding='utf-8',
+                                         prefix='.metrics-', suffix='.tmp') as file:
+            file.write(self.render())
+        os.replace(file.name, path)
+
+    def _observe(self, name: str, labels: _Labels, seconds: float):
+        counts, total = self._histograms[name].get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        counts[index] += 1
+        self._histograms[name][labels] = (counts, total + seconds)
+
+
+_installed: typing.Optional[EngineMetrics] = None
+_previous_sink: typing.Optional[phase_timer.Sink] = None
+
+
+def install(metrics: typing.Optional[EngineMetrics] = None) -> EngineMetrics:
+    """
+    Start collecting metrics of this process
+
+    The collector observes the engine and receives the phase timings of every request (after
+    any sink already set, which keeps receiving them). Any collector installed before is
+    uninstalled first.
+
+    :param metrics: Collector (a new one if omitted)
+    :type metrics: EngineMetrics|None
+    :return: The installed collector
+    :rtype: EngineMetrics
+    """
+    # pylint: disable=global-statement
+    global _installed, _previous_sink
+    uninstall()
+    metrics = metrics if metrics is not None else EngineMetrics()
+    previous = phase_timer.get_sink()
+
+    def sink(timings: dict[str, float], elapsed: float):
+        if previous is not None:
+            previous(timings, elapsed)
+        metrics.observe_timings(timings, elapsed)
+
+    engine.add_observer(metrics)
+    phase_timer.set_sink(sink)
+    _installed, _previous_sink = metrics, previous
+    return metrics
+
+
+def uninstall():
+    """Stop collecting metrics, giving the phase timings back to the sink set before"""
+    # pylint: disable=global-statement
+    global _installed, _previous_sink
+    if _installed is None:
+        return
+    engine.remove_observer(_installed)
+    phase_timer.set_sink(_previous_sink)
+    _installed, _previous_sink = None, None
+
+
+def installed() -> typing.Optional[EngineMetrics]:
+    """
+    The collector installed, if any
+
+    :rtype: EngineMetrics|None
+    """
+    return _installed
+
+
+def _cache_lines() -> list[str]:
+    infos = {cache: cache_info() for cache, cache_info in CACHES.items()}
+    lines = []
+    for name, help_text, kind, value in [
+            ('craps_cache_hits_total', 'Lookups answered from a cache', 'counter', lambda info: info.hits),
+            ('craps_cache_misses_total', 'Lookups a cache could not answer', 'counter', lambda info: info.misses),
+            ('craps_cache_hit_ratio', 'Share of lookups answered from a cache', 'gauge',
+             lambda info: info.hits / (info.hits + info.misses) if info.hits + info.misses else 0),
+            ('craps_cache_size', 'Entries held in a cache', 'gauge', lambda info: info.currsize)]:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines += [f'{name}{_labels((("cache", cache),))} {_number(value(info))}' for cache, info in infos.items()]
+    return lines
+
+
+def _labels(labels: _Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
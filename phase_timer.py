@@ -0,0 +1,158 @@
+"""
+Module: Phase Timer
+
+Optional timing of each phase of processing a request.
+
+A `PhaseTimer` adds up the time spent in named phases. When nothing asks for timings the shared
+`NULL_TIMER` stands in for it: its phases do nothing, so instrumented code pays for little more
+than a method call. Timings are given back in the `debug` section of a response
+(`process_request(request, debug=True)`), and to the sink set with `set_sink`, if any, for
+every request processed, with the wall clock time of the whole request.
+"""
+import time
+import typing
+
+#: Called with the seconds spent in each phase of a request, and in the whole request
+Sink = typing.Callable[[dict[str, float], float], None]
+
+#: Phases of processing a request, in the order they happen
+PHASES = ('decode', 'validation', 'table', 'instructions', 'roll', 'settlement', 'encoding')
+
+_sink: typing.Optional[Sink] = None
+
+
+class _Phase:
+    __slots__ = ('_timings', '_name', '_start')
+
+    def __init__(self, timings: dict[str, float], name: str):
+        self._timings = timings
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc_info):
+        self._timings[self._name] = self._timings.get(self._name, 0.0) + time.perf_counter() - self._start
+
+
+class PhaseTimer:
+    """
+    Adds up the time spent in each phase
+
+    Attributes
+    ----------
+    timings : dict[str, float]
+        Seconds spent in each phase timed so far
+    started : float
+        `time.perf_counter()` when the timer was made, at the start of the request
+    """
+    __slots__ = ('timings', 'started')
+    timings: dict[str, float]  #: Seconds spent in each phase timed so far
+    started: float  #: `time.perf_counter()` when the timer was made, at the start of the request
+
+    def __init__(self):
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    def phase(self, name: str) -> typing.ContextManager:
+        """
+        Context timing a phase, added to any time already spent in it
+
+        :param name: Name of the phase
+        :type name: str
+        :rtype: typing.ContextManager
+        """
+        return _Phase(self.timings, name)
+
+    def total(self) -> float:
+        """
+        Seconds spent in every phase
+
+        :rtype: float
+        """
+        return sum(self.timings.values())
+
+    def elapsed(self) -> float:
+        """
+        Wall clock seconds since the timer was made, time between phases included
+
+        :rtype: float
+        """
+        return time.perf_counter() - self.started
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        return None
+
+
+class NullTimer(PhaseTimer):
+    """
+    Timer that times nothing
+    """
+    __slots__ = ()
+    _PHASE = _NullPhase()
+
+    def phase(self, name: str) -> typing.ContextManager:
+        """
+        Context that does nothing
+
+        :param name: Name of the phase
+        :type name: str
+        :rtype: typing.ContextManager
+        """
+        return self._PHASE
+
+
+#: The timer used when no timings are wanted
+NULL_TIMER = NullTimer()
+
+
+def set_sink(sink: typing.Optional[Sink]):
+    """
+    Send the timings of every request processed to a sink (None stops)
+
+    :param sink: Called with the seconds spent in each phase of a request, and in the whole request
+    :type sink: Sink|None
+    """
+    # pylint: disable=global-statement
+    global _sink
+    _sink = sink
+
+
+def get_sink() -> typing.Optional[Sink]:
+    """
+    The sink set with `set_sink`
+
+    :rtype: Sink|None
+    """
+    return _sink
+
+
+def for_request(debug: bool = False) -> PhaseTimer:
+    """
+    Timer for a request: a new one if its timings are wanted, otherwise `NULL_TIMER`
+
+    :param debug: The timings are wanted for the response
+    :type debug: bool
+    :rtype: PhaseTimer
+    """
+    return PhaseTimer() if debug or _sink is not None else NULL_TIMER
+
+
+def report(timer: PhaseTimer):
+    """
+    Send the timings of a finished request, and its wall clock time, to the sink, if one is set
+
+    :param timer: Timer of the request
+    :type timer: PhaseTimer
+    """
+    if _sink is not None and timer is not NULL_TIMER:
+        _sink(dict(timer.timings), timer.elapsed())
@@ -0,0 +1,825 @@
+"""
+Module: Craps Engine Server
+
+A small asyncio HTTP/1.1 server for the engine, with keep-alive connections.
+
+Engine work (processing, previews, batches, shared rolls) runs in a pool of worker processes so
+the event loop never waits on it. Sessions hold live tables in this process, and are all
+handled on one dedicated thread. The Lambda invocation path is served too, so clients of the
+Docker image can point at this server unchanged.
+
+Requests to process arriving within a few milliseconds of each other are coalesced: they are
+handed to a worker together and processed as one group, sharing the setup of their table
+configuration, and each caller is answered with its own response.
+
+With `--prefork N` the server instead forks N processes sharing one listening socket, each
+serving requests on its own (sessions are not served in this mode, as no process holds them
+all). Everything a first request would load is loaded once before forking, so every process
+starts warm, and with `--max-requests` a process is replaced after serving that many requests.
+
+With `--metrics` the engine runs in the serving process, and metrics of everything it does are
+served in the Prometheus text format (see `metrics`); `--metrics-file` writes them to a file as
+well, for a node exporter textfile collector.
+
+Usage: python3 server.py [--host 127.0.0.1] [--port 8080] [-w workers | --prefork processes]
+                         [--max-requests n] [--batch-window ms] [--metrics] [--metrics-file path]
+
+Routes
+------
+POST /process, POST /2015-03-31/functions/function/invocations
+    A request object, answered as by `process_request`
+POST /preview
+    A request object, answered as by `preview_request`
+POST /batch
+    A JSON array of request objects, answered by an array of responses in the same order
+POST /shared-roll
+    A shared roll request, answered as by `process_shared_roll`
+POST /sessions
+    Optionally a `table`, starts a session and answers with its `session_id`
+POST /sessions/restore
+    A state from `GET /sessions/{id}`, restores the session and answers with its `session_id`
+POST /sessions/{id}
+    Optional `instructions`, `hash` and `dice`, rolls for the session
+GET /sessions/{id}
+    Exported state of the session
+DELETE /sessions/{id}
+    Ends the session
+GET /metrics
+    Metrics in the Prometheus text format (with `--metrics` only)
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import http
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import traceback
+import typing
+
+import JsonEncoder
+import engine
+import metrics
+import session_store
+import worker_pool
+
+#: Path the AWS Lambda runtime interface emulator serves invocations on
+LAMBDA_PATH = '/2015-03-31/functions/function/invocations'
+#: Largest request body accepted, in bytes
+DEFAULT_MAX_BODY = 8 * 1024 * 1024
+#: Largest request line and headers accepted, in bytes
+MAX_HEADER = 64 * 1024
+#: Seconds an idle keep-alive connection is held open
+DEFAULT_KEEP_ALIVE = 75.0
+#: Seconds requests to process are gathered for before they are processed together
+DEFAULT_BATCH_WINDOW = 0.002
+#: Most requests processed together
+DEFAULT_MAX_BATCH = 256
+#: Pending connections queued on a listening socket
+BACKLOG = 1024
+#: Seconds between writes of the metrics file
+METRICS_FILE_INTERVAL = 15.0
+
+#: HTTP status, body and (for bodies other than JSON) content type
+Response = typing.Union[tuple[int, bytes], tuple[int, bytes, str]]
+
+
+class HttpError(Exception):
+    """Request that can not be served, with the HTTP status to answer it with"""
+
+    def __init__(self, status: http.HTTPStatus, message: str = ''):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class RequestCoalescer:
+    """
+    Gathers items submitted within a short window and hands them to a handler together
+
+    The window opens with the first item submitted, and the batch is handled as soon as the
+    window closes or `max_batch` items are waiting, whichever is first. Every caller gets the
+    result for its own item (or the handler's exception).
+
+    Attributes
+    ----------
+    window : float
+        Seconds items are gathered for
+    max_batch : int
+        Most items handled together
+    """
+    window: float  #: Seconds items are gathered for
+    max_batch: int  #: Most items handled together
+
+    def __init__(self,
+                 handler: typing.Callable[[list], typing.Awaitable[list]],
+                 window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        Create a coalescer
+
+        :param handler: Coroutine function answering a list of items with a list of results in the
+            same order
+        :type handler: Callable
+        :param window: Seconds items are gathered for
+        :type window: float
+        :param max_batch: Most items handled together
+        :type max_batch: int
+        :raise ValueError: on a max_batch less than 1
+        """
+        if max_batch < 1:
+            raise ValueError('max_batch must be positive')
+        self.window = window
+        self.max_batch = max_batch
+        self._handler = handler
+        self._pending = []
+        self._timer = None
+        # Batches being handled, held until done so none is garbage collected half way
+        self._tasks = set()
+
+    async def submit(self, item):
+        """
+        Result of the handler for an item, once its batch is handled
+
+        :param item: Item to handle
+        :return: Result for the item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        """Hand every waiting item to the handler now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._handle(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, batch: list):
+        # pylint: disable=broad-except
+        # The failure is handed to every caller waiting on the batch
+        try:
+            results = await self._handler([item for item, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class EngineServer:
+    """
+    HTTP server for the engine
+
+    Attributes
+    ----------
+    workers : int
+        Number of worker processes
+    store : SessionStore|None
+        Live sessions (None if sessions are not served)
+    max_body : int
+        Largest request body accepted, in bytes
+    keep_alive : float
+        Seconds an idle connection is held open
+    coalescer : RequestCoalescer|None
+        Gathers requests to process, if they are coalesced
+    max_requests : int
+        Requests served before the server retires (0 never retires)
+    requests_served : int
+        Requests served so far
+    collector : EngineMetrics|None
+        Metrics served on `/metrics`, if any
+    """
+    workers: int  #: Number of worker processes
+    #: Live sessions (None if sessions are not served)
+    store: typing.Optional[session_store.SessionStore]
+    max_body: int  #: Largest request body accepted, in bytes
+    keep_alive: float  #: Seconds an idle connection is held open
+    #: Gathers requests to process, if they are coalesced
+    coalescer: typing.Optional[RequestCoalescer]
+    max_requests: int  #: Requests served before the server retires (0 never retires)
+    requests_served: int  #: Requests served so far
+    collector: typing.Optional[metrics.EngineMetrics]  #: Metrics served on `/metrics`, if any
+
+    def __init__(self,
+                 workers: typing.Optional[int] = None,
+                 store: typing.Optional[session_store.SessionStore] = None,
+                 max_body: int = DEFAULT_MAX_BODY,
+                 keep_alive: float = DEFAULT_KEEP_ALIVE,
+                 batch_window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH,
+                 max_requests: int = 0,
+                 sessions: bool = True,
+                 collector: typing.Optional[metrics.EngineMetrics] = None):
+        """
+        Set up the worker pool and session store
+
+        :param workers: Number of worker processes (defaults to the CPU count, 1 uses a thread)
+        :type workers: int|None
+        :param store: Session store (a new default one if omitted)
+        :type store: SessionStore|None
+        :param max_body: Largest request body accepted, in bytes
+        :type max_body: int
+        :param keep_alive: Seconds an idle connection is held open
+        :type keep_alive: float
+        :param batch_window: Seconds requests to process are gathered for (0 processes each on its
+            own)
+        :type batch_window: float
+        :param max_batch: Most requests processed together
+        :type max_batch: int
+        :param max_requests: Requests served before the server retires (0 never retires)
+        :type max_requests: int
+        :param sessions: Serve sessions (otherwise their routes are not found)
+        :type sessions: bool
+        :param collector: Metrics to serve on `/metrics`, collected in this process (see
+            `metrics.install`)
+        :type collector: EngineMetrics|None
+        :raise ValueError: on a collector with more than 1 worker, as the engine would run in other
+            processes
+        """
+        workers = workers if workers is not None else os.cpu_count() or 1
+        if collector is not None and workers > 1:
+            raise ValueError('Metrics are only collected with the engine in this process '
+                             '(1 worker)')
+        self.workers = workers
+        self.collector = collector
+        self.store = None
+        if sessions:
+            self.store = store if store is not None else session_store.SessionStore()
+        self.max_body = max_body
+        self.keep_alive = keep_alive
+        self.max_requests = max_requests
+        self.requests_served = 0
+        self._listeners = []
+        self._connections = set()
+        self._idle = set()
+        self._retired = None
+        self._closed = None
+        # Workers are spawned, not forked, so they hold none of the open connections
+        if workers > 1:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._session_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.coalescer = None
+        if batch_window > 0:
+            self.coalescer = RequestCoalescer(self._process_group, batch_window, max_batch)
+        process = self._engine_route(engine.process_request) if self.coalescer is None \
+            else self.coalescer.submit
+        self._routes = {
+            ('POST', '/process'):     process,
+            ('POST', LAMBDA_PATH):    process,
+            ('POST', '/preview'):     self._engine_route(engine.preview_request),
+            ('POST', '/shared-roll'): self._engine_route(engine.process_shared_roll),
+            ('POST', '/batch'):       self._batch,
+        }
+
+    async def start(self,
+                    host: str = '127.0.0.1',
+                    port: int = 8080,
+                    sock: typing.Optional[socket.socket] = None) -> asyncio.AbstractServer:
+        """
+        Start listening
+
+        :param host: Address to listen on
+        :type host: str
+        :param port: Port to listen on (0 picks a free one)
+        :type port: int
+        :param sock: Listening socket to accept connections on instead (host and port are ignored)
+        :type sock: socket.socket|None
+        :rtype: asyncio.AbstractServer
+        """
+        self._events()
+        if sock is not None:
+            listener = await asyncio.start_server(self.handle_connection, sock=sock,
+                                                  limit=MAX_HEADER)
+        else:
+            listener = await asyncio.start_server(self.handle_connection, host, port,
+                                                  limit=MAX_HEADER)
+        self._listeners.append(listener)
+        return listener
+
+    def retire(self):
+        """
+        Stop serving: stop listening, close idle connections, and close busy ones once they are
+        answered
+        """
+        retired, _ = self._events()
+        retired.set()
+        for listener in self._listeners:
+            listener.close()
+        for writer in list(self._idle):
+            writer.close()
+
+    async def wait_retired(self):
+        """Wait until the server retires and every connection is closed"""
+        retired, closed = self._events()
+        await retired.wait()
+        await closed.wait()
+
+    def close(self):
+        """Shut down the worker pool and session thread"""
+        self._executor.shutdown(cancel_futures=True)
+        self._session_executor.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve requests on a connection until either side closes it
+
+        :param reader: Connection reader
+        :type reader: asyncio.StreamReader
+        :param writer: Connection writer
+        :type writer: asyncio.StreamWriter
+        """
+        retired, closed = self._events()
+        self._connections.add(writer)
+        closed.clear()
+        try:
+            keep_alive = True
+            while keep_alive:
+                self._idle.add(writer)
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keep_alive)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await _respond(writer, _error(http.HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE),
+                                   False)
+                    break
+                finally:
+                    self._idle.discard(writer)
+                try:
+                    method, path, version, headers = _parse_head(head)
+                    keep_alive = _keep_alive(version, headers)
+                    body = await self._read_body(reader, headers)
+                except HttpError as error:
+                    await _respond(writer, _error(error.status, str(error)), False)
+                    break
+                response = await self.dispatch(method, path, body)
+                self.requests_served += 1
+                if self.max_requests and self.requests_served >= self.max_requests:
+                    self.retire()
+                keep_alive = keep_alive and not retired.is_set()
+                await _respond(writer, response, keep_alive)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+            self._connections.discard(writer)
+            if not self._connections:
+                closed.set()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Response:
+        """
+        Answer a request
+
+        :param method: HTTP method
+        :type method: str
+        :param path: Request path
+        :type path: str
+        :param body: Request body
+        :type body: bytes
+        :return: HTTP status and response body
+        :rtype: tuple[int, bytes]
+        """
+        # pylint: disable=broad-except
+        # A failure serving one request must not take down the connection
+        path = path.split('?', 1)[0]
+        try:
+            route = self._routes.get((method, path))
+            if route is not None:
+                return http.HTTPStatus.OK, await route(body)
+            if self.collector is not None and path == '/metrics':
+                if method != 'GET':
+                    raise HttpError(http.HTTPStatus.METHOD_NOT_ALLOWED)
+                return http.HTTPStatus.OK, self.collector.render().encode(), metrics.CONTENT_TYPE
+            if self.store is not None and (path == '/sessions' or path.startswith('/sessions/')):
+                return await self._sessions(method, path[len('/sessions/'):], body)
+            if any(route_path == path for _, route_path in self._routes):
+                raise HttpError(http.HTTPStatus.METHOD_NOT_ALLOWED)
+            raise HttpError(http.HTTPStatus.NOT_FOUND)
+        except HttpError as error:
+            return _error(error.status, str(error))
+        except Exception as error:
+            return (http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                    JsonEncoder.dumpb(engine.error_response(error)))
+
+    def _events(self) -> tuple[asyncio.Event, asyncio.Event]:
+        # Made on first use, so they belong to the running event loop
+        if self._retired is None:
+            self._retired, self._closed = asyncio.Event(), asyncio.Event()
+            self._closed.set()
+        return self._retired, self._closed
+
+    def _engine_route(self, function: typing.Callable) -> typing.Callable:
+        return functools.partial(self._in_pool, _answer, function)
+
+    async def _in_pool(self, function: typing.Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _in_session_thread(self, function: typing.Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._session_executor, function,
+                                                                *args)
+
+    async def _process_group(self, bodies: list[bytes]) -> list[bytes]:
+        chunks = _chunks_by_config(bodies, self.workers)
+        responses = await asyncio.gather(*(
+            self._in_pool(_process_group, [bodies[index] for index in chunk]) for chunk in chunks))
+        ordered = [b''] * len(bodies)
+        for chunk, chunk_responses in zip(chunks, responses):
+            for index, response in zip(chunk, chunk_responses):
+                ordered[index] = response
+        return ordered
+
+    async def _batch(self, body: bytes) -> bytes:
+        try:
+            requests = await asyncio.get_running_loop().run_in_executor(None, _decode, body)
+        except ValueError:
+            requests = None
+        if not isinstance(requests, list):
+            raise HttpError(http.HTTPStatus.BAD_REQUEST, 'Batch must be a JSON array of requests')
+        chunks = [requests[start:start + worker_pool.DEFAULT_CHUNKSIZE]
+                  for start in range(0, len(requests), worker_pool.DEFAULT_CHUNKSIZE)]
+        responses = await asyncio.gather(*(self._in_pool(_process_chunk, chunk)
+                                           for chunk in chunks))
+        return b'[' + b','.join(response for chunk in responses for response in chunk) + b']'
+
+    async def _sessions(self, method: str, session_id: str, body: bytes) -> Response:
+        if session_id in ('', 'restore'):
+            if method != 'POST':
+                raise HttpError(http.HTTPStatus.METHOD_NOT_ALLOWED)
+            operation = self._restore if session_id else self._create
+        elif '/' in session_id:
+            raise HttpError(http.HTTPStatus.NOT_FOUND)
+        elif method == 'POST':
+            operation = functools.partial(self._roll, session_id)
+        elif method == 'GET':
+            operation = functools.partial(self._export, session_id)
+        elif method == 'DELETE':
+            operation = functools.partial(self._delete, session_id)
+        else:
+            raise HttpError(http.HTTPStatus.METHOD_NOT_ALLOWED)
+        return await self._in_session_thread(operation, body)
+
+    def _create(self, body: bytes) -> Response:
+        # pylint: disable=broad-except
+        # Anything wrong with the table is the client's to fix
+        try:
+            request = _decode(body) if body.strip() else {}
+            table = request.get('table', {}) if isinstance(request, dict) else None
+            engine.get_request_validator().validate({'table': table})
+            session_id = self.store.create(table)
+        except Exception as error:
+            return http.HTTPStatus.BAD_REQUEST, JsonEncoder.dumpb(engine.error_response(error))
+        return http.HTTPStatus.CREATED, JsonEncoder.dumpb({'session_id': session_id})
+
+    def _restore(self, body: bytes) -> Response:
+        # pylint: disable=broad-except
+        # Anything wrong with the state is the client's to fix
+        try:
+            state = _decode(body)
+            if not isinstance(state, dict):
+                raise ValueError('Session state must be an object')
+            session_id = self.store.restore(state)
+        except Exception as error:
+            return http.HTTPStatus.BAD_REQUEST, JsonEncoder.dumpb(engine.error_response(error))
+        return http.HTTPStatus.CREATED, JsonEncoder.dumpb({'session_id': session_id})
+
+    def _roll(self, session_id: str, body: bytes) -> Response:
+        try:
+            request = _decode(body) if body.strip() else {}
+        except ValueError as error:
+            return http.HTTPStatus.BAD_REQUEST, JsonEncoder.dumpb(engine.error_response(error))
+        if not isinstance(request, dict):
+            return _error(http.HTTPStatus.BAD_REQUEST, 'Session request must be an object')
+        if session_id not in self.store:
+            return _error(http.HTTPStatus.NOT_FOUND, f'Session {session_id} not found')
+        return http.HTTPStatus.OK, self.store.process_request({**request, 'session_id': session_id},
+                                                              output='bytes')
+
+    def _export(self, session_id: str, _body: bytes) -> Response:
+        try:
+            return http.HTTPStatus.OK, JsonEncoder.dumpb(self.store.export(session_id))
+        except session_store.SessionNotFound:
+            return _error(http.HTTPStatus.NOT_FOUND, f'Session {session_id} not found')
+
+    def _delete(self, session_id: str, _body: bytes) -> Response:
+        try:
+            self.store.delete(session_id)
+        except session_store.SessionNotFound:
+            return _error(http.HTTPStatus.NOT_FOUND, f'Session {session_id} not found')
+        return http.HTTPStatus.OK, JsonEncoder.dumpb({'session_id': session_id})
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+        if 'transfer-encoding' in headers:
+            raise HttpError(http.HTTPStatus.LENGTH_REQUIRED,
+                            'Request bodies must have a Content-Length')
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(http.HTTPStatus.BAD_REQUEST, 'Invalid Content-Length') from None
+        if length < 0:
+            raise HttpError(http.HTTPStatus.BAD_REQUEST, 'Invalid Content-Length')
+        if length > self.max_body:
+            raise HttpError(http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        try:
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise HttpError(http.HTTPStatus.BAD_REQUEST, 'Incomplete request body') from None
+
+
+def _parse_head(head: bytes) -> tuple[str, str, str, dict[str, str]]:
+    try:
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        method, path, version = request_line.split(' ')
+    except ValueError:
+        raise HttpError(http.HTTPStatus.BAD_REQUEST, 'Malformed request line') from None
+    if not version.startswith('HTTP/1.'):
+        raise HttpError(http.HTTPStatus.HTTP_VERSION_NOT_SUPPORTED)
+    headers = {}
+    for line in header_lines:
+        if not line:
+            continue
+        name, separator, value = line.partition(':')
+        if not separator:
+            raise HttpError(http.HTTPStatus.BAD_REQUEST, 'Malformed header')
+        headers[name.strip().lower()] = value.strip()
+    return method.upper(), path, version, headers
+
+
+def _keep_alive(version: str, headers: dict[str, str]) -> bool:
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+
+async def _respond(writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+    status, body, *content_type = response
+    status = http.HTTPStatus(status)
+    writer.write(f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                 f'Content-Type: {content_type[0] if content_type else "application/json"}\r\n'
+                 f'Content-Length: {len(body)}\r\n'
+                 f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+                 '\r\n'.encode('latin-1') + body)
+    await writer.drain()
+
+
+def _error(status: http.HTTPStatus, message: str = '') -> Response:
+    return status, JsonEncoder.dumpb({'success':   False,
+                                      'exception': {'type':    'HttpError',
+                                                    'message': message or status.phrase}})
+
+
+def _decode(body: bytes):
+    return JsonEncoder.loads(body)
+
+
+def _answer(function: typing.Callable, body) -> bytes:
+    # pylint: disable=broad-except
+    # A bad request must not take down the worker
+    try:
+        return function(body, output='bytes')
+    except Exception as error:
+        return engine.encode_response(engine.error_response(error), 'bytes')
+
+
+def _process_chunk(requests: list) -> list[bytes]:
+    return [_answer(engine.process_request, request) for request in requests]
+
+
+def _chunks_by_config(bodies: list[bytes], workers: int) -> list[list[int]]:
+    """
+    Indexes of the bodies split into at most one chunk per worker, keeping requests with the
+    same table configuration together so each worker resolves a configuration once
+
+    A configuration with more than a worker's share of the requests is split into shares.
+    """
+    groups = {}
+    for index, body in enumerate(bodies):
+        groups.setdefault(engine.config_key(body), []).append(index)
+    share = -(-len(bodies) // workers)
+    pieces = [members[start:start + share] for members in groups.values()
+              for start in range(0, len(members), share)]
+    chunks = [[] for _ in range(min(workers, len(pieces)))]
+    for piece in sorted(pieces, key=len, reverse=True):
+        min(chunks, key=len).extend(piece)
+    return chunks
+
+
+def _process_group(bodies: list[bytes]) -> list[bytes]:
+    return engine.process_request_group(bodies, output='bytes')
+
+
+async def serve(host: str, port: int, workers: typing.Optional[int] = None,
+                store: typing.Optional[session_store.SessionStore] = None,
+                batch_window: float = DEFAULT_BATCH_WINDOW,
+                collector: typing.Optional[metrics.EngineMetrics] = None,
+                metrics_file: typing.Optional[str] = None):
+    """
+    Serve until cancelled
+
+    :param host: Address to listen on
+    :type host: str
+    :param port: Port to listen on
+    :type port: int
+    :param workers: Number of worker processes (defaults to the CPU count, 1 uses a thread)
+    :type workers: int|None
+    :param store: Session store (a new default one if omitted)
+    :type store: SessionStore|None
+    :param batch_window: Seconds requests to process are gathered for (0 processes each on its own)
+    :type batch_window: float
+    :param collector: Metrics to serve on `/metrics` (see `EngineServer`)
+    :type collector: EngineMetrics|None
+    :param metrics_file: File the metrics of the collector are written to every
+        METRICS_FILE_INTERVAL
+    :type metrics_file: str|None
+    """
+    server = EngineServer(workers=workers, store=store, batch_window=batch_window,
+                          collector=collector)
+    writer = asyncio.create_task(_write_metrics(collector, metrics_file)) \
+        if collector is not None and metrics_file is not None else None
+    try:
+        listener = await server.start(host, port)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if writer is not None:
+            writer.cancel()
+            collector.write(metrics_file)
+        server.close()
+
+
+async def _write_metrics(collector: metrics.EngineMetrics, path: str):
+    while True:
+        collector.write(path)
+        await asyncio.sleep(METRICS_FILE_INTERVAL)
+
+
+def prefork(host: str,
+            port: int,
+            processes: typing.Optional[int] = None,
+            max_requests: int = 0,
+            batch_window: float = DEFAULT_BATCH_WINDOW) -> int:
+    """
+    Serve from pre-forked processes sharing one listening socket, until SIGTERM or SIGINT
+
+    The engine is warmed (see `engine.warm`) before any process is forked, so every process
+    starts with it loaded. A process that exits, or retires after `max_requests`, is replaced.
+    On SIGTERM or SIGINT every process finishes the requests it is serving and exits. Sessions
+    are not served. Only available where `os.fork` is.
+
+    :param host: Address to listen on
+    :type host: str
+    :param port: Port to listen on
+    :type port: int
+    :param processes: Number of processes (defaults to the CPU count)
+    :type processes: int|None
+    :param max_requests: Requests a process serves before it is replaced (0 never replaces it)
+    :type max_requests: int
+    :param batch_window: Seconds requests to process are gathered for (0 processes each on its own)
+    :type batch_window: float
+    :return: exit status
+    :rtype: int
+    """
+    processes = processes if processes is not None else os.cpu_count() or 1
+    engine.warm()
+    children = set()
+    stopping = False
+
+    def stop(_signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    handlers = {signum: signal.signal(signum, stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        with socket.create_server((host, port), backlog=BACKLOG) as sock:
+            while True:
+                while not stopping and len(children) < processes:
+                    children.add(_fork_worker(sock, handlers, max_requests, batch_window))
+                if stopping:
+                    stop(signal.SIGTERM, None)
+                if not children:
+                    return 0
+                with contextlib.suppress(ChildProcessError):
+                    pid, _ = os.wait()
+                    children.discard(pid)
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+
+
+def _fork_worker(sock: socket.socket, handlers: dict, max_requests: int,
+                 batch_window: float) -> int:
+    # pylint: disable=broad-except
+    # Whatever happens, the child must exit here and never return into the parent's loop
+    # pylint: disable=protected-access
+    # `os._exit` leaves the child without running any of the parent's cleanup
+    pid = os.fork()
+    if pid:
+        return pid
+    status = 0
+    try:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        asyncio.run(_serve_socket(sock, max_requests, batch_window))
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        os._exit(status)
+
+
+async def _serve_socket(sock: socket.socket, max_requests: int, batch_window: float):
+    server = EngineServer(workers=1, max_requests=max_requests, batch_window=batch_window,
+                          sessions=False)
+    try:
+        await server.start(sock=sock)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.retire)
+        await server.wait_retired()
+    finally:
+        server.close()
+
+
+def main(argv: typing.Optional[list[str]] = None) -> int:
+    """
+    Command line entry point
+
+    :param argv: Command line arguments (defaults to sys.argv)
+    :type argv: list[str]|None
+    :return: exit status
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description='Serve the craps engine over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Number of worker processes (default: CPU count, 1 uses a thread)')
+    parser.add_argument('--max-sessions', type=int, default=session_store.DEFAULT_MAX_SESSIONS,
+                        help=f'Most live sessions (default: {session_store.DEFAULT_MAX_SESSIONS})')
+    parser.add_argument('--session-ttl', type=float, default=session_store.DEFAULT_TTL,
+                        help='Seconds a session may go unused '
+                             f'(default: {session_store.DEFAULT_TTL:g})')
+    parser.add_argument('--batch-window', type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                        help='Milliseconds requests to process are gathered for, 0 processes '
+                             f'each on its own (default: {DEFAULT_BATCH_WINDOW * 1000:g})')
+    parser.add_argument('--prefork', type=int, default=None, metavar='PROCESSES',
+                        help='Serve from this many pre-forked processes sharing the socket, '
+                             'without sessions')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='With --prefork, requests a process serves before it is replaced '
+                             '(default: 0, never)')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Serve metrics on /metrics, running the engine in this process '
+                             '(1 worker)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Also write the metrics to this file every '
+                             f'{METRICS_FILE_INTERVAL:g} seconds')
+    args = parser.parse_args(argv)
+    collect = args.metrics or args.metrics_file is not None
+    if args.prefork is not None:
+        if args.workers is not None:
+            parser.error('--prefork and --workers can not be combined')
+        if collect:
+            parser.error('--prefork and metrics can not be combined')
+        return prefork(args.host, args.port, processes=args.prefork, max_requests=args.max_requests,
+                       batch_window=args.batch_window / 1000)
+    workers = args.workers
+    if collect:
+        if workers not in (None, 1):
+            parser.error('metrics are only collected with 1 worker')
+        workers = 1
+    store = session_store.SessionStore(max_sessions=args.max_sessions, ttl=args.session_ttl)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.host, args.port, workers=workers, store=store,
+                          batch_window=args.batch_window / 1000,
+                          collector=metrics.install() if collect else None,
+                          metrics_file=args.metrics_file))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
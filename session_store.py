@@ -0,0 +1,302 @@
+"""
+Module: Session Store
+
+Keeps live tables in memory between requests, so clients only send their instructions.
+
+Each session ID maps to an `engine.Session`. The store is bounded: the least recently used
+session is evicted once `max_sessions` are held, and sessions unused for `ttl` seconds expire.
+A session's state can be exported at any time and restored later (to this or another store),
+so an evicted session can be picked up again where it left off.
+"""
+import collections
+import functools
+import secrets
+import threading
+import time
+import typing
+
+import JsonEncoder
+import engine
+from craps.dice import Outcome as DiceOutcome
+from craps.table.bet_abstracts import BetAbstract
+from craps.table.table import Table
+
+#: Most sessions held by default
+DEFAULT_MAX_SESSIONS = 10000
+#: Seconds a session may go unused by default (None never expires)
+DEFAULT_TTL = 3600.0
+
+#: Called with the session ID and its exported state when a session is evicted or expires
+EvictionHook = typing.Callable[[str, dict], None]
+
+
+class SessionNotFound(KeyError):
+    """Session is unknown, or was evicted or expired"""
+
+
+class SessionStore:
+    """
+    Bounded in-memory store of live sessions
+
+    All operations are thread safe.
+
+    Attributes
+    ----------
+    max_sessions : int
+        Most sessions held at once
+    ttl : float|None
+        Seconds a session may go unused before it expires
+    """
+    max_sessions: int  #: Most sessions held at once
+    ttl: typing.Optional[float]  #: Seconds a session may go unused before it expires
+    _sessions: collections.OrderedDict  # session ID -> (session, last used), least recently used first
+
+    def __init__(self,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 ttl: typing.Optional[float] = DEFAULT_TTL,
+                 on_evict: typing.Optional[EvictionHook] = None,
+                 clock: typing.Callable[[], float] = time.monotonic):
+        """
+        Create an empty store
+
+        :param max_sessions: Most sessions held at once
+        :type max_sessions: int
+        :param ttl: Seconds a session may go unused before it expires (None never expires)
+        :type ttl: float|None
+        :param on_evict: Called with the ID and exported state of every session evicted or expired
+        :type on_evict: EvictionHook|None
+        :param clock: Source of the current time in seconds
+        :type clock: Callable
+        :raise ValueError: on a max_sessions less than 1
+        """
+        if max_sessions < 1:
+            raise ValueError('max_sessions must be positive')
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._on_evict = on_evict
+        self._clock = clock
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.evict_expired()
+            return len(self._sessions)
+
+    def __contains__(self, session_id) -> bool:
+        with self._lock:
+            self.evict_expired()
+            return session_id in self._sessions
+
+    def create(self,
+               table: typing.Union[Table, dict, None] = None,
+               session_id: typing.Optional[str] = None) -> str:
+        """
+        Start a new session
+
+        :param table: Table the session starts from (or its request representation)
+        :type table: Table|dict|None
+        :param session_id: ID for the session (a random one if omitted)
+        :type session_id: str|None
+        :return: ID of the session
+        :rtype: str
+        """
+        return self._add(engine.Session(table), session_id)
+
+    def get(self, session_id: str) -> engine.Session:
+        """
+        Live session for an ID, marking it as used
+
+        :param session_id: ID of the session
+        :type session_id: str
+        :rtype: engine.Session
+        :raise SessionNotFound: if there is no such session
+        """
+        with self._lock:
+            self.evict_expired()
+            try:
+                session, _ = self._sessions[session_id]
+            except KeyError:
+                raise SessionNotFound(session_id) from None
+            self._sessions[session_id] = (session, self._clock())
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str):
+        """
+        End a session
+
+        :param session_id: ID of the session
+        :type session_id: str
+        :raise SessionNotFound: if there is no such session
+        """
+        with self._lock:
+            try:
+                del self._sessions[session_id]
+            except KeyError:
+                raise SessionNotFound(session_id) from None
+
+    def roll(self,
+             session_id: str,
+             instructions: typing.Optional[dict] = None,
+             hash: typing.Optional[str] = None,
+             dice: typing.Union[DiceOutcome, list, None] = None,
+             output: str = 'dict'):
+        """
+        Process instructions and roll the dice for a session
+
+        :param session_id: ID of the session
+        :type session_id: str
+        :param instructions: Instruction Set For Dealers to process before the dice roll
+        :type instructions: dict|None
+        :param hash: SHA-256 hash string used initialize the dice roller
+        :type hash: str|None
+        :param dice: Optional specification for dice roll (used if provided)
+        :type dice: Outcome|list|None
+        :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+        :type output: str
+        :return: response object, as `process_request` gives, with the `session_id` added
+        :rtype: dict|str|bytes
+        :raise SessionNotFound: if there is no such session
+        """
+        # pylint: disable=redefined-builtin
+        # `hash` is appropriate here
+        with self._lock:
+            # Encoded before the lock is released, as the result refers to the live table
+            return engine.respond(lambda _timer: self._roll(session_id, instructions, hash, dice),
+                                  output)
+
+    def process_request(self, request, output: str = 'dict'):
+        """
+        Validate and process a session request
+
+        The request holds the `session_id` and, as in a request to `process_request`, optional
+        `instructions`, `hash` and `dice` (but no `table`). Invalid requests, unknown sessions
+        and rejected instructions get an error response, leaving the session unchanged.
+
+        :param request: request object (or the JSON document for one)
+        :type request: dict|str|bytes
+        :param output: One of `dict` (decoded JSON object), `str`, or `bytes`
+        :type output: str
+        :return: response object
+        :rtype: dict|str|bytes
+        """
+        with self._lock:
+            # Encoded before the lock is released, as the result refers to the live table
+            return engine.respond(functools.partial(self._build_response, request), output)
+
+    def _build_response(self, request, timer) -> dict:
+        # pylint: disable=broad-except
+        # Rejected instructions raise the bet's own exception, answered like any other error
+        try:
+            if isinstance(request, (str, bytes)):
+                with timer.phase('decode'):
+                    request = JsonEncoder.loads(request)
+            if not isinstance(request, dict) or not isinstance(request.get('session_id'), str):
+                raise ValueError('Session request requires a session_id')
+            roll = {key: value for key, value in request.items() if key in ('instructions', 'hash', 'dice')}
+            with timer.phase('validation'):
+                engine.get_request_validator().validate(roll)
+            return self._roll(request['session_id'], **roll)
+        except Exception as error:
+            return engine.error_response(error)
+
+    def _roll(self, session_id: str, instructions=None, hash=None, dice=None) -> dict:
+        # pylint: disable=redefined-builtin
+        # `hash` is appropriate here
+        return {'session_id': session_id,
+                **self.get(session_id).roll(instructions=instructions, hash=hash, dice=dice)}
+
+    def export(self, session_id: str) -> dict:
+        """
+        State of a session, as a JSON encodable object for `restore`
+
+        :param session_id: ID of the session
+        :type session_id: str
+        :rtype: dict
+        :raise SessionNotFound: if there is no such session
+        """
+        with self._lock:
+            return _export(session_id, self.get(session_id))
+
+    def restore(self, state: dict) -> str:
+        """
+        Start a session again from the state `export` gave
+
+        The session keeps its ID (a new one is made if the state has none), replacing any live
+        session with the same ID.
+
+        :param state: Exported state of a session
+        :type state: dict
+        :return: ID of the session
+        :rtype: str
+        :raise jsonschema.exceptions.ValidationError: if the table in the state is not valid
+        """
+        table = state.get('table', {})
+        engine.get_request_validator().validate({'table': table})
+        session = engine.Session(_restore_table(table))
+        session.rolls = state.get('rolls', 0)
+        return self._add(session, state.get('session_id'))
+
+    def evict_expired(self) -> int:
+        """
+        Drop every session unused for longer than the TTL
+
+        :return: Number of sessions dropped
+        :rtype: int
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            expired = self._clock() - self.ttl
+            evicted = 0
+            while self._sessions:
+                session_id, (session, last_used) = next(iter(self._sessions.items()))
+                if last_used > expired:
+                    break
+                self._evict(session_id, session)
+                evicted += 1
+            return evicted
+
+    def _add(self, session: engine.Session, session_id: typing.Optional[str]) -> str:
+        session_id = session_id if session_id is not None else secrets.token_hex(16)
+        with self._lock:
+            self.evict_expired()
+            self._sessions.pop(session_id, None)
+            while len(self._sessions) >= self.max_sessions:
+                oldest_id, (oldest, _) = next(iter(self._sessions.items()))
+                self._evict(oldest_id, oldest)
+            self._sessions[session_id] = (session, self._clock())
+        return session_id
+
+    def _evict(self, session_id: str, session: engine.Session):
+        del self._sessions[session_id]
+        if self._on_evict is not None:
+            self._on_evict(session_id, _export(session_id, session))
+
+
+def _restore_table(state: dict) -> Table:
+    table = Table(config=state.get('config', {}), puck_location=state.get('puck_location'))
+    table.bets = [_restore_bet(bet, table) for bet in state.get('existing_bets', [])]
+    return table
+
+
+def _restore_bet(state: dict, table: Table) -> BetAbstract:
+    """
+    Bet as it was exported
+
+    A Pass Line keeps its odds after winning, with no placement to place them on: such odds are
+    given back to the bet as they were, rather than placed again.
+    """
+    odds = state.get('odds')
+    if not odds or state.get('placement') is not None:
+        return BetAbstract.from_signature(state, table=table)
+    bet = BetAbstract.from_signature({**state, 'odds': None}, table=table)
+    bet.odds = odds
+    return bet
+
+
+def _export(session_id: str, session: engine.Session) -> dict:
+    return JsonEncoder.loads(JsonEncoder.dumpb({'session_id': session_id,
+                                                'table':      session,
+                                                'rolls':      session.rolls}))
@@ -0,0 +1,9 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+#: Skips the analytics tests where numpy, which the package needs, is not installed
+requires_numpy = unittest.skipIf(numpy is None, 'numpy is not installed')
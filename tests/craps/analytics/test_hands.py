@@ -0,0 +1,43 @@
+import fractions
+import unittest
+
+from craps.analytics import hands
+from craps.table.config import Config
+
+
+class TestHands(unittest.TestCase):
+
+    def test_standard(self):
+        stats = hands.hand_stats()
+        self.assertIs(stats, hands.hand_stats(Config()))
+        self.assertEqual(fractions.Fraction(1671, 196), stats.expected_rolls)
+        self.assertEqual(fractions.Fraction(67, 165), stats.point_made)
+        self.assertEqual(fractions.Fraction(67, 98), stats.expected_points())
+        self.assertEqual(stats.point_made ** 3, stats.probability_of_points(3))
+        self.assertEqual(1, stats.probability_of_points(0))
+        points = stats.points_distribution(2)
+        self.assertEqual(1 - stats.point_made, points[0])
+        self.assertEqual(stats.probability_of_points(3), 1 - sum(points))
+
+    def test_rolls_distribution(self):
+        stats = hands.hand_stats()
+        rolls = stats.rolls_distribution(3)
+        # Seven out needs a point first; on the third roll after any point but a repeat of it
+        self.assertEqual(0, rolls[0])
+        self.assertEqual(sum(fractions.Fraction(ways, 36) * fractions.Fraction(6, 36) for ways in [3, 4, 5, 5, 4, 3]),
+                         rolls[1])
+        self.assertEqual(rolls, stats.rolls_distribution(10)[:3])
+        self.assertEqual(1 - sum(rolls), stats.probability_longer_than(3))
+        long_run = stats.rolls_distribution(300)
+        self.assertAlmostEqual(float(stats.expected_rolls),
+                               float(sum(count * chance for count, chance in enumerate(long_run, 1))), places=6)
+
+    def test_crapless(self):
+        stats = hands.hand_stats(Config.from_json({'is_crapless': True, 'odds': 'flat(3)'}))
+        self.assertEqual(fractions.Fraction(57678, 7303), stats.expected_rolls)
+        self.assertLess(stats.point_made, hands.hand_stats().point_made)
+        self.assertEqual(0, stats.rolls_distribution(1)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import fractions
+import unittest
+
+from craps.analytics import house_edge
+from craps.table.config import Config
+from craps.table.table import Table
+from engine import Engine
+
+
+class TestHouseEdge(unittest.TestCase):
+
+    def test_standard_bets(self):
+        edges = house_edge.house_edges()
+        self.assertIs(edges, house_edge.house_edges(Config()))
+        self.assertEqual(fractions.Fraction(1, 66), edges[('Place', 6)].house_edge())
+        self.assertEqual(fractions.Fraction(1, 60), edges[('Buy', 4)].house_edge())
+        self.assertEqual(fractions.Fraction(1, 60), edges[('Lay', 10)].house_edge())
+        self.assertEqual(fractions.Fraction(1, 36), edges[('Field', None)].house_edge())
+        place = edges[('Place', 6)]
+        self.assertEqual((fractions.Fraction(5, 11), fractions.Fraction(6, 11), 0), (place.win, place.lose, place.push))
+        self.assertEqual(fractions.Fraction(36, 11), place.expected_rolls)
+        self.assertEqual(place.house_edge() * 11 / 36, place.edge_per_roll())
+        for edge in edges.values():
+            self.assertEqual(1, edge.win + edge.lose + edge.push)
+
+    def test_odds(self):
+        flat = house_edge.house_edges(with_odds=False)
+        edges = house_edge.house_edges(with_odds=True)
+        self.assertNotIn(('PassLine', 4), flat)
+        pass_line = edges[('PassLine', 4)]
+        self.assertEqual(360, pass_line.signature.odds)
+        # The flat bet on a 4 loses a third of its wager, the odds are fair
+        self.assertEqual(-40, pass_line.expected_value)
+        self.assertEqual(fractions.Fraction(1, 12), pass_line.house_edge())
+
+    def test_single_roll_bets_match_preview(self):
+        for signature in [{'type': 'Field', 'wager': 10}, {'type': 'CE', 'wager': 10},
+                          {'type': 'Hop', 'wager': 10, 'placement': [2, 5]}]:
+            with self.subTest(signature=signature):
+                edge = house_edge.bet_edge(Config(), signature, 6)
+                preview = Engine(table=Table(puck_location=6, existing_bets=[signature])).preview()
+                self.assertEqual(1, edge.expected_rolls)
+                self.assertAlmostEqual(preview['expected_value'], float(edge.expected_value))
+                self.assertAlmostEqual(preview['variance'], float(edge.variance))
+
+    def test_crapless(self):
+        config = Config.from_json({'is_crapless': True, 'odds': 'flat(3)'})
+        edges = house_edge.house_edges(config)
+        self.assertIn(('Place', 2), edges)
+        self.assertNotIn(('DontPass', None), edges)
+        self.assertEqual(fractions.Fraction(1, 7), edges[('Place', 2)].win)
+
+    def test_never_decided(self):
+        with self.assertRaises(ValueError):
+            house_edge.bet_edge(Config(), {'type': 'Place', 'wager': 12, 'placement': 6, 'override_puck': 'OFF'}, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
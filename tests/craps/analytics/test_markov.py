@@ -0,0 +1,32 @@
+import fractions
+import unittest
+
+from craps.analytics import markov
+
+
+class TestMarkov(unittest.TestCase):
+
+    def test_gamblers_ruin(self):
+        # Fair coin from 1 until 0 or 3, paying 1 per head and taking 1 per tail
+        def steps(state):
+            for move in (1, -1):
+                after = state + move
+                target = markov.Absorbed('top' if after == 3 else 'bottom') if after in (0, 3) else after
+                yield fractions.Fraction(1, 2), target, move
+
+        result = markov.solve(1, steps)
+        self.assertEqual(2, result.states)
+        self.assertEqual(0, result.expected_reward)
+        self.assertEqual({'bottom': fractions.Fraction(2, 3), 'top': fractions.Fraction(1, 3)}, dict(result.absorption))
+        self.assertEqual(2, result.expected_steps)
+        self.assertEqual(2, result.reward_variance())
+        # Absorbed on each step with probability 1/2, so the steps are geometric
+        self.assertEqual(2, result.steps_variance())
+
+    def test_not_absorbed(self):
+        with self.assertRaises(ValueError):
+            markov.solve('a', lambda state: [(fractions.Fraction(1), 'b' if state == 'a' else 'a', 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import fractions
+import unittest
+
+from craps.table.bets import Come, PassLine
+from craps.table.table import Table
+from engine import Session
+from tests.craps.analytics import numpy, requires_numpy
+
+if numpy is not None:
+    from craps.analytics import simulation, vectors
+
+
+def pass_line_with_odds(table):
+    """Pass Line with double odds, and a Come bet with odds on every point"""
+    instructions = {}
+    if not table.puck.is_on():
+        if not table.bets.of_type(PassLine):
+            instructions['place'] = [{'type': 'PassLine', 'wager': 10}]
+        return instructions
+    pass_line = next(iter(table.bets.of_type(PassLine)), None)
+    if pass_line and pass_line.placement and not pass_line.odds:
+        instructions['set_odds'] = [{'type': 'PassLine', 'placement': pass_line.placement, 'wager': 10, 'odds': 20}]
+    come_bets = table.bets.of_type(Come)
+    if len(come_bets) < 2 and not any(bet.placement is None for bet in come_bets):
+        instructions['place'] = [{'type': 'Come', 'wager': 10}]
+    return instructions
+
+
+@requires_numpy
+class TestSimulation(unittest.TestCase):
+
+    def test_matches_session(self):
+        games, rolls, seed = 20, 60, 7
+        result = simulation.simulate(Table(), pass_line_with_odds, games=games, rolls=rolls,
+                                     bankroll=1000, seed=seed, record=True)
+        rng = numpy.random.default_rng(seed)
+        draws = numpy.stack([rng.integers(0, len(vectors.OUTCOMES), size=games) for _ in range(rolls)], axis=1)
+        for game in range(games):
+            with self.subTest(game=game):
+                session = Session()
+                wealth = [1000]
+                for draw in draws[game]:
+                    outcome = vectors.OUTCOMES[draw]
+                    roll = session.roll(instructions=pass_line_with_odds(session.table), dice=outcome)
+                    lost = sum(bet.wager + (bet.odds or 0) for bet in roll['losers'])
+                    wealth.append(wealth[-1] + roll['summary']['total_winnings_to_player'] - lost)
+                self.assertEqual(wealth, result.trajectories[game].tolist())
+        self.assertEqual(result.trajectories[:, -1].tolist(), result.final_wealth.tolist())
+
+    def test_transitions(self):
+        transitions = simulation.build_transitions(Table(), pass_line_with_odds)
+        self.assertEqual(transitions.net.shape, (len(transitions.states), 21))
+        self.assertEqual(0, len(transitions.states[0].bets))
+        self.assertEqual(0, transitions.net[0].sum())
+        table = transitions.table(3)
+        self.assertIsNot(table, transitions.states[3])
+        self.assertEqual(transitions.states[3].get_bet_signatures(), table.get_bet_signatures())
+
+        pass_line = simulation.build_transitions(Table(), lambda table: {} if table.bets else
+                                                 {'place': [{'type': 'PassLine', 'wager': 10}]})
+        # Empty come out, and the Pass Line on the come out and on each of the six points
+        self.assertEqual(8, len(pass_line.states))
+        self.assertEqual({-10, 0, 10}, set(pass_line.net.flatten().tolist()))
+
+    def test_house_edge(self):
+        result = simulation.simulate(Table(), lambda table: {} if table.bets else
+                                     {'place': [{'type': 'PassLine', 'wager': 10}]},
+                                     games=2000, rolls=200, seed=1)
+        self.assertIsNone(result.trajectories)
+        # Line bets are only on once the puck is, so the Pass Line is resolved by the point
+        wins = sum(fractions.Fraction(ways, 36) * fractions.Fraction(ways, ways + 6) for ways in [3, 4, 5, 5, 4, 3])
+        edge = 1 - 2 * wins / fractions.Fraction(24, 36)
+        self.assertAlmostEqual(float(edge), result.edge_per_unit_resolved(), delta=0.01)
+        self.assertEqual(result.mean_result(), float(result.final_wealth.mean()))
+
+
+if __name__ == '__main__':
+    unittest.main()
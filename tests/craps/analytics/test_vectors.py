@@ -0,0 +1,100 @@
+import fractions
+import unittest
+
+from craps.dice import Outcome
+from craps.table.config import Config
+from craps.table.table import Table
+from engine import Engine, Session
+from tests.craps.analytics import numpy, requires_numpy
+
+if numpy is not None:
+    from craps.analytics import vectors
+
+
+@requires_numpy
+class TestVectors(unittest.TestCase):
+
+    tables = [
+        {'puck_location': None,
+         'existing_bets': [{'type': 'PassLine', 'wager': 10}, {'type': 'Field', 'wager': 5},
+                           {'type': 'Hop', 'wager': 5, 'placement': [2, 3]}]},
+        {'puck_location': 6,
+         'existing_bets': [{'type': 'PassLine', 'wager': 10, 'placement': 6, 'odds': 50},
+                           {'type': 'Come', 'wager': 10}, {'type': 'Come', 'wager': 10, 'placement': 4},
+                           {'type': 'Put', 'wager': 10, 'placement': 9},
+                           {'type': 'DontCome', 'wager': 20, 'placement': 5, 'odds': 30},
+                           {'type': 'Buy', 'wager': 40, 'placement': 10},
+                           {'type': 'Lay', 'wager': 60, 'placement': 4},
+                           {'type': 'Hardway', 'wager': 5, 'placement': 8},
+                           {'type': 'Place', 'wager': 12, 'placement': 8, 'override_puck': 'OFF'},
+                           {'type': 'HornHigh', 'wager': 25, 'placement': 12}, {'type': 'CE', 'wager': 10}]},
+        {'config': {'is_crapless': True, 'odds': 'flat(2)'}, 'puck_location': 11,
+         'existing_bets': [{'type': 'PassLine', 'wager': 15, 'placement': 11, 'odds': 30},
+                           {'type': 'Place', 'wager': 10, 'placement': 2},
+                           {'type': 'World', 'wager': 5}]},
+    ]
+
+    def test_matches_engine_preview(self):
+        for request_table in self.tables:
+            with self.subTest(table=request_table):
+                table = Table(**request_table)
+                compiled = vectors.TableVectors.from_table(table)
+                preview = Engine(table=Table(**request_table)).preview()
+                net = compiled.net()
+                winnings = compiled.total_winnings()
+                for outcome in preview['outcomes']:
+                    index = vectors.OUTCOMES.index(outcome['dice_outcome'])
+                    self.assertEqual(outcome['net'], net[index])
+                    self.assertEqual(outcome['summary']['total_winnings_to_player'], winnings[index])
+                    expected_puck = outcome['new_table']['puck_location'] or vectors.NO_PLACEMENT
+                    self.assertEqual(expected_puck, compiled.puck_after[index])
+                self.assertAlmostEqual(preview['expected_value'], float(compiled.expected_value()))
+                self.assertAlmostEqual(preview['variance'], float(compiled.variance()))
+
+    def test_bet_vectors(self):
+        table = Table(puck_location=6)
+        bet = vectors.compile_signature(table.config, 6, {'type': 'Come', 'wager': 10, 'placement': 4, 'odds': 20})
+        compiled = vectors._compile_bet.cache_info().currsize
+        for wager, odds in ((10, 20), (15, 45), (7, 1), (1000, 3000)):
+            signature = {'type': 'Come', 'wager': wager, 'placement': 4, 'odds': odds}
+            scaled = vectors.compile_signature(Config(), 6, signature)
+            alone = Table(puck_location=6, existing_bets=[signature])
+            self.assertEqual(vectors._compile_table(alone)[0].payout.tolist(), scaled.payout.tolist())
+            self.assertEqual((wager, odds), (scaled.signature.wager, scaled.signature.odds))
+        self.assertEqual(compiled, vectors._compile_bet.cache_info().currsize)
+        self.assertTrue(bet.is_on)
+        self.assertEqual(3, int(bet.win.sum()))
+        self.assertEqual(6, int(bet.lose.sum()))
+        self.assertEqual({0, 50}, set(bet.payout.tolist()))
+        self.assertEqual(fractions.Fraction(3 * 50 - 6 * 30, 36), fractions.Fraction(int(bet.net().sum()), 36))
+        self.assertEqual(27, int(bet.remains().sum()))
+        self.assertTrue(bet.returned[vectors.OUTCOMES.index(Outcome(1, 3))])
+        self.assertEqual({4}, set(bet.next_placement[bet.remains()].tolist()))
+        with self.assertRaises(ValueError):
+            bet.payout[0] = 1
+
+        come = vectors.compile_signature(table.config, 6, {'type': 'Come', 'wager': 10})
+        self.assertEqual([total if total in (4, 5, 6, 8, 9, 10) else vectors.NO_PLACEMENT
+                          for total in vectors.TOTALS.tolist()], come.next_placement.tolist())
+
+    def test_odds_kept_after_win(self):
+        session = Session()
+        session.roll(instructions={'place': [{'type': 'PassLine', 'wager': 10}]}, dice=[2, 2])
+        session.roll(instructions={'set_odds': [{'type': 'PassLine', 'wager': 10, 'placement': 4, 'odds': 20}]},
+                     dice=[1, 1])
+        session.roll(dice=[1, 3])
+        compiled = vectors.TableVectors.from_table(session.table)
+        preview = Engine(table=session.table.copy()).preview()
+        self.assertEqual(20, compiled.bets[0].signature.odds)
+        net = compiled.net()
+        for outcome in preview['outcomes']:
+            self.assertEqual(outcome['net'], net[vectors.OUTCOMES.index(outcome['dice_outcome'])])
+
+    def test_empty_table(self):
+        compiled = vectors.TableVectors.from_table(Table())
+        self.assertEqual(0, compiled.expected_value())
+        self.assertEqual((0, 36), compiled.win().shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,6 +67,38 @@ class TestConfig(unittest.TestCase):
         explicit_odds = {'odds': {4: 3, 5: 4, 6: 5, 8: 5, 9: 4, 10: 6}}
         TableConfig.Config.from_json(explicit_odds)
 
+    def test_from_json_cache(self):
+        TableConfig.Config.cache_clear()
+        primitive = {'odds': 'flat(2)', 'field_12_pay': 2}
+        config = TableConfig.Config.from_json(primitive)
+        self.assertIs(config, TableConfig.Config.from_json({'field_12_pay': 2, 'odds': 'flat(2)'}))
+        self.assertIs(config, TableConfig.Config.from_json('{"field_12_pay": 2, "odds": "flat(2)"}'))
+        self.assertEqual({'odds': 'flat(2)', 'field_12_pay': 2}, primitive)
+        info = TableConfig.Config.cache_info()
+        self.assertEqual((2, 1), (info.hits, info.misses))
+        with self.assertRaises(TableConfig.InconsistentConfig):
+            TableConfig.Config.from_json({'dont_bar': 4})
+        with self.assertRaises(TableConfig.InconsistentConfig):
+            TableConfig.Config.from_json({'dont_bar': 4})
+        self.assertEqual(1, TableConfig.Config.cache_info().currsize)
+        mixed_keys = {'odds': {4: 3, '5': 4, 6: 5, 8: 5, 9: 4, 10: 3}}
+        self.assertEqual(TableConfig.Config(), TableConfig.Config.from_json(mixed_keys))
+        self.assertEqual({'field_12_pay': 2, 'odds': ConfigOdds.StandardOdds.flat(2)}, config.for_json())
+        default_odds = TableConfig.Config.from_json({'odds': {'4': 3, '5': 4, '6': 5, '8': 5, '9': 4, '10': 3}})
+        self.assertEqual(TableConfig.Config(), default_odds)
+        self.assertEqual({}, default_odds.for_json())
+        flat_odds = TableConfig.Config.from_json({'odds': {'4': 2, '5': 2, '6': 2, '8': 2, '9': 2, '10': 2}})
+        self.assertEqual(ConfigOdds.StandardOdds.flat(2), flat_odds.odds)
+
+    def test_from_json_cache_holds_no_primitive(self):
+        TableConfig.Config.cache_clear()
+        primitive = {'field_12_pay': 3}
+        config = TableConfig.Config.from_json(primitive)
+        primitive['field_12_pay'] = 2
+        self.assertEqual(3, TableConfig.Config.from_json({'field_12_pay': 3}).field_12_pay)
+        self.assertIs(config, TableConfig.Config.from_json({'field_12_pay': 3}))
+        self.assertEqual(2, TableConfig.Config.from_json(primitive).field_12_pay)
+
 
 if __name__ == '__main__':
     unittest.main()
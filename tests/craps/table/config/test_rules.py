@@ -0,0 +1,66 @@
+import copy
+import fractions
+import pickle
+import unittest
+
+import craps.table.config as TableConfig
+import craps.table.config.odds as ConfigOdds
+import craps.table.config.rules as rules_module
+from craps.dice import Outcome
+
+
+class TestRules(unittest.TestCase):
+
+    def test_default(self):
+        config = TableConfig.Config()
+        rules = config.rules()
+        self.assertIs(rules, config.rules())
+        self.assertIs(rules, TableConfig.Config().rules())
+        self.assertEqual(frozenset(config.get_valid_points()), rules.valid_points)
+        self.assertTrue(rules.is_point(6))
+        self.assertFalse(rules.is_point(7))
+        self.assertFalse(rules.is_point([6]))
+        self.assertEqual({point: config.odds[point] for point in config.get_valid_points()}, dict(rules.max_odds))
+        self.assertEqual({2: 2, 3: 1, 4: 1, 9: 1, 10: 1, 11: 1, 12: 3}, dict(rules.field_pays))
+        self.assertEqual(15, rules.hop_pays[Outcome(1, 2).is_hard()])
+        self.assertEqual(30, rules.hop_pays[Outcome(1, 1).is_hard()])
+        self.assertEqual(12, rules.dont_bar)
+        for total in range(2, 13):
+            self.assertEqual(config.get_true_odds(total), fractions.Fraction(*rules.true_odds[total]))
+            self.assertEqual(1 / config.get_true_odds(total), fractions.Fraction(*rules.lay_odds[total]))
+        self.assertEqual((3, 2), rules.true_odds[5])
+        self.assertEqual((2, 3), rules.lay_odds[5])
+        self.assertEqual((2, 60), rules.lay_vig[5])
+        with self.assertRaises(TypeError):
+            rules.place_odds[4] = (1, 1)
+
+    def test_crapless(self):
+        config = TableConfig.Config(is_crapless=True,
+                                    odds=ConfigOdds.CraplessOdds.flat(3),
+                                    place_3_11_odds=fractions.Fraction(3))
+        rules = config.rules()
+        self.assertEqual(frozenset([2, 3, 4, 5, 6, 8, 9, 10, 11, 12]), rules.valid_points)
+        self.assertEqual((3, 1), rules.place_odds[11])
+        self.assertEqual((11, 2), rules.place_odds[2])
+        self.assertEqual(fractions.Fraction(7, 6), config.get_place_odds(8))
+        self.assertIsNot(rules, TableConfig.Config().rules())
+        with self.assertRaises(ValueError):
+            TableConfig.Config().get_place_odds(11)
+
+    def test_scale(self):
+        self.assertEqual(7, rules_module.scale(15, (7, 15)))
+        self.assertEqual(6, rules_module.scale(13, (1, 2)))
+        self.assertEqual(-6, rules_module.scale(-13, (1, 2)))
+        self.assertEqual(0, rules_module.scale(19, rules_module.VIG))
+
+    def test_copies(self):
+        config = TableConfig.Config(field_12_pay=2)
+        rules = config.rules()
+        self.assertEqual({'field_12_pay': 2}, config.for_json())
+        for copied in [copy.copy(config), copy.deepcopy(config), pickle.loads(pickle.dumps(config))]:
+            self.assertEqual(config, copied)
+            self.assertIs(rules, copied.rules())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from craps.bet import BadBetActionException
+from craps.table.bet_book import BetBook
+from craps.table.bets import Come, Field, Hardway, Lay, PassLine, Place
+from craps.table.table import Table
+
+
+# noinspection DuplicatedCode
+class TestBetBook(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = Table(puck_location=6, existing_bets=[
+            {"type": "PassLine", "wager": 10, "placement": 6, "odds": 20},
+            {"type": "Come", "wager": 5},
+            {"type": "Come", "wager": 15, "placement": 4},
+            {"type": "Place", "wager": 12, "placement": 8},
+            {"type": "Hardway", "wager": 1, "placement": 10, "override_puck": "OFF"},
+            {"type": "Lay", "wager": 40, "placement": 4},
+            {"type": "Field", "wager": 3},
+        ])
+
+    def _brute_force_totals(self):
+        return (sum(bet.wager for bet in self.table.bets),
+                sum(bet.wager for bet in self.table.bets if bet.is_on()))
+
+    def test_behaves_like_a_set(self):
+        book = self.table.bets
+        self.assertIsInstance(book, BetBook)
+        self.assertEqual(7, len(book))
+        self.assertEqual(set(book), {bet for bet in book})
+        self.assertIn(PassLine(10, table=self.table), book)  # PassLine ignores placement
+        self.assertNotIn(Come(5, table=self.table, placement=5), book)
+        book.add(Field(100, table=self.table))
+        self.assertEqual(7, len(book))
+        self.assertEqual(3, book.find(Field)[0].wager)
+        book.discard(Field(100, table=self.table))
+        self.assertEqual(6, len(book))
+        with self.assertRaises(KeyError):
+            book.remove(Field(3, table=self.table))
+        copied = book.copy()
+        copied.clear()
+        self.assertEqual(6, len(book))
+        self.assertEqual(0, copied.value_on_table())
+
+    def test_indexes(self):
+        book = self.table.bets
+        self.assertEqual(15, book.find(Come, 4)[0].wager)
+        self.assertEqual(5, book.find('Come', None)[0].wager)
+        self.assertEqual([], book.find(Come, 6))
+        self.assertEqual(2, len(book.of_type(Come)))
+        self.assertEqual([], book.of_type(Place.__base__))
+        self.assertEqual({PassLine, Come}, {bet.__class__ for bet in book.traveling()})
+        self.assertEqual({Place, Hardway, Lay}, {bet.__class__ for bet in book.toggleable()})
+        self.assertTrue(book.has_non_toggleable())
+        self.assertFalse(BetBook(book.toggleable()).has_non_toggleable())
+
+    def test_running_totals(self):
+        self.assertEqual((86, 85), self._brute_force_totals())
+        self.assertEqual((86, 85), (self.table.value_on_table(), self.table.value_at_risk()))
+        self.table.puck.remove()
+        self.assertEqual(self._brute_force_totals(), (self.table.value_on_table(), self.table.value_at_risk()))
+        self.table.puck.place(6)
+        self.table.process_instructions({'update': [{"type": "Place", "wager": 18, "placement": 8}],
+                                         'retrieve': [{"type": "Field", "wager": 3}],
+                                         'place': [{"type": "Place", "wager": 6, "placement": 5}]})
+        self.assertEqual(self._brute_force_totals(), (self.table.value_on_table(), self.table.value_at_risk()))
+        with self.table.bets.changing(Place(6, table=self.table, placement=5)) as bet:
+            bet.turn_off()
+        self.assertEqual(self._brute_force_totals(), (self.table.value_on_table(), self.table.value_at_risk()))
+        with self.assertRaises(BadBetActionException):
+            self.table.process_instructions({'turn_on': [{"type": "Hardway", "wager": 1, "placement": 10}]})
+        self.table.bets = [bet for bet in self.table.bets if bet.can_toggle]
+        self.table.process_instructions({'turn_on': [{"type": "Hardway", "wager": 1, "placement": 10}]})
+        self.assertEqual(self._brute_force_totals(), (self.table.value_on_table(), self.table.value_at_risk()))
+        self.assertEqual((65, 59), self._brute_force_totals())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import fractions
+import unittest
+
+import craps.table.bets as TableBets
+from craps.dice import Outcome
+from craps.table.config import Config, CraplessOdds, StandardOdds
+from craps.table.table import Table
+
+
+def legacy_true_odds(place):
+    ways = {total: len([out for out in Outcome.get_all() if out.total() == total]) for total in range(2, 13)}
+    return fractions.Fraction(ways[7], ways[place])
+
+
+def legacy_place_odds(config, place):
+    if place in [6, 8]:
+        return fractions.Fraction(7, 6)
+    if place in [5, 9]:
+        return fractions.Fraction(7, 5)
+    if place in [4, 10]:
+        return fractions.Fraction(9, 5)
+    if place in [3, 11]:
+        return config.place_3_11_odds
+    return config.place_2_12_odds
+
+
+def legacy_vig(wager):
+    return int(wager * .05)
+
+
+# noinspection DuplicatedCode
+class TestPayouts(unittest.TestCase):
+    """Integer payouts against the Fraction and float formulas they replaced"""
+
+    configs = [
+        Config(),
+        Config(odds=StandardOdds.flat(10), hop_easy_pay_to_one=16, hop_hard_pay_to_one=31),
+        Config(is_crapless=True, odds=CraplessOdds.flat(3)),
+        Config(is_crapless=True, odds=CraplessOdds.flat(5),
+               place_2_12_odds=fractions.Fraction(13, 2), place_3_11_odds=fractions.Fraction(13, 5)),
+    ]
+    #: Every residue of every divisor used, then a spread of larger wagers
+    wagers = list(range(1, 601)) + [base + offset for base in [10 ** 3, 10 ** 6, 10 ** 9, 2 ** 40]
+                                    for offset in range(-7, 8)]
+
+    def _roll(self, total):
+        return next(outcome for outcome in Outcome.get_all_unique() if outcome.total() == total)
+
+    def test_line_bets_and_odds(self):
+        for config in self.configs:
+            table = Table(config=config)
+            points = config.get_valid_points()
+            traveling = [TableBets.Come] + ([] if config.is_crapless else [TableBets.DontCome])
+            for bet_type in traveling:
+                for point in points:
+                    with self.subTest(config=config, bet_type=bet_type, point=point):
+                        true_odds = legacy_true_odds(point)
+                        for wager in self.wagers:
+                            bet = bet_type(wager, table=table, placement=point)
+                            if bet_type is TableBets.Come:
+                                max_odds = int(config.odds[point] * wager)
+                                winner = self._roll(point)
+                            else:
+                                max_odds = int(int(config.odds[point] * wager) * true_odds)
+                                winner = self._roll(7)
+                            self.assertEqual(max_odds, bet.max_odds())
+                            for odds in {1, 2, 3, 5, 7, max_odds // 3, max_odds - 1, max_odds} - {0}:
+                                bet.odds = odds
+                                if bet_type is TableBets.Come:
+                                    expected = wager + int(odds * true_odds)
+                                else:
+                                    expected = wager + int(odds / true_odds)
+                                self.assertEqual(expected, bet.get_payout(winner))
+
+    def test_place_buy_lay(self):
+        for config in self.configs:
+            table = Table(config=config)
+            for point in config.get_valid_points():
+                with self.subTest(config=config, point=point):
+                    true_odds = legacy_true_odds(point)
+                    place_odds = legacy_place_odds(config, point)
+                    for wager in self.wagers:
+                        place = TableBets.Place(wager, table=table, placement=point)
+                        place.turn_on()
+                        self.assertEqual(int(wager * place_odds), place.get_payout(self._roll(point)))
+                        buy = TableBets.Buy(wager, table=table, placement=point)
+                        buy.turn_on()
+                        self.assertEqual(legacy_vig(wager), buy.get_vig())
+                        self.assertEqual(int(wager * true_odds) - legacy_vig(wager),
+                                         buy.get_payout(self._roll(point)))
+                        lay = TableBets.Lay(wager, table=table, placement=point)
+                        lay_vig = int(wager / true_odds * .05)
+                        self.assertEqual(lay_vig, lay.get_vig())
+                        self.assertEqual(int(wager / true_odds) - lay_vig, lay.get_payout(self._roll(7)))
+
+    def test_multi_bets(self):
+        for config in self.configs:
+            table = Table(config=config)
+            for bet_type, placements in [(TableBets.Horn, [None]),
+                                         (TableBets.HornHigh, [2, 3, 11, 12]),
+                                         (TableBets.World, [None]),
+                                         (TableBets.Craps3Way, [None]),
+                                         (TableBets.CE, [None])]:
+                for placement in placements:
+                    with self.subTest(config=config, bet_type=bet_type, placement=placement):
+                        for units in self.wagers:
+                            wager = units * bet_type.multi_bet
+                            bet = bet_type(wager, table=table, placement=placement)
+                            for outcome in Outcome.get_all_unique():
+                                if not bet.is_winner(outcome):
+                                    continue
+                                pay_to_one = config.hop_hard_pay_to_one if outcome.is_hard() \
+                                    else config.hop_easy_pay_to_one
+                                if bet_type is TableBets.CE:
+                                    pay_to_one = 7 if outcome.total() in [2, 3, 12] \
+                                        else config.hop_easy_pay_to_one
+                                if bet_type is TableBets.HornHigh and outcome.total() == placement:
+                                    expected = int(wager / bet_type.multi_bet * 2 * pay_to_one)
+                                else:
+                                    expected = int(wager / bet_type.multi_bet * pay_to_one)
+                                self.assertEqual(expected, bet.get_payout(outcome))
+
+    def test_large_wagers_are_exact(self):
+        table = Table(config=Config())
+        wager = 10 ** 20 + 19
+        buy = TableBets.Buy(wager, table=table, placement=4)
+        buy.turn_on()
+        self.assertEqual(wager // 20, buy.get_vig())
+        self.assertEqual(wager * 2 - wager // 20, buy.get_payout(self._roll(4)))
+        lay = TableBets.Lay(wager, table=table, placement=5)
+        self.assertEqual(wager * 2 // 3 - wager * 2 // 60, lay.get_payout(self._roll(7)))
+
+
+if __name__ == '__main__':
+    unittest.main()
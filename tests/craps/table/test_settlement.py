@@ -0,0 +1,83 @@
+import unittest
+
+from craps.dice import Outcome
+from craps.table.bets import Buy, Come, Put
+from craps.table.config import Config
+from craps.table.settlement import SettlementStatus, settle_players, settle_table
+from craps.table.table import Table
+
+
+# noinspection DuplicatedCode
+class TestSettlement(unittest.TestCase):
+
+    def test_statuses(self):
+        table = Table(puck_location=6, existing_bets=[{"type": "Buy", "wager": 100, "placement": 10},
+                                                      {"type": "Place", "wager": 12, "placement": 6},
+                                                      {"type": "Field", "wager": 10}])
+        settlement = settle_table(table, Outcome(5, 5))
+        statuses = {record.bet.get_type(): record for record in settlement.settlements}
+        self.assertEqual(SettlementStatus.WIN, statuses['Buy'].status)
+        self.assertEqual(195, statuses['Buy'].payout)
+        self.assertEqual(5, statuses['Buy'].vig)
+        self.assertEqual(SettlementStatus.PUSH, statuses['Place'].status)
+        self.assertEqual(SettlementStatus.WIN, statuses['Field'].status)
+        self.assertIsNone(statuses['Field'].vig)
+        self.assertEqual(205, settlement.total_winnings)
+        self.assertEqual(122, settlement.value_on_table)
+        self.assertEqual(122, settlement.value_on_table_after_roll)
+        self.assertEqual(6, settlement.puck_location)
+
+        settlement = settle_table(table, Outcome(3, 4))
+        self.assertEqual(3, len(settlement.losers()))
+        self.assertEqual(122, settlement.value_of_losers)
+        self.assertEqual(set(), settlement.bets_after_roll())
+        self.assertIsNone(settlement.puck_location)
+
+    def test_table_is_not_changed(self):
+        table = Table(puck_location=6, existing_bets=[{"type": "Come", "wager": 10},
+                                                      {"type": "Come", "wager": 5, "placement": 4}])
+        settlement = settle_table(table, Outcome(1, 3))
+        self.assertEqual({None, 4}, {bet.placement for bet in table.bets})
+        self.assertEqual(0, len(table.returned_bets))
+        self.assertEqual(1, len(settlement.returned()))
+        moved = settlement.bets_after_roll().pop()
+        self.assertIsInstance(moved, Come)
+        self.assertEqual(4, moved.placement)
+        self.assertEqual(10, moved.wager)
+
+    def test_put_comes_down_when_come_moves_up(self):
+        table = Table(puck_location=9, existing_bets=[{"type": "Come", "wager": 100},
+                                                      {"type": "Put", "wager": 100, "placement": 4}])
+        settlement = settle_table(table, Outcome(1, 3))
+        self.assertEqual([Put], [bet.__class__ for bet in settlement.returned()])
+        self.assertEqual([4], [bet.placement for bet in settlement.bets_after_roll()])
+
+    def test_vig_reported_for_winning_vig_bets(self):
+        table = Table(puck_location=6, existing_bets=[{"type": "Buy", "wager": 10, "placement": 4}])
+        winner = settle_table(table, Outcome(2, 2)).winners()[0]
+        self.assertIsInstance(winner.bet, Buy)
+        self.assertEqual(0, winner.get_signature().vig_paid)
+        self.assertEqual(20, winner.get_signature().payout)
+
+
+    def test_settle_players(self):
+        config = Config.from_json({'field_2_pay': 3})
+        bet_sets = [[{'type': 'Come', 'wager': 10}, {'type': 'Come', 'wager': 10, 'placement': 4}],
+                    [{'type': 'Field', 'wager': 5}, {'type': 'Hop', 'wager': 5, 'placement': [1, 3]}],
+                    [{'type': 'Come', 'wager': 10}, {'type': 'Come', 'wager': 10, 'placement': 4}],
+                    []]
+        settlements = settle_players(config, 6, Outcome(1, 3), bet_sets)
+        self.assertEqual(len(bet_sets), len(settlements))
+        self.assertIs(settlements[0], settlements[2])
+        for bets, settlement in zip(bet_sets, settlements):
+            expected = settle_table(Table(config=config, puck_location=6, existing_bets=bets), Outcome(1, 3))
+            self.assertEqual(expected.total_winnings, settlement.total_winnings)
+            self.assertEqual(expected.puck_location, settlement.puck_location)
+            self.assertEqual({bet.get_signature() for bet in expected.bets_after_roll()},
+                             {bet.get_signature() for bet in settlement.bets_after_roll()})
+        self.assertEqual(80, settlements[1].total_winnings)
+        self.assertEqual(0, settlements[3].total_winnings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 
+import craps.table.bet_abstracts as BetAbstracts
 import craps.table.bets as TableBets
-from craps.bet import BadBetActionException
+from craps.bet import BadBetActionException, InvalidBetException
 from craps.table.config import Config as TableConfig, StandardOdds, CraplessOdds
 
 from craps.dice import Outcome
@@ -306,6 +307,15 @@ class TestTableBet(unittest.TestCase):
                                                                                      table=bet._table)
                             self.assertEqual(bet, reconstructed_bet)
 
+    def test_odds_without_point(self):
+        for bet_type in (TableBets.PassLine, TableBets.DontPass, TableBets.Come, TableBets.DontCome):
+            with self.subTest(bet_type=bet_type):
+                bet = bet_type(self.wager, table=Table())
+                with self.assertRaises(InvalidBetException):
+                    bet.set_odds(self.wager)
+                with self.assertRaises(InvalidBetException):
+                    bet_type(self.wager, table=Table(), odds=self.wager)
+
     def test_dont_come(self):
         bet = TableBets.DontCome(self.wager, table=self.table)
         self.assertTrue(bet.allow_odds)
@@ -935,6 +945,32 @@ class TestTableBet(unittest.TestCase):
                                                                          table=bet._table)
                 self.assertEqual(bet, reconstructed_bet)
 
+    def test_bet_type_registry(self):
+        # pylint: disable=protected-access
+        # The registry is module state, custom registrations are removed again
+        self.assertIs(BetAbstracts.get_bet_type('passline'), TableBets.PassLine)
+        self.assertIs(BetAbstracts.get_bet_type('CE'), TableBets.CE)
+        for name in ['NotABet', 'BetAbstract', 'PropBetAbstract', 'DiceOutcome', 'typing']:
+            with self.subTest(name=name):
+                with self.assertRaises(InvalidBetException):
+                    BetAbstracts.get_bet_type(name)
+                with self.assertRaises(InvalidBetException):
+                    TableBets.BetAbstract.from_signature({'type': name, 'wager': 5}, table=self.table)
+
+        class BigRed(TableBets.AnySeven):
+            pass
+
+        for name in ['bigred', 'big_red']:
+            self.addCleanup(BetAbstracts._bet_types.pop, name, None)
+        self.assertIs(BetAbstracts.register_bet_type(BigRed, 'Big_Red'), BigRed)
+        bet = TableBets.BetAbstract.from_signature({'type': 'big_red', 'wager': 5}, table=self.table)
+        self.assertIsInstance(bet, BigRed)
+        self.assertIs(BetAbstracts.get_bet_type('BigRed'), BigRed)
+        with self.assertRaises(InvalidBetException):
+            BetAbstracts.register_bet_type(TableBets.BetAbstract)
+        with self.assertRaises(InvalidBetException):
+            BetAbstracts.register_bet_type(int)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 import craps.dice as dice
 
@@ -18,6 +20,37 @@ class DiceTest(unittest.TestCase):
         self.assertIn(outcome, dice.Outcome.get_all())
         self.assertIn(outcome, dice.Outcome.get_all_unique())
 
+    def test_outcomes_are_interned(self):
+        outcome = dice.Outcome(2, 5)
+        self.assertIs(outcome, dice.Outcome(5, 2))
+        self.assertIs(outcome, copy.copy(outcome))
+        self.assertIs(outcome, copy.deepcopy(outcome))
+        self.assertIs(outcome, pickle.loads(pickle.dumps(outcome)))
+        self.assertIs(outcome, dice.Outcome.from_code(outcome.code()))
+        self.assertEqual(repr(outcome), 'Outcome(2, 5)')
+        self.assertEqual(str(outcome), '(2, 5)')
+        with self.assertRaises(AttributeError):
+            outcome._d1 = 1  # pylint: disable=protected-access
+        with self.assertRaises(ValueError):
+            dice.Outcome(0, 3)
+        with self.assertRaises(ValueError):
+            dice.Outcome('1', 3)
+
+    def test_outcome_tables(self):
+        unique = dice.Outcome.get_all_unique()
+        self.assertEqual(21, len(unique))
+        self.assertEqual(list(range(21)), [outcome.code() for outcome in unique])
+        self.assertEqual(21, len(set(unique)))
+        all_outcomes = dice.Outcome.get_all()
+        self.assertEqual(36, len(all_outcomes))
+        self.assertEqual(36, sum(outcome.ways() for outcome in unique))
+        for total in range(2, 13):
+            self.assertEqual(len([out for out in all_outcomes if out.total() == total]),
+                             dice.Outcome.ways_to_roll(total))
+        self.assertEqual(0, dice.Outcome.ways_to_roll(13))
+        all_outcomes.clear()
+        self.assertEqual(36, len(dice.Outcome.get_all()))
+
 
 if __name__ == '__main__':
     unittest.main()
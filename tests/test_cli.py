@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+
+import cli
+import metrics
+import phase_timer
+from engine import process_request
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.requests = [{'hash': format(nonce, '064x'),
+                          'instructions': {'place': [{'type': 'Field', 'wager': 5 + nonce}]}}
+                         for nonce in range(7)]
+        self.input = os.path.join(self.directory.name, 'requests.jsonl')
+        self.output = os.path.join(self.directory.name, 'responses.jsonl')
+        with open(self.input, 'w', encoding='utf-8') as file:
+            for request in self.requests[:3]:
+                file.write(json.dumps(request) + '\n')
+            file.write('{"hash": \n')
+            file.write('\n')
+            file.write('{"hash": "nope"}\n')
+            for request in self.requests[3:]:
+                file.write(json.dumps(request) + '\n')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _responses(self):
+        with open(self.output, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_ordered(self):
+        expected = [process_request(request) for request in self.requests]
+        for workers in ['1', '2']:
+            self.assertEqual(0, cli.main([self.input, '-o', self.output, '-w', workers, '-c', '2']))
+            responses = self._responses()
+            self.assertEqual(9, len(responses))
+            self.assertEqual(expected[:3], responses[:3])
+            self.assertEqual(expected[3:], responses[5:])
+            self.assertFalse(responses[3]['success'])
+            self.assertFalse(responses[4]['success'])
+            self.assertNotIn('line', responses[3])
+
+    def test_error_formats(self):
+        cli.main([self.input, '-o', self.output, '-w', '1', '--error-format', 'line'])
+        self.assertEqual([4, 6], [response['line'] for response in self._responses() if 'line' in response])
+        cli.main([self.input, '-o', self.output, '-w', '1', '--error-format', 'null'])
+        self.assertEqual([3, 4], [index for index, response in enumerate(self._responses()) if response is None])
+
+    def test_unordered(self):
+        cli.main([self.input, '-o', self.output, '-w', '2', '-c', '1', '--unordered'])
+        responses = self._responses()
+        self.assertEqual(sorted(request['hash'] for request in self.requests),
+                         sorted(response['hash'] for response in responses if 'hash' in response))
+
+
+    def test_observed(self):
+        collector = metrics.install()
+        try:
+            lines = [(1, json.dumps(self.requests[0]).encode()), (2, b'{"hash": '),
+                     (3, b'{"dice": [1, 1], "instructions": {"place": [{"type": "PassLine", "wager": 1},'
+                         b' {"type": "PassLine", "wager": 1}]}}')]
+            for error_format in cli.ERROR_FORMATS:
+                for line in lines:
+                    cli.process_line(line, error_format)
+        finally:
+            metrics.uninstall()
+            phase_timer.set_sink(None)
+        self.assertEqual(3, collector.value('craps_requests_total', result='success'))
+        self.assertEqual(6, collector.value('craps_requests_total', result='failure'))
+        self.assertIn('craps_request_seconds_count 6\n', collector.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
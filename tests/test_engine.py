@@ -1,13 +1,17 @@
+import copy
 import json
 import unittest
 
 from JsonEncoder import ComplexEncoder
+from craps.table import DuplicateBetException
 from craps.table.bet_abstracts import BetAbstract
 from craps.table.bets import Come
 from craps.table.config import Config
 from craps.table.puck import Puck
 from craps.table.table import Table
-from engine import Engine, process_request
+from engine import Engine, Session, preview_request, process_request, process_requests, \
+    process_request_group, process_shared_roll, \
+    req as sample_request
 from craps.bet import get_bet_from_set
 from craps.dice import Outcome as DiceOutcome
 
@@ -222,6 +226,186 @@ class TestEngine(unittest.TestCase):
         result = process_request(req)
         self.assertEqual(result['hash'], 'f'*64)
 
+    def _sorted_lists(self, obj):
+        if isinstance(obj, dict):
+            return {key: self._sorted_lists(val) for key, val in obj.items()}
+        if isinstance(obj, list):
+            return sorted((self._sorted_lists(val) for val in obj), key=json.dumps)
+        return obj
+
+    def test_session_matches_round_trip(self):
+        rolls = [([1, 3], {"place": [{"type": "PassLine", "wager": 10}]}),
+                 ([2, 3], {"place": [{"type": "Come", "wager": 10}]}),
+                 ([3, 3], {"place": [{"type": "Place", "wager": 12, "placement": 8}]}),
+                 ([2, 2], {}),
+                 ([3, 4], {})]
+        session = Session()
+        table = {}
+        for dice, instructions in rolls:
+            expected = process_request({"table": table, "instructions": instructions, "dice": dice})
+            actual = json.loads(json.dumps(session.roll(instructions=instructions, dice=dice),
+                                           cls=ComplexEncoder))
+            self.assertEqual(self._sorted_lists(expected), self._sorted_lists(actual))
+            table = expected['new_table']
+            self.assertEqual(self._sorted_lists(table),
+                             self._sorted_lists(json.loads(json.dumps(session, cls=ComplexEncoder))))
+        self.assertEqual(len(rolls), session.rolls)
+
+    def test_session_from_table_state(self):
+        session = Session({"existing_bets": [{"type": "PassLine", "wager": 10, "placement": 4}],
+                           "puck_location": 4})
+        result = session.roll(dice=[1, 3])
+        self.assertEqual(10, result['summary']['total_winnings_to_player'])
+        self.assertTrue(session.table.puck.is_off())
+        self.assertIsNone(session.table.bets.copy().pop().placement)
+        session.roll(dice=[2, 3])
+        self.assertEqual(5, session.table.puck.location())
+        result = session.roll(dice=[3, 4])
+        self.assertEqual(1, len(result['losers']))
+        self.assertEqual(0, len(session.table.bets))
+
+    def test_session_rejected_roll(self):
+        session = Session({"existing_bets": [{"type": "Place", "wager": 12, "placement": 8}],
+                           "puck_location": 4})
+        before = json.loads(json.dumps(session, cls=ComplexEncoder))
+        with self.assertRaises(DuplicateBetException):
+            session.roll(instructions={"place": [{"type": "Field", "wager": 5},
+                                                 {"type": "Place", "wager": 12, "placement": 8}],
+                                       "update": [{"type": "Place", "wager": 18, "placement": 8}]},
+                         dice=[3, 4])
+        self.assertEqual(before, json.loads(json.dumps(session, cls=ComplexEncoder)))
+        self.assertEqual(0, session.rolls)
+        result = session.roll(instructions={"place": [{"type": "Field", "wager": 5}]}, dice=[1, 1])
+        self.assertEqual(10, result['summary']['total_winnings_to_player'])
+        self.assertEqual(1, session.rolls)
+
+    def test_process_request_does_not_change_request(self):
+        request = {"table":        {"config":        {"is_crapless": True, "odds": "flat(2)",
+                                                      "place_2_12_odds": [11, 2]},
+                                    "existing_bets": [{"type": "PassLine", "wager": 10, "placement": 4},
+                                                      {"type": "Hop", "wager": 1, "placement": [1, 3]}],
+                                    "puck_location": 4},
+                   "instructions": {"place": [{"type": "Field", "wager": 10}],
+                                    "set_odds": [{"type": "PassLine", "wager": 10, "placement": 4, "odds": 20}]},
+                   "dice":         [1, 3]}
+        original = copy.deepcopy(request)
+        process_request(request)
+        self.assertEqual(original, request)
+        process_request(sample_request | {"instructions": {}})
+        self.assertEqual('PassLine', sample_request['table']['existing_bets'][0]['type'])
+
+    def test_process_request_output_formats(self):
+        request = {"instructions": {"place": [{"type": "PassLine", "wager": 10}]}, 'hash': 'f'*64}
+        expected = process_request(request)
+        self.assertEqual(expected, json.loads(process_request(request, output='str')))
+        self.assertEqual(expected, json.loads(process_request(request, output='bytes')))
+        self.assertIsInstance(process_request(request, output='bytes'), bytes)
+        self.assertEqual(False, json.loads(process_request({'hash': 'n'}, output='str'))['success'])
+        with self.assertRaises(ValueError):
+            process_request(request, output='xml')
+
+    def test_process_requests(self):
+        requests = [{'hash': format(nonce, '064x'),
+                     'instructions': {'place': [{'type': 'Field', 'wager': 5 + nonce % 3}]}}
+                    for nonce in range(10)]
+        requests[3] = {'hash': 'n' * 64}
+        requests[6] = {'instructions': {'retrieve': [{'type': 'Field', 'wager': 5}]}}
+        expected = [process_request(request) for request in requests[:3]]
+        for workers in [1, 2]:
+            results = process_requests(requests, workers=workers, chunksize=3)
+            self.assertEqual(len(requests), len(results))
+            self.assertEqual(expected, results[:3])
+            self.assertEqual(False, results[3]['success'])
+            self.assertEqual(False, results[6]['success'])
+            self.assertIn('KeyError', results[6]['exception']['type'])
+            self.assertEqual([5 + nonce % 3 for nonce in range(10) if nonce not in (3, 6)],
+                             [result['table']['bets'][0]['wager'] for result in results if 'table' in result])
+        self.assertEqual(process_requests(requests[:2], workers=2, output='str'),
+                         [process_request(request, output='str') for request in requests[:2]])
+        with self.assertRaises(ValueError):
+            process_requests(requests, chunksize=0)
+
+    def test_preview(self):
+        table = {"existing_bets": [{"type": "PassLine", "wager": 10, "placement": 6},
+                                   {"type": "Place", "wager": 12, "placement": 8},
+                                   {"type": "Field", "wager": 5}],
+                 "puck_location": 6}
+        eng = Engine(table=table, instructions={"retrieve": [{"type": "Field", "wager": 5}]})
+        eng.process_instructions()
+        preview = eng.preview()
+        self.assertEqual(21, len(preview['outcomes']))
+        self.assertEqual(36, sum(outcome['weight'] for outcome in preview['outcomes']))
+        self.assertEqual(2, len(eng.table.bets))
+        self.assertEqual(1, len(eng.table.returned_bets))
+        by_roll = {tuple(outcome['dice_outcome'].for_json()): outcome for outcome in preview['outcomes']}
+        self.assertEqual(-22, by_roll[(3, 4)]['net'])
+        self.assertEqual(14, by_roll[(4, 4)]['net'])
+        self.assertEqual(10, by_roll[(3, 3)]['net'])
+        self.assertIsNone(by_roll[(3, 3)]['new_table']['puck_location'])
+        self.assertEqual(5, by_roll[(3, 3)]['summary']['total_returned_to_player'])
+        self.assertAlmostEqual((-22 * 6 + 14 * 5 + 10 * 5) / 36, preview['expected_value'])
+        self.assertAlmostEqual((22 ** 2 * 6 + 14 ** 2 * 5 + 10 ** 2 * 5) / 36 - preview['expected_value'] ** 2,
+                               preview['variance'])
+        for outcome in preview['outcomes']:
+            expected = process_request({"table": table, "instructions": eng.instructions,
+                                        "dice": outcome['dice_outcome'].for_json()})
+            self.assertEqual(expected['summary']['total_winnings_to_player'],
+                             outcome['summary']['total_winnings_to_player'])
+            self.assertEqual(expected['new_table']['puck_location'], outcome['new_table']['puck_location'])
+
+    def test_preview_request(self):
+        result = preview_request({"table": {"puck_location": 4},
+                                  "instructions": {"place": [{"type": "Come", "wager": 10}]}})
+        self.assertEqual(21, len(result['outcomes']))
+        self.assertAlmostEqual((10 * 8 - 10 * 4) / 36, result['expected_value'])
+        self.assertFalse(preview_request({'hash': 'n'})['success'])
+
+    def test_process_shared_roll(self):
+        table = {'config': {'field_12_pay': 2}, 'puck_location': 6}
+        players = [{'existing_bets': [{'type': 'PassLine', 'wager': 10, 'placement': 6, 'odds': 20}]},
+                   {'existing_bets': [{'type': 'Place', 'wager': 12, 'placement': 8}],
+                    'instructions': {'place': [{'type': 'Come', 'wager': 5}]}},
+                   {'existing_bets': [{'type': 'PassLine', 'wager': 10, 'placement': 6, 'odds': 20}]},
+                   {'existing_bets': [{'type': 'Place', 'wager': 10}]},
+                   {'instructions': {'retrieve': [{'type': 'Field', 'wager': 5}]}}]
+        for roll in [{'hash': 'a' * 64}, {'dice': [4, 4]}, {'dice': [3, 4]}]:
+            with self.subTest(roll=roll):
+                result = process_shared_roll({'table': table, 'players': players, **roll})
+                self.assertEqual(len(players), len(result['players']))
+                for player, player_result in zip(players[:3], result['players']):
+                    expected = process_request({'table': {**table, 'existing_bets': player['existing_bets']},
+                                                'instructions': player.get('instructions', {}), **roll})
+                    self.assertEqual(expected['summary'], player_result['summary'])
+                    self.assertEqual(expected['hash'], player_result['hash'])
+                    for key in ['winners', 'losers', 'returned']:
+                        self.assertCountEqual(expected[key], player_result[key])
+                    self.assertCountEqual(expected['new_table']['existing_bets'],
+                                          player_result['new_table']['existing_bets'])
+                    self.assertEqual(expected['summary']['dice_outcome'], result['dice_outcome'])
+                self.assertFalse(result['players'][3]['success'])
+                self.assertIn('KeyError', result['players'][4]['exception']['type'])
+        self.assertIsInstance(process_shared_roll({'players': []}, output='bytes'), bytes)
+        self.assertFalse(process_shared_roll({'hash': 'n', 'players': players})['success'])
+        self.assertFalse(process_shared_roll({'players': {}})['success'])
+
+    def test_process_request_group(self):
+        field = {'instructions': {'place': [{'type': 'Field', 'wager': 5}]}}
+        requests = [{'hash': 'a' * 64, **field},
+                    {'hash': 'b' * 64, 'table': {'config': {'field_12_pay': 2}}, **field},
+                    {'hash': 'n'},
+                    '{"dice": [6, 6], "table": {"config": {"field_12_pay": 2}, "puck_location": 4}, ' + json.dumps(field)[1:],
+                    {'dice': [6, 6], 'table': {'puck_location': 4}, **field},
+                    {'table': {'config': {'is_crapless': True}}}]
+        responses = process_request_group(requests)
+        self.assertEqual([process_request(request) for request in requests[:5]], responses[:5])
+        self.assertEqual(10, responses[3]['summary']['total_winnings_to_player'])
+        self.assertEqual(15, responses[4]['summary']['total_winnings_to_player'])
+        self.assertIn('InconsistentConfig', responses[5]['exception']['type'])
+        self.assertEqual([process_request(requests[2], output='bytes')],
+                         process_request_group(requests[2:3], output='bytes'))
+        with self.assertRaises(ValueError):
+            process_request_group(requests, output='xml')
+
     def test_bad_process_request(self):
         req = {'hash': 'n'*64}
         result = process_request(req)
@@ -0,0 +1,77 @@
+import fractions
+import json
+import unittest
+
+import JsonEncoder
+from craps.bet import BetStatus
+from craps.dice import Outcome
+from craps.table.config import Config, CraplessOdds
+from craps.table.table import Table
+from engine import Engine
+
+
+class TestJsonEncoder(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        JsonEncoder.set_backend(JsonEncoder.BACKENDS[0])
+
+    def test_serializers(self):
+        table = Table(puck_location=6, existing_bets=[{"type": "Place", "wager": 12, "placement": 8,
+                                                       "override_puck": "OFF"}])
+        self.assertEqual([1, 3], JsonEncoder.serialize(Outcome(3, 1)))
+        self.assertEqual('ON', JsonEncoder.serialize(BetStatus.ON))
+        self.assertEqual([11, 2], JsonEncoder.serialize(fractions.Fraction(11, 2)))
+        self.assertEqual({"type": "Place", "wager": 12, "placement": 8, "override_puck": "OFF"},
+                         JsonEncoder.serialize(table.bets.copy().pop()))
+        self.assertEqual([4], JsonEncoder.serialize({4}))
+        self.assertEqual("flat(2)", JsonEncoder.serialize(CraplessOdds.flat(2)))
+        with self.assertRaises(TypeError):
+            JsonEncoder.serialize(object())
+
+    def test_register_serializer(self):
+        class Chip:
+            def __init__(self, value):
+                self.value = value
+
+        class RedChip(Chip):
+            pass
+
+        with self.assertRaises(TypeError):
+            JsonEncoder.dumps(Chip(5))
+        JsonEncoder.register_serializer(Chip, lambda chip: {'chip': chip.value})
+        self.assertEqual('{"chip":5}', JsonEncoder.dumps(RedChip(5)))
+        JsonEncoder.register_serializer(Chip, lambda chip: chip.value)
+        self.assertEqual('[5,5]', JsonEncoder.dumps([Chip(5), RedChip(5)]))
+        self.assertEqual({'chips': [5, 5]}, JsonEncoder.primitive({'chips': (Chip(5), RedChip(5))}))
+
+    def test_backends_agree(self):
+        config = Config.from_json({"is_crapless": True, "odds": {key: 3 for key in range(2, 13) if key != 7},
+                                   "place_2_12_odds": [6, 1]})
+        engine = Engine(table={"config": config, "puck_location": 6,
+                               "existing_bets": [{"type": "Place", "wager": 10, "placement": 12},
+                                                 {"type": "Hop", "wager": 1, "placement": [1, 3]},
+                                                 {"type": "Lay", "wager": 40, "placement": 4}]},
+                        dice=[6, 6])
+        result = engine.get_result()
+        expected = json.loads(json.dumps(result, cls=JsonEncoder.ComplexEncoder))
+        for backend in JsonEncoder.BACKENDS:
+            JsonEncoder.set_backend(backend)
+            self.assertEqual(expected, json.loads(JsonEncoder.dumps(result)))
+            self.assertEqual(expected, JsonEncoder.loads(JsonEncoder.dumpb(result)))
+        self.assertEqual(expected, JsonEncoder.primitive(result))
+        self.assertEqual([6, 1], expected['table']['config']['place_2_12_odds'])
+        self.assertEqual('{"wager":2**64}'.replace('2**64', str(2 ** 64)),
+                         JsonEncoder.dumps({"wager": 2 ** 64}))
+        with self.assertRaises(ValueError):
+            JsonEncoder.set_backend('pickle')
+
+    def test_primitive(self):
+        obj = {4: {6}, None: fractions.Fraction(3, 2), True: (Outcome(2, 1),), 1.5: BetStatus.OFF}
+        self.assertEqual(json.loads(JsonEncoder.dumps(obj)), JsonEncoder.primitive(obj))
+        self.assertEqual({'4': [6], 'null': [3, 2], 'true': [[1, 2]], '1.5': 'OFF'}, JsonEncoder.primitive(obj))
+        with self.assertRaises(TypeError):
+            JsonEncoder.primitive([object()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+import engine
+import metrics
+import phase_timer
+from craps.table import DuplicateBetException
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.collector = metrics.install()
+
+    def tearDown(self) -> None:
+        metrics.uninstall()
+        phase_timer.set_sink(None)
+
+    def test_counters(self):
+        table = {'puck_location': 4, 'existing_bets': [{'type': 'Place', 'wager': 10, 'placement': 4},
+                                                       {'type': 'Field', 'wager': 5}]}
+        for dice in ([3, 4], [6, 6], [2, 2]):
+            engine.process_request({'dice': dice, 'table': table})
+        engine.process_request({'hash': 'n'})
+        engine.process_request_group([{'dice': [2, 2]}, '{'])
+        self.assertEqual(4, self.collector.value('craps_requests_total', result='success'))
+        self.assertEqual(1, self.collector.value('craps_request_failures_total', type='ValidationError'))
+        self.assertEqual(1, self.collector.value('craps_request_failures_total', type='JSONDecodeError'))
+        self.assertEqual(2, self.collector.value('craps_dice_outcomes_total', dice='2,2'))
+        self.assertEqual(2, self.collector.value('craps_bets_settled_total', bet='Field', result='win'))
+        self.assertEqual(1, self.collector.value('craps_bets_settled_total', bet='Place', result='lose'))
+        self.assertEqual(1, self.collector.value('craps_bets_settled_total', bet='Place', result='push'))
+        self.assertEqual(10 + 10 + 18, self.collector.value('craps_payouts_total'))
+        self.assertEqual(15, self.collector.value('craps_losing_wagers_total'))
+        with self.assertRaises(KeyError):
+            self.collector.value('craps_unknown_total')
+
+    def test_raised_failures(self):
+        request = {'dice': [3, 4], 'instructions': {'place': [{'type': 'PassLine', 'wager': 10},
+                                                              {'type': 'PassLine', 'wager': 10}]}}
+        with self.assertRaises(DuplicateBetException):
+            engine.process_request(request)
+        self.assertEqual(1, self.collector.value('craps_requests_total', result='failure'))
+        self.assertEqual(1, self.collector.value('craps_request_failures_total', type='DuplicateBetException'))
+        engine.process_request_group([request])
+        self.assertEqual(2, self.collector.value('craps_request_failures_total', type='DuplicateBetException'))
+        self.assertEqual(0, self.collector.value('craps_dice_outcomes_total', dice='3,4'))
+
+    def test_shared_roll(self):
+        players = [{'existing_bets': [{'type': 'Place', 'wager': 10, 'placement': 4}]},
+                   {'existing_bets': [{'type': 'Place', 'wager': 12, 'placement': 6}]},
+                   {'existing_bets': [{'type': 'Field', 'wager': 5}]}]
+        engine.process_shared_roll({'dice': [2, 2], 'table': {'puck_location': 4}, 'players': players})
+        self.assertEqual(1, self.collector.value('craps_dice_outcomes_total', dice='2,2'))
+        self.assertEqual(1, self.collector.value('craps_bets_settled_total', bet='Place', result='win'))
+        self.assertEqual(1, self.collector.value('craps_bets_settled_total', bet='Field', result='win'))
+
+    def test_render(self):
+        engine.process_request({'dice': [3, 4]})
+        lines = self.collector.render().splitlines()
+        self.assertIn('# TYPE craps_requests_total counter', lines)
+        self.assertIn('craps_requests_total{result="success"} 1', lines)
+        self.assertIn('craps_dice_outcomes_total{dice="3,4"} 1', lines)
+        self.assertIn('craps_phase_seconds_bucket{phase="settlement",le="+Inf"} 1', lines)
+        self.assertIn('craps_request_seconds_count 1', lines)
+        self.assertTrue(any(line.startswith('craps_cache_hit_ratio{cache="config"} ') for line in lines))
+        buckets = [int(line.rsplit(' ', 1)[1]) for line in lines
+                   if line.startswith('craps_phase_seconds_bucket{phase="validation"')]
+        self.assertEqual(sorted(buckets), buckets)
+        self.assertEqual(len(metrics.DEFAULT_BUCKETS) + 1, len(buckets))
+        self.assertEqual('{phase="a\\"b\\\\"}', metrics._labels((('phase', 'a"b\\'),)))
+
+    def test_write(self):
+        engine.process_request({'dice': [3, 4]})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'craps.prom')
+            self.collector.write(path)
+            with open(path, encoding='utf-8') as file:
+                self.assertIn('craps_requests_total{result="success"} 1\n', file.read())
+            self.assertEqual(['craps.prom'], os.listdir(directory))
+
+    def test_results_unchanged(self):
+        request = {'hash': 'a' * 64, 'table': {'puck_location': 6},
+                   'instructions': {'place': [{'type': 'Field', 'wager': 5}]}}
+        observed = engine.process_request(request)
+        metrics.uninstall()
+        self.assertEqual(engine.process_request(request), observed)
+
+    def test_install(self):
+        sunk = []
+        metrics.uninstall()
+
+        def sink(timings, _elapsed):
+            sunk.append(timings)
+
+        phase_timer.set_sink(sink)
+        collector = metrics.install()
+        self.assertIs(collector, metrics.installed())
+        engine.process_request({'dice': [3, 4]})
+        self.assertEqual(1, len(sunk))
+        self.assertEqual(1, collector.value('craps_requests_total', result='success'))
+        metrics.uninstall()
+        self.assertIsNone(metrics.installed())
+        self.assertIs(sink, phase_timer.get_sink())
+        engine.process_request({'dice': [3, 4]})
+        self.assertEqual(1, collector.value('craps_requests_total', result='success'))
+
+
+if __name__ == '__main__':
+    unittest.main()
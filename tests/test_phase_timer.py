@@ -0,0 +1,82 @@
+import json
+import unittest
+
+import phase_timer
+from craps.table.config import Config
+from engine import Engine, process_request, process_request_group
+
+
+class TestPhaseTimer(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        phase_timer.set_sink(None)
+
+    def test_timer(self):
+        timer = phase_timer.PhaseTimer()
+        for _ in range(2):
+            with timer.phase('roll'):
+                pass
+        with self.assertRaises(KeyError):
+            with timer.phase('table'):
+                raise KeyError
+        self.assertEqual(['roll', 'table'], list(timer.timings))
+        self.assertAlmostEqual(sum(timer.timings.values()), timer.total())
+        self.assertGreaterEqual(timer.elapsed(), timer.total())
+        with phase_timer.NULL_TIMER.phase('roll'):
+            pass
+        self.assertEqual({}, phase_timer.NULL_TIMER.timings)
+
+    def test_for_request(self):
+        self.assertIs(phase_timer.NULL_TIMER, phase_timer.for_request())
+        self.assertIsNot(phase_timer.NULL_TIMER, phase_timer.for_request(debug=True))
+        phase_timer.set_sink(print)
+        self.assertIs(print, phase_timer.get_sink())
+        self.assertIsNot(phase_timer.NULL_TIMER, phase_timer.for_request())
+
+    def test_process_request(self):
+        request = {'hash': 'a' * 64, 'table': {'puck_location': 6},
+                   'instructions': {'place': [{'type': 'Field', 'wager': 5}]}}
+        response = process_request(request, debug=True)
+        self.assertEqual(['validation', 'table', 'instructions', 'roll', 'settlement'],
+                         list(response.pop('debug')['timings']))
+        self.assertEqual(process_request(request), response)
+        self.assertNotIn('debug', process_request(request))
+
+        sunk = []
+        elapsed = []
+        phase_timer.set_sink(lambda timings, seconds: (sunk.append(timings), elapsed.append(seconds)))
+        process_request(json.dumps(request), output='bytes')
+        process_request_group([request, {'hash': 'n'}])
+        process_request({'hash': 'n'})
+        self.assertEqual(list(phase_timer.PHASES), list(sunk[0]))
+        self.assertCountEqual([tuple(phase for phase in phase_timer.PHASES if phase != 'decode'),
+                               ('validation', 'encoding')],
+                              [tuple(timings) for timings in sunk[1:3]])
+        self.assertEqual(['validation', 'encoding'], list(sunk[3]))
+        self.assertEqual(4, len(sunk))
+        for timings, seconds in zip(sunk, elapsed):
+            self.assertGreaterEqual(seconds, sum(timings.values()))
+
+    def test_group_config_resolution(self):
+        config = {'odds': 'flat(7)'}
+        requests = [{'table': {'config': config, 'puck_location': 6}, 'dice': [3, 4]}
+                    for _ in range(3)]
+        sunk = []
+        phase_timer.set_sink(lambda timings, seconds: sunk.append(timings))
+        Config.cache_clear()
+        process_request_group(requests)
+        self.assertEqual(1, Config.cache_info().misses)
+        self.assertEqual(3, len(sunk))
+        self.assertTrue(all('table' in timings for timings in sunk))
+
+    def test_engine(self):
+        timer = phase_timer.PhaseTimer()
+        engine = Engine(table={'puck_location': 6}, dice=[3, 4], timer=timer)
+        engine.process_instructions()
+        engine.get_result()
+        self.assertEqual(['table', 'instructions', 'settlement'], list(timer.timings))
+        self.assertIs(phase_timer.NULL_TIMER, Engine().timer)
+
+
+if __name__ == '__main__':
+    unittest.main()
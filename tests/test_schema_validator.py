@@ -0,0 +1,94 @@
+import copy
+import unittest
+
+import jsonschema
+
+from SchemaValidator import SchemaValidator, UnsupportedSchema, compile_schema
+from engine import get_request_validator, requestSchema, req as sample_request
+
+
+# noinspection DuplicatedCode
+class TestSchemaValidator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.validator = get_request_validator()
+        self.fast_check = compile_schema(requestSchema)
+
+    def _variants(self):
+        yield {}
+        yield copy.deepcopy(sample_request)
+        for key, value in [('hash', 'f' * 64), ('hash', 'F' * 64), ('hash', 'n' * 64), ('hash', 5),
+                           ('dice', [1, 6]), ('dice', [0, 6]), ('dice', [1, 2, 3]), ('dice', [1.0, 2]),
+                           ('dice', [True, 2]), ('dice', None), ('extra', 'ignored'), ('table', [])]:
+            yield {key: value}
+        for key, value in [('odds', 'flat(3)'), ('odds', 'mirrored345()'), ('odds', 'triple()'),
+                           ('odds', {'4': 3, '5': 4, '6': 5, '8': 5, '9': 4, '10': 3}),
+                           ('odds', {4: 3, 5: 4, 6: 5, 8: 5, 9: 4, 10: 3}),
+                           ('odds', {'4': 3, '5': 4, '6': 5, '8': 5, '9': 4}),
+                           ('odds', {'4': 3, '5': 4, '6': 5, '8': 5, '9': 4, '10': 3, '11': 2}),
+                           ('dont_bar', 2), ('dont_bar', 3), ('bet_min', 0), ('bet_min', True),
+                           ('bet_max', None), ('bet_max', 'none'), ('place_2_12_odds', [11, 2, 1]),
+                           ('is_crapless', 1)]:
+            yield {'table': {'config': {key: value}}}
+        for bet in [{'type': 'Come', 'wager': 5}, {'type': 'Come'}, {'type': 'come', 'wager': 5},
+                    {'type': 'Hop', 'wager': 5, 'placement': [1, 3]},
+                    {'type': 'Hop', 'wager': 5, 'placement': [1, 7]},
+                    {'type': 'Place', 'wager': 5, 'placement': 13},
+                    {'type': 'Place', 'wager': 5, 'placement': 6, 'override_puck': 'ON'},
+                    {'type': 'Place', 'wager': 5, 'placement': 6, 'override_puck': 'on'},
+                    {'type': 'Place', 'wager': 5, 'placement': 6, 'override_puck': None},
+                    {'type': 'PassLine', 'wager': 5, 'odds': 0}, {'type': 'PassLine', 'wager': -5},
+                    {'type': 'PassLine', 'wager': 5, 'odds': None}, 'PassLine']:
+            yield {'table': {'existing_bets': [bet]}}
+            for instruction in ['place', 'retrieve', 'turn_on', 'follow_puck']:
+                yield {'instructions': {instruction: [bet]}}
+
+    def test_fast_check_never_accepts_invalid_requests(self):
+        full = jsonschema.validators.validator_for(requestSchema)(requestSchema)
+        self.assertTrue(self.validator.has_fast_check())
+        for instance in self._variants():
+            with self.subTest(instance=instance):
+                if self.fast_check(instance):
+                    self.assertTrue(full.is_valid(instance))
+                self.assertEqual(full.is_valid(instance), self.validator.is_valid(instance))
+
+    def test_same_errors_as_jsonschema(self):
+        for instance in self._variants():
+            with self.subTest(instance=instance):
+                try:
+                    jsonschema.validate(instance=instance, schema=requestSchema)
+                    expected = None
+                except jsonschema.exceptions.ValidationError as error:
+                    expected = str(error)
+                try:
+                    self.validator.validate(instance)
+                    actual = None
+                except jsonschema.exceptions.ValidationError as error:
+                    actual = str(error)
+                self.assertEqual(expected, actual)
+
+    def test_validator_is_compiled_once(self):
+        self.assertIs(get_request_validator(), get_request_validator())
+
+    def test_unsupported_schema_falls_back(self):
+        schema = {'type': 'object', 'patternProperties': {'^x': {'type': 'integer'}}}
+        with self.assertRaises(UnsupportedSchema):
+            compile_schema(schema)
+        validator = SchemaValidator(schema)
+        self.assertFalse(validator.has_fast_check())
+        self.assertTrue(validator.is_valid({'x': 1}))
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            validator.validate({'x': 'one'})
+
+    def test_recursive_reference(self):
+        schema = {'$ref': '#/$defs/node',
+                  '$defs': {'node': {'type': 'object',
+                                     'properties': {'next': {'anyOf': [{'$ref': '#/$defs/node'},
+                                                                       {'type': 'null'}]}}}}}
+        check = compile_schema(schema)
+        self.assertTrue(check({'next': {'next': None}}))
+        self.assertFalse(check({'next': {'next': 5}}))
+
+
+if __name__ == '__main__':
+    unittest.main()
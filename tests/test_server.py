@@ -0,0 +1,271 @@
+import asyncio
+import http.client
+import json
+import os
+import pathlib
+import signal
+import socket
+import subprocess
+import sys
+import time
+import unittest
+
+import metrics
+import server
+from engine import process_request
+
+
+class TestRequestCoalescer(unittest.IsolatedAsyncioTestCase):
+    async def test_submit(self):
+        batches = []
+
+        async def handler(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+
+        coalescer = server.RequestCoalescer(handler, window=0.01, max_batch=4)
+        self.assertEqual([item * 2 for item in range(10)],
+                         await asyncio.gather(*(coalescer.submit(item) for item in range(10))))
+        self.assertEqual([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]], batches)
+        self.assertEqual(20, await coalescer.submit(10))
+        self.assertEqual([10], batches[-1])
+        await asyncio.sleep(0)
+        self.assertEqual(set(), coalescer._tasks)
+
+    async def test_handler_error(self):
+        async def handler(items):
+            raise RuntimeError(items)
+
+        coalescer = server.RequestCoalescer(handler, window=0.001)
+        results = await asyncio.gather(coalescer.submit(1), coalescer.submit(2), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        with self.assertRaises(ValueError):
+            server.RequestCoalescer(handler, max_batch=0)
+
+
+class TestChunksByConfig(unittest.TestCase):
+    def test_chunks(self):
+        bodies = [json.dumps({'table': {'config': config}}).encode()
+                  for config in ({'odds': 'flat(2)'}, {}, {'odds': 'flat(2)'}, {}, {'odds': 'flat(2)'})]
+        bodies.append(b'{')
+        chunks = server._chunks_by_config(bodies, 2)
+        self.assertEqual([[0, 2, 4], [1, 3, 5]], chunks)
+        self.assertEqual([[0, 2, 4, 1, 3, 5]], server._chunks_by_config(bodies, 1))
+        many = server._chunks_by_config([b'{}'] * 9, 3)
+        self.assertEqual([3, 3, 3], [len(chunk) for chunk in many])
+        self.assertEqual(list(range(9)), sorted(index for chunk in many for index in chunk))
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    workers = 1
+    batch_window = server.DEFAULT_BATCH_WINDOW
+
+    async def asyncSetUp(self):
+        self.server = server.EngineServer(workers=self.workers, batch_window=self.batch_window)
+        self.listener = await self.server.start('127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.server.close()
+
+    async def request(self, method, path, body=None, headers=''):
+        payload = b'' if body is None else body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.writer.write(f'{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(payload)}\r\n'
+                          f'{headers}\r\n'.encode() + payload)
+        await self.writer.drain()
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode()
+        status = int(head.split(' ')[1])
+        headers = dict(line.split(': ', 1) for line in head.split('\r\n')[1:] if line)
+        body = await self.reader.readexactly(int(headers['Content-Length']))
+        return status, headers, json.loads(body)
+
+    async def test_process_keep_alive(self):
+        request = {'instructions': {'place': [{'type': 'Field', 'wager': 5}]}, 'hash': 'b' * 64}
+        expected = process_request(request)
+        for path in ['/process', server.LAMBDA_PATH]:
+            status, headers, response = await self.request('POST', path, request)
+            self.assertEqual(200, status)
+            self.assertEqual('keep-alive', headers['Connection'])
+            self.assertEqual(expected, response)
+        status, _, response = await self.request('POST', '/process', b'{"hash": "n"}')
+        self.assertEqual(200, status)
+        self.assertFalse(response['success'])
+
+    async def test_concurrent_process(self):
+        requests = [{'hash': format(nonce, '064x'), 'table': {'config': {'field_12_pay': nonce % 2 + 2}}}
+                    for nonce in range(20)] + [{'hash': 'n'}]
+        connections = [await asyncio.open_connection('127.0.0.1', self.port) for _ in requests]
+
+        async def send(connection, request):
+            reader, writer = connection
+            body = json.dumps(request).encode()
+            writer.write(f'POST /process HTTP/1.1\r\nContent-Length: {len(body)}\r\n'
+                         f'Connection: close\r\n\r\n'.encode() + body)
+            _, _, body = (await reader.read()).partition(b'\r\n\r\n')
+            writer.close()
+            return json.loads(body)
+
+        responses = await asyncio.gather(*(send(*pair) for pair in zip(connections, requests)))
+        self.assertEqual([process_request(request) for request in requests], responses)
+
+    async def test_batch_and_preview(self):
+        requests = [{'hash': format(nonce, '064x')} for nonce in range(100)] + [{'hash': 'n'}]
+        status, _, responses = await self.request('POST', '/batch', requests)
+        self.assertEqual(200, status)
+        self.assertEqual([process_request(request) for request in requests], responses)
+        status, _, response = await self.request('POST', '/batch', {'hash': 'a' * 64})
+        self.assertEqual(400, status)
+        status, _, response = await self.request('POST', '/preview', {'table': {'puck_location': 6}})
+        self.assertEqual(21, len(response['outcomes']))
+        status, _, response = await self.request('POST', '/shared-roll', {'dice': [3, 4], 'players': [{}]})
+        self.assertEqual([3, 4], response['dice_outcome'])
+
+    async def test_sessions(self):
+        status, _, created = await self.request('POST', '/sessions', {'table': {'puck_location': 4}})
+        self.assertEqual(201, status)
+        session_path = f"/sessions/{created['session_id']}"
+        status, _, result = await self.request('POST', session_path, {'dice': [2, 2]})
+        self.assertEqual(200, status)
+        self.assertIsNone(result['new_table']['puck_location'])
+        status, _, state = await self.request('GET', session_path)
+        self.assertEqual(1, state['rolls'])
+        status, _, _ = await self.request('DELETE', session_path)
+        self.assertEqual(200, status)
+        status, _, result = await self.request('POST', session_path, {})
+        self.assertEqual(404, status)
+        status, _, restored = await self.request('POST', '/sessions/restore', state)
+        self.assertEqual((201, created['session_id']), (status, restored['session_id']))
+        status, _, _ = await self.request('POST', '/sessions', {'table': {'puck_location': 7}})
+        self.assertEqual(400, status)
+
+    async def test_errors(self):
+        self.assertEqual(404, (await self.request('POST', '/nowhere', {}))[0])
+        self.assertEqual(405, (await self.request('GET', '/process'))[0])
+        self.assertEqual(405, (await self.request('PUT', '/sessions'))[0])
+        status, headers, _ = await self.request('POST', '/process', {}, headers='Connection: close\r\n')
+        self.assertEqual((200, 'close'), (status, headers['Connection']))
+        self.assertEqual(b'', await self.reader.read())
+
+
+class TestServerRetire(unittest.IsolatedAsyncioTestCase):
+    async def test_max_requests(self):
+        engine_server = server.EngineServer(workers=1, max_requests=2, sessions=False)
+        listener = await engine_server.start('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        idle_reader, idle_writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            heads = []
+            for path in ['/sessions', '/process']:
+                writer.write(f'POST {path} HTTP/1.1\r\nContent-Length: 2\r\n\r\n{{}}'.encode())
+                heads.append(await reader.readuntil(b'\r\n\r\n'))
+                await reader.readexactly(int(heads[-1].split(b'Content-Length: ')[1].split(b'\r\n')[0]))
+            self.assertIn(b'404 Not Found', heads[0])
+            self.assertIn(b'Connection: keep-alive', heads[0])
+            self.assertIn(b'Connection: close', heads[1])
+            await asyncio.wait_for(engine_server.wait_retired(), 5)
+            self.assertEqual(b'', await idle_reader.read())
+            with self.assertRaises(OSError):
+                await asyncio.open_connection('127.0.0.1', port)
+        finally:
+            writer.close()
+            idle_writer.close()
+            engine_server.close()
+
+
+class TestServerMetrics(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        metrics.uninstall()
+
+    async def test_metrics(self):
+        with self.assertRaises(ValueError):
+            server.EngineServer(workers=2, collector=metrics.EngineMetrics())
+        engine_server = server.EngineServer(workers=1, collector=metrics.install())
+        try:
+            await engine_server.dispatch('POST', '/process', b'{"dice": [3, 4]}')
+            status, body, content_type = await engine_server.dispatch('GET', '/metrics', b'')
+            self.assertEqual((200, metrics.CONTENT_TYPE), (status, content_type))
+            self.assertIn(b'craps_dice_outcomes_total{dice="3,4"} 1\n', body)
+            self.assertEqual(405, (await engine_server.dispatch('POST', '/metrics', b''))[0])
+        finally:
+            engine_server.close()
+        without_metrics = server.EngineServer(workers=1)
+        self.assertEqual(404, (await without_metrics.dispatch('GET', '/metrics', b''))[0])
+        without_metrics.close()
+
+    async def test_every_route_counted(self):
+        collector = metrics.install()
+        engine_server = server.EngineServer(workers=1, batch_window=0, collector=collector)
+        try:
+            _, body = await engine_server.dispatch('POST', '/sessions', b'{}')
+            session_path = f"/sessions/{json.loads(body)['session_id']}"
+            routes = [('/process', b'{"dice": [3, 4]}', 'success'),
+                      ('/preview', b'{"table": {"puck_location": 6}}', 'success'),
+                      ('/shared-roll', b'{"dice": [2, 2], "players": [{}, {}]}', 'success'),
+                      (session_path, b'{"dice": [1, 1]}', 'success'),
+                      ('/preview', b'{"hash": "n"}', 'failure'),
+                      ('/shared-roll', b'{"players": {}}', 'failure'),
+                      (session_path, b'{"hash": "n"}', 'failure')]
+            counted = {'success': 0, 'failure': 0}
+            for path, body, result in routes:
+                with self.subTest(path=path, body=body):
+                    await engine_server.dispatch('POST', path, body)
+                    counted[result] += 1
+                    for each in counted:
+                        self.assertEqual(counted[each], collector.value('craps_requests_total', result=each))
+            self.assertEqual(1, collector.value('craps_dice_outcomes_total', dice='2,2'))
+            self.assertIn(b'craps_request_seconds_count 7\n', collector.render().encode())
+        finally:
+            engine_server.close()
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'pre-forking requires os.fork')
+class TestPrefork(unittest.TestCase):
+    def test_prefork(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        process = subprocess.Popen([sys.executable, 'server.py', '--port', str(port), '--prefork', '2',
+                                    '--max-requests', '2'],
+                                   cwd=pathlib.Path(server.__file__).parent)
+        try:
+            deadline = time.monotonic() + 10
+            while True:
+                try:
+                    socket.create_connection(('127.0.0.1', port)).close()
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.05)
+            request = {'dice': [3, 4], 'table': {'puck_location': 6}}
+            for _ in range(6):
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('POST', '/process', json.dumps(request))
+                response = connection.getresponse()
+                self.assertEqual(200, response.status)
+                self.assertEqual(process_request(request)['summary'], json.loads(response.read())['summary'])
+                connection.close()
+            process.send_signal(signal.SIGTERM)
+            self.assertEqual(0, process.wait(10))
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+class TestServerProcessPool(TestServer):
+    workers = 2
+
+
+class TestServerUncoalesced(TestServer):
+    batch_window = 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+
+from engine import Session, encode_response, process_request
+from session_store import SessionNotFound, SessionStore
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def test_rolls_match_process_request(self):
+        store = SessionStore()
+        table = {'puck_location': 6, 'existing_bets': [{'type': 'PassLine', 'wager': 10, 'placement': 6}]}
+        session_id = store.create(table)
+        instructions = {'place': [{'type': 'Place', 'wager': 12, 'placement': 8}]}
+        result = store.process_request({'session_id': session_id, 'instructions': instructions, 'hash': 'a' * 64})
+        expected = process_request({'table': table, 'instructions': instructions, 'hash': 'a' * 64})
+        self.assertEqual(session_id, result['session_id'])
+        self.assertEqual(expected['summary'], result['summary'])
+        self.assertCountEqual(expected['new_table']['existing_bets'], result['new_table']['existing_bets'])
+        self.assertEqual(1, store.get(session_id).rolls)
+        self.assertIsInstance(store.roll(session_id, dice=[2, 2], output='bytes'), bytes)
+
+    def test_errors(self):
+        store = SessionStore()
+        session_id = store.create()
+        self.assertFalse(store.process_request({'session_id': 'missing'})['success'])
+        self.assertIn('SessionNotFound', store.process_request({'session_id': 'missing'})['exception']['type'])
+        self.assertFalse(store.process_request({'session_id': session_id, 'hash': 'n'})['success'])
+        self.assertFalse(store.process_request({'hash': 'a' * 64})['success'])
+        self.assertFalse(store.process_request(b'{')['success'])
+        with self.assertRaises(SessionNotFound):
+            store.get('missing')
+        with self.assertRaises(KeyError):
+            store.delete('missing')
+        rejected = store.process_request({'session_id': session_id, 'dice': [3, 4],
+                                          'instructions': {'place': [{'type': 'PassLine', 'wager': 10},
+                                                                     {'type': 'PassLine', 'wager': 10}]}})
+        self.assertFalse(rejected['success'])
+        self.assertIn('DuplicateBetException', rejected['exception']['type'])
+        self.assertEqual(0, len(store.get(session_id).table.bets))
+        self.assertEqual(0, store.get(session_id).rolls)
+        store.delete(session_id)
+        self.assertNotIn(session_id, store)
+        with self.assertRaises(ValueError):
+            SessionStore(max_sessions=0)
+
+    def test_lru_eviction(self):
+        evicted = []
+        store = SessionStore(max_sessions=2, on_evict=lambda session_id, state: evicted.append(state))
+        first = store.create({'puck_location': 4})
+        second = store.create()
+        store.get(first)
+        third = store.create()
+        self.assertEqual(2, len(store))
+        self.assertIn(first, store)
+        self.assertNotIn(second, store)
+        self.assertIn(third, store)
+        self.assertEqual([second], [state['session_id'] for state in evicted])
+
+    def test_ttl(self):
+        clock = FakeClock()
+        store = SessionStore(ttl=10, clock=clock)
+        first = store.create()
+        clock.now = 6
+        second = store.create()
+        clock.now = 11
+        self.assertNotIn(first, store)
+        self.assertIn(second, store)
+        clock.now = 15
+        store.get(second)
+        clock.now = 24
+        self.assertEqual(1, len(store))
+        clock.now = 26
+        self.assertEqual(0, len(store))
+
+    def test_export_restore(self):
+        store = SessionStore(max_sessions=1)
+        session_id = store.create({'config': {'field_12_pay': 2}})
+        store.roll(session_id, instructions={'place': [{'type': 'PassLine', 'wager': 10}]}, dice=[2, 2])
+        store.roll(session_id, instructions={'set_odds': [{'type': 'PassLine', 'wager': 10, 'placement': 4,
+                                                           'odds': 20}]}, dice=[3, 3])
+        state = store.export(session_id)
+        store.create()
+        self.assertNotIn(session_id, store)
+        self.assertEqual(session_id, store.restore(state))
+        restored = store.get(session_id)
+        self.assertEqual(2, restored.rolls)
+        self.assertEqual(state['table'], store.export(session_id)['table'])
+        live = Session(state['table'])
+        self.assertEqual(encode_response(live.roll(dice=[2, 2]))['summary'], store.roll(session_id, dice=[2, 2])['summary'])
+        self.assertNotEqual(session_id, store.restore({'table': {}}))
+
+    def test_restore_after_win(self):
+        rolls = [({'place': [{'type': 'PassLine', 'wager': 10}]}, [2, 2]),
+                 ({'set_odds': [{'type': 'PassLine', 'wager': 10, 'placement': 4, 'odds': 20}]}, [1, 1]),
+                 ({}, [1, 3])]
+        store = SessionStore()
+        session_id = store.create()
+        live = Session()
+        for instructions, dice in rolls:
+            store.roll(session_id, instructions=instructions, dice=dice)
+            live.roll(instructions=instructions, dice=dice)
+        state = store.export(session_id)
+        self.assertEqual([{'type': 'PassLine', 'wager': 10, 'odds': 20}], state['table']['existing_bets'])
+        store.delete(session_id)
+        self.assertEqual(session_id, store.restore(state))
+        self.assertEqual(state, store.export(session_id))
+        self.assertEqual({'session_id': session_id, **encode_response(live.roll(dice=[3, 4]))},
+                         store.roll(session_id, dice=[3, 4]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Module: Worker Pool
+
+Runs a function over a stream of items in a pool of worker processes.
+"""
+import collections
+import concurrent.futures
+import itertools
+import os
+import typing
+
+#: Number of items handed to a worker process at a time
+DEFAULT_CHUNKSIZE = 64
+
+
+def imap(function: typing.Callable,
+         items: typing.Iterable,
+         workers: typing.Optional[int] = None,
+         chunksize: int = DEFAULT_CHUNKSIZE,
+         ordered: bool = True) -> typing.Iterator:
+    """
+    Apply a function to every item, yielding results as they are ready
+
+    Items are sent to the workers in chunks, and only two chunks per worker are in flight at
+    any time, so `items` can be a stream of any length without holding it in memory.
+
+    :param function: Function to apply, it must be picklable (defined at module level)
+    :type function: Callable
+    :param items: Items to apply the function to
+    :type items: Iterable
+    :param workers: Number of worker processes (defaults to the CPU count, 1 runs in-process)
+    :type workers: int|None
+    :param chunksize: Number of items sent to a worker at a time
+    :type chunksize: int
+    :param ordered: Yield results in the same order as the items (otherwise as chunks finish)
+    :type ordered: bool
+    :return: results of the function
+    :rtype: Iterator
+    :raise ValueError: on a chunksize less than 1
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be positive')
+    workers = workers if workers is not None else os.cpu_count() or 1
+    if workers <= 1:
+        yield from map(function, items)
+        return
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    pending = collections.deque()
+    items = iter(items)
+    try:
+        while chunk := list(itertools.islice(items, chunksize)):
+            pending.append(executor.submit(_apply, function, chunk))
+            if len(pending) >= workers * 2:
+                yield from _next_done(pending, ordered)
+        while pending:
+            yield from _next_done(pending, ordered)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _next_done(pending: collections.deque, ordered: bool) -> list:
+    if ordered:
+        return pending.popleft().result()
+    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+    future = next(iter(done))
+    pending.remove(future)
+    return future.result()
+
+
+def _apply(function: typing.Callable, chunk: list) -> list:
+    return [function(item) for item in chunk]